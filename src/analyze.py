@@ -0,0 +1,149 @@
+"""
+Replay recorded games and analyse positions with the bot's Minimax search.
+
+Every game is replayed through the rules (illegal actions are reported) and, for the selected
+positions, the position is searched at --depth and --deep-depth. One JSON line is written per
+position with the played action, both searches' best actions, scores and timings, and whether
+the played move differs from the deeper search. Games are spread over --workers processes.
+With --cache, the deep results of bot positions are also stored in the evaluation cache the bot
+probes before searching (see evalcache.py).
+
+Usage: python analyze.py ../records/games.qrec [--side bot] [--every 1] [--depth 2] [--deep-depth 4]
+                         [--games 0:100] [--workers 4] [--out analysis.jsonl] [--cache eval_cache.qevc]
+"""
+import argparse
+import json
+import sys
+import time
+from itertools import islice
+from multiprocessing import Pool
+
+from bot import EVAL_CACHE_PATH, apply_action, evaluation_fingerprint, minimax, quiet, search_best_action
+from evalcache import EvalCacheWriter
+from records import GameRecordReader, replay_game
+from rules import encode_action, illegal_reason
+from state import SearchState, mirror_code
+
+
+def timed_search(player_positions, walls, depth, walls_remaining, user_last_position, is_bot):
+    start = time.perf_counter()
+    action, score = search_best_action(player_positions, walls, depth, walls_remaining[1], walls_remaining[0],
+                                       user_last_position, is_bot=is_bot)
+    return action, score, (time.perf_counter() - start) * 1000
+
+
+def action_score(player_positions, walls, depth, walls_remaining, user_last_position, is_bot, action):
+    """Minimax score of playing `action` and searching the rest to `depth` plies."""
+    state = SearchState(player_positions, walls, walls_remaining[0], walls_remaining[1])
+    apply_action(state, encode_action(action), is_bot=is_bot)
+    return minimax(state, depth - 1, float('-inf'), float('inf'), not is_bot, user_last_position)
+
+
+def analyse_game(task):
+    """
+    Replay one game and analyse its selected positions (runs in a worker process).
+
+    Parameters:
+    - task: (game_index, GameRecord, options dict).
+
+    Returns:
+    - List of result dicts, one per analysed position or illegal action.
+    """
+    game_index, record, options = task
+    results = []
+    user_last_position = None
+    selected = 0
+    with quiet():
+        for ply, (player_positions, walls, walls_remaining, to_move, action) in enumerate(replay_game(record)):
+            if user_last_position is None or to_move == 0:
+                user_last_position = player_positions[0]
+
+            reason = illegal_reason(player_positions, walls, walls_remaining, to_move, action, record.grid_size)
+            if reason is not None:
+                results.append({"game": game_index, "ply": ply, "illegal": reason, "action": action})
+                break
+
+            # The Minimax bot only plays on the standard board
+            if record.grid_size != 9 or not (options["side"] == "both" or (to_move == 1) == (options["side"] == "bot")):
+                continue
+            selected += 1
+            if (selected - 1) % options["every"]:
+                continue
+
+            is_bot = to_move == 1
+            result = {"game": game_index, "ply": ply, "to_move": "bot" if is_bot else "user", "played": action}
+            state = SearchState(player_positions, walls, walls_remaining[0], walls_remaining[1])
+            result["key"], result["mirrored"] = state.canonical_key(is_bot, user_last_position)
+            for name, depth in (("shallow", options["depth"]), ("deep", options["deep_depth"])):
+                best, score, elapsed = timed_search(player_positions, walls, depth, walls_remaining,
+                                                    user_last_position, is_bot)
+                result[name] = {"action": best, "score": score, "ms": round(elapsed, 2)}
+            result["played_score"] = action_score(player_positions, walls, options["deep_depth"], walls_remaining,
+                                                  user_last_position, is_bot, action)
+            result["shallow_differs"] = result["shallow"]["action"] != result["deep"]["action"]
+            result["played_differs"] = action != result["deep"]["action"]
+            results.append(result)
+    return results
+
+
+def parse_range(text):
+    start, _, stop = text.partition(":")
+    return int(start or 0), int(stop) if stop else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("records", nargs="+", help="game record files")
+    parser.add_argument("--side", choices=["bot", "user", "both"], default="bot", help="positions to analyse")
+    parser.add_argument("--every", type=int, default=1, help="analyse every n-th position of the selected side")
+    parser.add_argument("--games", type=parse_range, default=(0, None), help="game index range start:stop")
+    parser.add_argument("--depth", type=int, default=2, help="depth of the bot's own search")
+    parser.add_argument("--deep-depth", type=int, default=4, help="depth of the reference search")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--out", default=None, help="JSON lines output file (default: stdout)")
+    parser.add_argument("--cache", default=None, const=EVAL_CACHE_PATH, nargs="?",
+                        help="store the deep results of bot positions in this evaluation cache")
+    args = parser.parse_args()
+
+    options = {"side": args.side, "every": args.every, "depth": args.depth, "deep_depth": args.deep_depth}
+
+    def tasks():
+        index = 0
+        for path in args.records:
+            with GameRecordReader(path) as reader:
+                for record in reader:
+                    yield index, record, options
+                    index += 1
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    cache = EvalCacheWriter(args.cache, evaluation_fingerprint()) if args.cache else None
+    cached = 0
+    analysed = differing = 0
+    search_ms = 0.0
+    start, stop = args.games
+    with Pool(args.workers) as pool:
+        for results in pool.imap(analyse_game, islice(tasks(), start, stop), chunksize=4):
+            for result in results:
+                out.write(json.dumps(result) + "\n")
+                if "deep" in result:
+                    analysed += 1
+                    differing += result["played_differs"]
+                    search_ms += result["shallow"]["ms"] + result["deep"]["ms"]
+                    if cache is not None and result["to_move"] == "bot" and result["deep"]["action"]:
+                        # The cache keeps actions in the orientation of the canonical key
+                        code = encode_action(result["deep"]["action"])
+                        cache.store(result["key"], args.deep_depth, result["deep"]["score"],
+                                    mirror_code(code) if result["mirrored"] else code)
+                        cached += 1
+    if out is not sys.stdout:
+        out.close()
+    if cache is not None:
+        cache.close()
+        print(f"{cached} results stored in {args.cache}", file=sys.stderr)
+
+    print(f"{analysed} positions analysed, played move differs from depth {args.deep_depth} in {differing}; "
+          f"{search_ms / max(1, analysed):.1f} ms of search per position", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
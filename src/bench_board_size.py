@@ -0,0 +1,104 @@
+"""
+Benchmark of the per-node cost of the rules and search as the board grows.
+
+For each board size it times one search node's worth of rules work (pawn moves, every legal wall
+with both path checks, both distances) with the list-based functions in rules.py and with the
+array-backed Board, plus the cost of one MCTS playout.
+
+Usage: python bench_board_size.py [--sizes 9 11 13] [--positions 20] [--playouts 300]
+"""
+import argparse
+import random
+import time
+
+from board import Board
+from mcts import MCTSBot, goal_rows
+from rules import (
+    get_all_possible_moves, initial_positions, is_path_open, is_valid_wall, shortest_path_length
+)
+
+
+def random_position(grid_size, rng, wall_count):
+    """Random pawn cells and up to `wall_count` random legal walls."""
+    positions = [(rng.randrange(grid_size), rng.randrange(1, grid_size - 1)) for _ in range(2)]
+    if positions[0] == positions[1]:
+        positions[1] = initial_positions(grid_size)[1]
+    pawns = list(zip(positions, goal_rows(grid_size)))
+    board = Board(grid_size)
+    slots = board.all_wall_slots()
+    rng.shuffle(slots)
+    for wall in slots:
+        if len(board.walls) == wall_count:
+            break
+        if board.is_valid_wall(wall) and board.wall_keeps_paths_open(wall, pawns):
+            board.place_wall(wall)
+    return positions, board.walls
+
+
+def list_rules_node(positions, walls, grid_size):
+    """One node's worth of rules work with the list-based functions."""
+    user_goal, bot_goal = goal_rows(grid_size)
+    get_all_possible_moves(positions[1], walls, positions[0], grid_size)
+    legal = 0
+    for wall in Board(grid_size).all_wall_slots():
+        if is_valid_wall(wall, walls, grid_size) and \
+           is_path_open(positions[0], user_goal, walls + [wall], grid_size) and \
+           is_path_open(positions[1], bot_goal, walls + [wall], grid_size):
+            legal += 1
+    shortest_path_length(positions[0], user_goal, walls, positions[1], grid_size)
+    shortest_path_length(positions[1], bot_goal, walls, positions[0], grid_size)
+    return legal
+
+
+def board_node(positions, walls, grid_size):
+    """The same work with the array-backed Board."""
+    user_goal, bot_goal = goal_rows(grid_size)
+    board = Board(grid_size, walls)
+    board.pawn_moves(positions[1], positions[0])
+    legal = len(board.legal_walls(list(zip(positions, (user_goal, bot_goal)))))
+    board.shortest_path_length(positions[0], user_goal, positions[1])
+    board.shortest_path_length(positions[1], bot_goal, positions[0])
+    return legal
+
+
+def time_per_call(function, samples, grid_size):
+    start = time.perf_counter()
+    for positions, walls in samples:
+        function(positions, walls, grid_size)
+    return (time.perf_counter() - start) / len(samples)
+
+
+def time_per_playout(grid_size, playouts, seed):
+    searcher = MCTSBot(iterations=playouts, time_limit=float('inf'), seed=seed, grid_size=grid_size)
+    state = (tuple(initial_positions(grid_size)), (), (10, 10), 1)
+    start = time.perf_counter()
+    root = searcher.search(state)
+    return (time.perf_counter() - start) / max(1, root.visits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9, 11, 13])
+    parser.add_argument("--positions", type=int, default=20, help="random positions per board size")
+    parser.add_argument("--walls", type=int, default=12, help="walls placed in each random position")
+    parser.add_argument("--playouts", type=int, default=300, help="MCTS playouts per board size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>4} {'wall slots':>10} {'list rules ms/node':>19} {'Board ms/node':>14} "
+          f"{'speedup':>8} {'MCTS ms/playout':>16}")
+    for grid_size in args.sizes:
+        rng = random.Random(args.seed)
+        samples = [random_position(grid_size, rng, args.walls) for _ in range(args.positions)]
+        for positions, walls in samples:
+            assert list_rules_node(positions, walls, grid_size) == board_node(positions, walls, grid_size)
+
+        list_cost = time_per_call(list_rules_node, samples, grid_size)
+        board_cost = time_per_call(board_node, samples, grid_size)
+        playout_cost = time_per_playout(grid_size, args.playouts, args.seed)
+        print(f"{grid_size:>4} {2 * (grid_size - 1) ** 2:>10} {list_cost * 1000:>19.2f} {board_cost * 1000:>14.2f} "
+              f"{list_cost / board_cost:>7.1f}x {playout_cost * 1000:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Move time of every difficulty level (bot.DIFFICULTY_LEVELS).
+
+Each level plays the bot's turn (bot.bot_turn with the level, as in a game) in the same random
+midgame positions; the benchmark prints
+the median, 99th percentile and largest move time next to the level's time limit, the mean nodes
+searched per move and the moves per second one core can serve. It exits with an error if a move
+ran past its level's time limit by more than --tolerance.
+
+Usage: python bench_levels.py [--positions 200] [--levels beginner easy ...] [--tolerance 0.01]
+"""
+import argparse
+import random
+import sys
+import time
+
+import bot
+from bench_board_size import random_position
+from rules import GRID_SIZE
+
+TURN_COUNT = 10  # Turns played before the sample positions
+
+
+def percentile(values, share):
+    """Value below which `share` of the sorted values fall (nearest rank)."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def measure_level(name, samples):
+    """Return (move times in seconds, nodes per move) of the level's bot turns in the sample positions."""
+    times, nodes = [], []
+    with bot.quiet():
+        for positions, walls in samples:
+            start_nodes = bot.search_stats["nodes"]
+            start = time.perf_counter()
+            bot.bot_turn(list(positions), list(walls), 5, 5, positions[0], TURN_COUNT, level=name)
+            times.append(time.perf_counter() - start)
+            nodes.append(bot.search_stats["nodes"] - start_nodes)
+    return times, nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--positions", type=int, default=200)
+    parser.add_argument("--levels", nargs="*", default=list(bot.DIFFICULTY_LEVELS))
+    parser.add_argument("--tolerance", type=float, default=0.01, help="seconds a move may run past its limit")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [random_position(GRID_SIZE, rng, rng.randrange(11)) for _ in range(args.positions)]
+    random.seed(args.seed)  # The level's choice among near-best actions
+    measure_level(args.levels[0], samples[:1])  # Warm up the caches
+
+    print(f"{'level':<10} {'limit ms':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'nodes':>7} {'moves/s':>8}")
+    overruns = []
+    for name in args.levels:
+        level = bot.DIFFICULTY_LEVELS[name]
+        times, nodes = measure_level(name, samples)
+        print(f"{name:<10} {level.time_limit * 1000:>9.0f} {percentile(times, 0.5) * 1000:>8.1f} "
+              f"{percentile(times, 0.99) * 1000:>8.1f} {max(times) * 1000:>8.1f} {sum(nodes) / len(nodes):>7.0f} "
+              f"{len(times) / sum(times):>8.1f}")
+        if max(times) > level.time_limit + args.tolerance:
+            overruns.append(name)
+    if overruns:
+        sys.exit(f"Moves ran past the time limit of: {', '.join(overruns)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of the selective Minimax search: late-move reductions and null-move pruning.
+
+Searches the same random midgame positions with search_best_action four ways, with each technique
+switched on or off (bot.LATE_MOVE_REDUCTIONS, bot.NULL_MOVE_PRUNING), and prints the Minimax nodes,
+time and node savings of each against the full-width search, how often it chose the full-width
+search's action, and how often the reductions were re-searched and the null moves were cut or
+refuted by their verification search.
+
+Usage: python bench_selective.py [--positions 20] [--depths 4 6] [--walls 8] [--table]
+"""
+import argparse
+import random
+import time
+
+import bot
+from bench_board_size import random_position
+from ttable import TranspositionTable
+
+CONFIGURATIONS = [
+    ("full width", False, False),
+    ("late-move reductions", True, False),
+    ("null move", False, True),
+    ("both", True, True),
+]
+COUNTERS = ["reductions", "re_searches", "null_cutoffs", "null_refuted"]
+
+
+def run(samples, depth, table_entries):
+    """Search every sample; returns (actions, seconds, search_stats summed over the samples)."""
+    actions = []
+    totals = dict.fromkeys(["nodes"] + COUNTERS, 0)
+    start = time.perf_counter()
+    with bot.quiet():
+        for positions, walls in samples:
+            for name in totals:
+                bot.search_stats[name] = 0
+            table = TranspositionTable(table_entries) if table_entries else None
+            action, _ = bot.search_best_action(positions, walls, depth, 5, 5, positions[0], table=table)
+            actions.append(action)
+            for name in totals:
+                totals[name] += bot.search_stats[name]
+    return actions, time.perf_counter() - start, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--depths", type=int, nargs="+", default=[4, 6])
+    parser.add_argument("--walls", type=int, default=8, help="walls placed in each random position")
+    parser.add_argument("--table", action="store_true", help="search with a transposition table")
+    parser.add_argument("--entries", type=int, default=1 << 16, help="transposition table entries")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [random_position(9, rng, args.walls) for _ in range(args.positions)]
+    settings = bot.LATE_MOVE_REDUCTIONS, bot.NULL_MOVE_PRUNING
+    bot.SEARCH_WORKERS = 1
+    try:
+        for depth in args.depths:
+            print(f"Depth {depth}")
+            print(f"  {'search':<21} {'nodes':>9} {'saved':>6} {'seconds':>8} {'same action':>11} "
+                  f"{'reduced':>8} {'re-searched':>11} {'null cuts':>9} {'refuted':>8}")
+            baseline = full_nodes = None
+            for name, reductions, null_move in CONFIGURATIONS:
+                bot.LATE_MOVE_REDUCTIONS, bot.NULL_MOVE_PRUNING = reductions, null_move
+                actions, seconds, totals = run(samples, depth, args.entries if args.table else 0)
+                if baseline is None:
+                    baseline, full_nodes = actions, totals["nodes"]
+                saved = 1 - totals["nodes"] / max(1, full_nodes)
+                same = sum(action == expected for action, expected in zip(actions, baseline))
+                print(f"  {name:<21} {totals['nodes']:>9} {saved:>6.0%} {seconds:>8.2f} "
+                      f"{same:>5}/{len(samples):<5} {totals['reductions']:>8} {totals['re_searches']:>11} "
+                      f"{totals['null_cutoffs']:>9} {totals['null_refuted']:>8}")
+    finally:
+        bot.LATE_MOVE_REDUCTIONS, bot.NULL_MOVE_PRUNING = settings
+
+
+if __name__ == "__main__":
+    main()
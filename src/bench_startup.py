@@ -0,0 +1,63 @@
+"""
+Benchmark of process startup: how long each entry point takes to become ready in a fresh interpreter.
+
+Every scenario runs in a new `python -c` process, --runs times, and the median and fastest wall
+times are printed after subtracting the cost of starting an empty interpreter. The engine scenarios
+also check that importing them does not import pygame. The GUI scenarios open a window with the
+dummy SDL video driver unless --display is given; "GUI, pygame.init()" is the old startup path that
+initialized every SDL subsystem at import time, for comparison with main.init_display().
+
+Usage: python bench_startup.py [--runs 10] [--display]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+NO_PYGAME = "import sys; assert 'pygame' not in sys.modules, 'the engine imported pygame'"
+
+SCENARIOS = [
+    ("engine (import bot)", f"import bot; {NO_PYGAME}"),
+    ("engine + first search", "import bot; bot.search_best_action([(4, 0), (4, 8)], [], 2, 10, 10, (4, 0)); "
+                              + NO_PYGAME),
+    ("analysis (import analyze)", f"import analyze; {NO_PYGAME}"),
+    ("server (import server)", f"import server; {NO_PYGAME}"),
+    ("GUI, init_display()", "import main; main.init_display()"),
+    ("GUI, pygame.init()", "import main, pygame; pygame.init(); pygame.display.set_mode((main.WIDTH, main.HEIGHT))"),
+]
+
+
+def time_command(code, runs, env):
+    """Wall times in seconds of `runs` fresh interpreters running `code` from this directory."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=directory, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="processes started per scenario")
+    parser.add_argument("--display", action="store_true", help="open real windows instead of using the dummy driver")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    if not args.display:
+        env["SDL_VIDEODRIVER"] = "dummy"
+    interpreter = statistics.median(time_command("pass", args.runs, env))
+    print(f"Empty interpreter: {interpreter * 1000:.1f} ms (subtracted below)")
+    print(f"{'scenario':<28} {'median ms':>10} {'fastest ms':>11}")
+    for name, code in SCENARIOS:
+        times = time_command(code, args.runs, env)
+        print(f"{name:<28} {(statistics.median(times) - interpreter) * 1000:>10.1f} "
+              f"{(min(times) - interpreter) * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark of the shared-memory transposition table against one table per worker process.
+
+Searches the same random midgame positions with search_best_action three ways: in this process
+without a table, with the root actions spread over worker processes that each keep their own table,
+and with workers sharing one SharedTranspositionTable. Prints the Minimax nodes, time, table hits and
+collision rate of each, and checks that all three choose the same actions.
+
+Usage: python bench_transposition.py [--positions 20] [--depth 4] [--workers 4] [--entries 65536]
+"""
+import argparse
+import random
+import time
+
+import bot
+from bench_board_size import random_position
+
+
+def run(samples, depth, parallel=None):
+    """Search every sample; returns (actions, nodes, seconds, summed table counters)."""
+    actions = []
+    nodes = 0
+    counters = {"probes": 0, "hits": 0, "collisions": 0}
+    # search_best_action uses the module's ParallelSearch whenever SEARCH_WORKERS > 1
+    bot._parallel_search = parallel
+    bot.SEARCH_WORKERS = 1 if parallel is None else 2
+    start = time.perf_counter()
+    with bot.quiet():
+        for positions, walls in samples:
+            bot.search_stats["nodes"] = 0
+            action, _ = bot.search_best_action(positions, walls, depth, 5, 5, positions[0])
+            actions.append(action)
+            if parallel is None:
+                nodes += bot.search_stats["nodes"]
+            else:
+                nodes += parallel.stats["nodes"]
+                for name in counters:
+                    counters[name] += parallel.stats[name]
+    return actions, nodes, time.perf_counter() - start, counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--walls", type=int, default=8, help="walls placed in each random position")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--entries", type=int, default=1 << 16, help="entries per table")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [random_position(9, rng, args.walls) for _ in range(args.positions)]
+
+    print(f"{'search':<26} {'nodes':>8} {'seconds':>8} {'hits':>7} {'collision rate':>15}")
+    baseline, nodes, seconds, _ = run(samples, args.depth)
+    print(f"{'single process, no table':<26} {nodes:>8} {seconds:>8.2f} {'-':>7} {'-':>15}")
+    for name, shared in (("per-process tables", False), ("shared table", True)):
+        parallel = bot.ParallelSearch(args.workers, shared, args.entries)
+        try:
+            actions, nodes, seconds, counters = run(samples, args.depth, parallel)
+        finally:
+            parallel.close()
+            bot._parallel_search = None
+        assert actions == baseline, f"{name} chose different actions"
+        rate = counters["collisions"] / max(1, counters["probes"])
+        print(f"{name:<26} {nodes:>8} {seconds:>8.2f} {counters['hits']:>7} {rate:>15.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark of the value network evaluator (valuenet.py) against the heuristic evaluation.
+
+Speed: evaluations per second of evaluate_state, of the network one position at a time, and of the
+network scoring all children of a position in one batch (bot.network_scores, as at depth-1 Minimax
+nodes), on random midgame positions.
+
+Strength: games of search_best_action at the same depth, one side scoring leaves with the network
+and the other with the heuristic, switching sides every game. The first --random-plies actions of
+each game are random so the games differ. Pure searches can shuffle back and forth forever, so games
+still running after --max-actions are adjudicated to the player with the shorter path to their goal
+(the player to move on equal paths).
+
+Usage: python bench_valuenet.py [--net value_net.npz] [--positions 50] [--games 10] [--depth 2]
+"""
+import argparse
+import random
+import time
+
+import bot
+from bench_board_size import random_position
+from rules import GRID_SIZE, decode_action, initial_positions, shortest_path_length
+from state import SearchState, USER, BOT
+
+
+def evaluation_speed(samples, repeats):
+    """Evaluations per second of the heuristic, the network one at a time and the network in batches."""
+    states = [SearchState(positions, walls, 5, 5) for positions, walls in samples]
+    rates = {}
+    with bot.quiet():
+        children = [bot.get_all_possible_bot_actions(state, BOT, state.position(USER)) for state in states]
+        bot.network_scores(states[0], [None], True)  # Load NumPy and the network before timing
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for state in states:
+                bot.evaluate_state(state, state.position(USER))
+        rates["heuristic"] = repeats * len(states) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for state in states:
+                bot.network_scores(state, [None], True)
+        rates["network, one at a time"] = repeats * len(states) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for state, actions in zip(states, children):
+                bot.network_scores(state, actions, True)
+        rates["network, children batched"] = repeats * sum(map(len, children)) / (time.perf_counter() - start)
+    return rates
+
+
+def play_game(evaluators, depth, rng, random_plies, max_actions):
+    """
+    Play one game of search_best_action with a leaf evaluator per side.
+
+    Parameters:
+    - evaluators: [user side, bot side] values for bot.EVALUATOR.
+
+    Returns:
+    - (winner, adjudicated): winner is USER or BOT; adjudicated is True if the game was still running
+      after max_actions.
+    """
+    player_positions = initial_positions(GRID_SIZE)
+    walls = []
+    walls_remaining = [10, 10]
+    to_move = USER
+    for ply in range(max_actions):
+        if ply < random_plies:
+            state = SearchState(player_positions, walls, walls_remaining[USER], walls_remaining[BOT])
+            action = decode_action(rng.choice(bot.get_all_possible_bot_actions(state, to_move,
+                                                                               player_positions[USER])))
+        else:
+            bot.EVALUATOR = evaluators[to_move]
+            action, _ = bot.search_best_action(player_positions, walls, depth, walls_remaining[BOT],
+                                               walls_remaining[USER], player_positions[USER], is_bot=to_move == BOT)
+        if action[0] == "move":
+            player_positions[to_move] = action[1]
+        else:
+            walls.append(action[1])
+            walls_remaining[to_move] -= 1
+        if player_positions[to_move][1] == (GRID_SIZE - 1 if to_move == USER else 0):
+            return to_move, False
+        to_move = 1 - to_move
+    user_position, bot_position = player_positions
+    distances = (shortest_path_length(user_position, GRID_SIZE - 1, walls, bot_position),
+                 shortest_path_length(bot_position, 0, walls, user_position))
+    if distances[USER] == distances[BOT]:
+        return to_move, True
+    return (USER if distances[USER] < distances[BOT] else BOT), True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--net", default=bot.VALUE_NET_PATH, help="value network file (valuenet.py)")
+    parser.add_argument("--positions", type=int, default=50, help="random positions for the speed test")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--random-plies", type=int, default=4)
+    parser.add_argument("--max-actions", type=int, default=100, help="actions before a game is adjudicated")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bot.VALUE_NET_PATH = args.net
+    bot.SEARCH_WORKERS = 1
+    rng = random.Random(args.seed)
+    samples = [random_position(GRID_SIZE, rng, 8) for _ in range(args.positions)]
+    print(f"{'evaluation':<28} {'per second':>11}")
+    for name, rate in evaluation_speed(samples, args.repeats).items():
+        print(f"{name:<28} {rate:>11.0f}")
+
+    evaluator = bot.EVALUATOR
+    wins = {"network": 0, "heuristic": 0}
+    adjudicated = 0
+    start = time.perf_counter()
+    try:
+        with bot.quiet():
+            for game in range(args.games):
+                evaluators = ["network", "heuristic"] if game % 2 == 0 else ["heuristic", "network"]
+                winner, decided_by_paths = play_game(evaluators, args.depth, rng, args.random_plies,
+                                                     args.max_actions)
+                wins[evaluators[winner]] += 1
+                adjudicated += decided_by_paths
+    finally:
+        bot.EVALUATOR = evaluator
+    print(f"Depth {args.depth}, {args.games} games in {time.perf_counter() - start:.1f} s: network {wins['network']}"
+          f" - heuristic {wins['heuristic']} ({adjudicated} adjudicated)")
+
+
+if __name__ == "__main__":
+    main()
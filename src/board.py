@@ -0,0 +1,419 @@
+"""Array-backed Quoridor board for any grid size, with constant-time wall checks and flat-index path searches."""
+from collections import deque
+
+from rules import GRID_SIZE, HORIZONTAL, VERTICAL, DIRECTIONS
+
+# Blocked-edge bit for each entry of DIRECTIONS (up, down, left, right)
+DIRECTION_BITS = (1, 2, 4, 8)
+# Directions perpendicular to each direction, used for diagonal side-steps (in the order rules.py lists them)
+PERPENDICULAR = ((3, 2), (2, 3), (1, 0), (0, 1))
+
+_geometry_cache = {}
+_slot_cache = {}
+_lattice_cache = {}
+
+
+def board_geometry(grid_size):
+    """
+    Return neighbours[cell][direction], the flat index of the adjacent cell or -1 off the board.
+    Cells are numbered y * grid_size + x; the table is built once per board size.
+    """
+    neighbours = _geometry_cache.get(grid_size)
+    if neighbours is None:
+        neighbours = []
+        for cell in range(grid_size * grid_size):
+            x, y = cell % grid_size, cell // grid_size
+            neighbours.append(tuple(
+                (y + dy) * grid_size + x + dx if 0 <= x + dx < grid_size and 0 <= y + dy < grid_size else -1
+                for dx, dy in DIRECTIONS
+            ))
+        _geometry_cache[grid_size] = neighbours
+    return neighbours
+
+
+def wall_slot_tables(grid_size):
+    """
+    Return (slot_walls, slot_edges) for the wall slots of a board size, built once per size.
+
+    Slots are numbered like rules.encode_action: horizontal walls first by the crossing they are
+    centred on, then vertical ones. slot_walls[slot] is the (x, y, orientation) tuple and
+    slot_edges[slot] the two (cell, direction) edges the wall closes (see Board.wall_edges).
+    """
+    tables = _slot_cache.get(grid_size)
+    if tables is None:
+        span = grid_size - 1
+        slot_walls = tuple([(corner % span, corner // span + 1, HORIZONTAL) for corner in range(span * span)] +
+                           [(corner % span + 1, corner // span, VERTICAL) for corner in range(span * span)])
+        slot_edges = tuple(_wall_edges(wall, grid_size) for wall in slot_walls)
+        tables = _slot_cache[grid_size] = (slot_walls, slot_edges)
+    return tables
+
+
+def wall_lattice_points(wall, grid_size=GRID_SIZE):
+    """Indices of the three grid-line crossings a wall runs through (its two ends and its middle)."""
+    x, y, orientation = wall
+    width = grid_size + 1
+    if orientation == HORIZONTAL:
+        return [y * width + x + i for i in range(3)]
+    return [(y + i) * width + x for i in range(3)]
+
+
+def lattice_tables(grid_size):
+    """
+    Return (slot_points, border) for a board size, built once per size: slot_points[slot] lists the
+    grid-line crossings of the wall in a slot (see wall_lattice_points), and border has a 1 for every
+    crossing on the edge of the board, the initial touch counts of Board.lattice.
+    """
+    tables = _lattice_cache.get(grid_size)
+    if tables is None:
+        slot_walls, _ = wall_slot_tables(grid_size)
+        slot_points = tuple(tuple(wall_lattice_points(wall, grid_size)) for wall in slot_walls)
+        width = grid_size + 1
+        border = bytearray(width * width)
+        for i in range(width):
+            for point in (i, grid_size * width + i, i * width, i * width + grid_size):
+                border[point] = 1
+        tables = _lattice_cache[grid_size] = (slot_points, bytes(border))
+    return tables
+
+
+def _wall_edges(wall, size):
+    x, y, orientation = wall
+    if orientation == HORIZONTAL:
+        # Between rows y - 1 and y, columns x and x + 1; crossing it is a step down from row y - 1
+        return ((y - 1) * size + x, 1), ((y - 1) * size + x + 1, 1)
+    # Between columns x - 1 and x, rows y and y + 1; crossing it is a step right from column x - 1
+    return (y * size + x - 1, 3), ((y + 1) * size + x - 1, 3)
+
+
+class Board:
+    """
+    Wall state of a board of any size, stored in arrays sized to the board.
+
+    - blocked: one byte per cell with a DIRECTION_BITS flag for every edge a wall closes.
+    - h_corners / v_corners: one byte per wall anchor (the (grid_size - 1) ** 2 wall crossings).
+    - lattice: for every grid-line crossing, border included, the number of walls (or the border) touching it.
+    - walls: the placed walls as (x, y, orientation) tuples, in placement order.
+
+    Positions are (x, y) tuples like everywhere else; the *_index methods work on flat cell indices
+    and the *_slot methods on integer wall slots (see wall_slot_tables).
+    """
+    __slots__ = ("size", "neighbours", "blocked", "h_corners", "v_corners", "lattice", "walls", "slot_walls",
+                 "slot_edges", "slot_points")
+
+    def __init__(self, grid_size=GRID_SIZE, walls=()):
+        self.size = grid_size
+        self.neighbours = board_geometry(grid_size)
+        self.blocked = bytearray(grid_size * grid_size)
+        self.h_corners = bytearray((grid_size - 1) ** 2)
+        self.v_corners = bytearray((grid_size - 1) ** 2)
+        self.walls = []
+        self.slot_walls, self.slot_edges = wall_slot_tables(grid_size)
+        self.slot_points, border = lattice_tables(grid_size)
+        self.lattice = bytearray(border)
+        for wall in walls:
+            self.place_wall(wall)
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.size = self.size
+        board.neighbours = self.neighbours
+        board.blocked = bytearray(self.blocked)
+        board.h_corners = bytearray(self.h_corners)
+        board.v_corners = bytearray(self.v_corners)
+        board.lattice = bytearray(self.lattice)
+        board.walls = self.walls[:]
+        board.slot_walls = self.slot_walls
+        board.slot_edges = self.slot_edges
+        board.slot_points = self.slot_points
+        return board
+
+    def cell(self, position):
+        x, y = position
+        return y * self.size + x
+
+    def position(self, cell):
+        return cell % self.size, cell // self.size
+
+    def wall_corner(self, wall):
+        """Return the index of the crossing a wall is centred on, or -1 if it sticks out of the board."""
+        x, y, orientation = wall
+        if orientation == HORIZONTAL:
+            corner_x, corner_y = x, y - 1
+        else:
+            corner_x, corner_y = x - 1, y
+        span = self.size - 1
+        if 0 <= corner_x < span and 0 <= corner_y < span:
+            return corner_y * span + corner_x
+        return -1
+
+    def wall_slot(self, wall):
+        """Return the slot index of a wall, or -1 if it sticks out of the board."""
+        corner = self.wall_corner(wall)
+        if corner < 0 or wall[2] == HORIZONTAL:
+            return corner
+        return (self.size - 1) ** 2 + corner
+
+    def is_valid_wall(self, wall):
+        """Same rule as rules.is_valid_wall (in bounds, no overlap or crossing), in constant time."""
+        slot = self.wall_slot(wall)
+        return slot >= 0 and self.is_valid_slot(slot)
+
+    def is_valid_slot(self, slot):
+        """is_valid_wall for a slot index."""
+        span = self.size - 1
+        corner = slot if slot < span * span else slot - span * span
+        if self.h_corners[corner] or self.v_corners[corner]:
+            return False
+        if slot < span * span:
+            # Horizontal walls overlap the ones centred on the crossings to the left and right
+            corner_x = corner % span
+            return not ((corner_x > 0 and self.h_corners[corner - 1]) or
+                        (corner_x < span - 1 and self.h_corners[corner + 1]))
+        corner_y = corner // span
+        return not ((corner_y > 0 and self.v_corners[corner - span]) or
+                    (corner_y < span - 1 and self.v_corners[corner + span]))
+
+    def wall_edges(self, wall):
+        """The two (cell, direction) edges on the first side of a wall; the wall closes them both ways."""
+        return _wall_edges(wall, self.size)
+
+    def _set_wall(self, wall, present):
+        self._set_slot(self.wall_slot(wall), present)
+
+    def _set_slot(self, slot, present):
+        span_squared = (self.size - 1) ** 2
+        if slot < span_squared:
+            self.h_corners[slot] = present
+        else:
+            self.v_corners[slot - span_squared] = present
+        change = 1 if present else -1
+        for point in self.slot_points[slot]:
+            self.lattice[point] += change
+        for cell, direction in self.slot_edges[slot]:
+            other = self.neighbours[cell][direction]
+            back = direction - 1  # down <-> up, right <-> left
+            if present:
+                self.blocked[cell] |= DIRECTION_BITS[direction]
+                self.blocked[other] |= DIRECTION_BITS[back]
+            else:
+                self.blocked[cell] &= ~DIRECTION_BITS[direction]
+                self.blocked[other] &= ~DIRECTION_BITS[back]
+
+    def place_wall(self, wall):
+        """Place a wall (assumed valid) on the board."""
+        self._set_wall(wall, 1)
+        self.walls.append(wall)
+
+    def remove_wall(self, wall):
+        """Take back a wall placed with place_wall."""
+        self._set_wall(wall, 0)
+        self.walls.remove(wall)
+
+    def place_slot(self, slot):
+        """place_wall for a slot index."""
+        self._set_slot(slot, 1)
+        self.walls.append(self.slot_walls[slot])
+
+    def remove_slot(self, slot):
+        """Take back the most recent wall placed with place_slot."""
+        self._set_slot(slot, 0)
+        self.walls.pop()
+
+    def is_wall_blocking_move(self, position, move):
+        """Check if a wall blocks a single step between two adjacent cells."""
+        x, y = position
+        move_x, move_y = move
+        direction = DIRECTIONS.index((move_x - x, move_y - y))
+        return bool(self.blocked[y * self.size + x] & DIRECTION_BITS[direction])
+
+    def pawn_moves_index(self, cell, opponent_cell=-1):
+        """Flat-index version of pawn_moves."""
+        neighbours = self.neighbours
+        blocked = self.blocked
+        moves = []
+        for direction in range(4):
+            neighbour = neighbours[cell][direction]
+            if neighbour < 0 or blocked[cell] & DIRECTION_BITS[direction]:
+                continue
+            if neighbour != opponent_cell:
+                moves.append(neighbour)
+                continue
+
+            # The opponent is adjacent: jump straight over it if nothing is behind it
+            jump = neighbours[neighbour][direction]
+            if jump >= 0 and not blocked[neighbour] & DIRECTION_BITS[direction]:
+                moves.append(jump)
+                continue
+
+            # Otherwise step diagonally to either side of the opponent
+            for side_direction in PERPENDICULAR[direction]:
+                side = neighbours[neighbour][side_direction]
+                if side >= 0 and not blocked[neighbour] & DIRECTION_BITS[side_direction]:
+                    moves.append(side)
+        return moves
+
+    def pawn_moves(self, position, opponent_position=None):
+        """Same moves as rules.get_all_possible_moves, including straight and diagonal jumps."""
+        opponent_cell = -1 if opponent_position is None else self.cell(opponent_position)
+        return [self.position(cell) for cell in self.pawn_moves_index(self.cell(position), opponent_cell)]
+
+    def distance_field(self, goal_y):
+        """
+        Steps from every cell to the goal row (pawns ignored), by a multi-source BFS.
+
+        Returns:
+        - Flat list indexed by cell, float('inf') for cells cut off from the goal row.
+        """
+        return self.distance_field_from(range(goal_y * self.size, goal_y * self.size + self.size))
+
+    def distance_field_from(self, goal_cells):
+        """Steps from every cell to the nearest of `goal_cells` (flat indices); see distance_field."""
+        neighbours = self.neighbours
+        blocked = self.blocked
+        field = [float('inf')] * (self.size * self.size)
+        queue = deque(goal_cells)
+        for cell in queue:
+            field[cell] = 0
+
+        while queue:
+            cell = queue.popleft()
+            dist = field[cell] + 1
+            walls_here = blocked[cell]
+            for direction in range(4):
+                neighbour = neighbours[cell][direction]
+                if neighbour >= 0 and not walls_here & DIRECTION_BITS[direction] and field[neighbour] > dist:
+                    field[neighbour] = dist
+                    queue.append(neighbour)
+        return field
+
+    def shortest_path_length(self, start, goal_y, opponent_position=None):
+        """Same result as rules.shortest_path_length, by BFS over flat cell indices."""
+        opponent_cell = -1 if opponent_position is None else self.cell(opponent_position)
+        return self.shortest_path_length_index(self.cell(start), goal_y, opponent_cell)
+
+    def shortest_path_length_index(self, start_cell, goal_y, opponent_cell=-1):
+        """Flat-index version of shortest_path_length."""
+        size = self.size
+        dist = {start_cell: 0}
+        queue = deque([start_cell])
+        while queue:
+            cell = queue.popleft()
+            if cell // size == goal_y:
+                return dist[cell]
+            for move in self.pawn_moves_index(cell, opponent_cell):
+                if move not in dist:
+                    dist[move] = dist[cell] + 1
+                    queue.append(move)
+        return float('inf')
+
+    def is_path_open(self, start, goal_y):
+        """Check if a cell can still reach the goal row, by depth-first search with early exit."""
+        size = self.size
+        neighbours = self.neighbours
+        blocked = self.blocked
+        start_cell = self.cell(start)
+        seen = bytearray(size * size)
+        seen[start_cell] = 1
+        stack = [start_cell]
+        while stack:
+            cell = stack.pop()
+            if cell // size == goal_y:
+                return True
+            walls_here = blocked[cell]
+            for direction in range(4):
+                neighbour = neighbours[cell][direction]
+                if neighbour >= 0 and not walls_here & DIRECTION_BITS[direction] and not seen[neighbour]:
+                    seen[neighbour] = 1
+                    stack.append(neighbour)
+        return False
+
+    def may_enclose_slot(self, slot):
+        """
+        False if the wall in a slot touches the placed walls and the border in fewer than two crossings:
+        such a wall cannot close off a region, so it cannot cut any pawn off its goal.
+        """
+        lattice = self.lattice
+        first, middle, last = self.slot_points[slot]
+        return (lattice[first] > 0) + (lattice[middle] > 0) + (lattice[last] > 0) >= 2
+
+    def path_edges(self, start, goal_y):
+        """
+        The edges of one shortest path from a cell to the goal row (pawns ignored), by BFS.
+
+        Returns:
+        - Set of edges as the (cell, direction) pairs of Board.wall_edges (steps down or right), or None
+          if the goal row can't be reached.
+        """
+        size = self.size
+        neighbours = self.neighbours
+        blocked = self.blocked
+        start_cell = self.cell(start)
+        parent = {start_cell: None}
+        queue = deque([start_cell])
+        while queue:
+            cell = queue.popleft()
+            if cell // size == goal_y:
+                edges = set()
+                while parent[cell] is not None:
+                    previous, direction = parent[cell]
+                    # Name each edge from its upper or left cell, as wall_edges does
+                    edges.add((previous, direction) if direction in (1, 3) else (cell, direction + 1))
+                    cell = previous
+                return edges
+            walls_here = blocked[cell]
+            for direction in range(4):
+                neighbour = neighbours[cell][direction]
+                if neighbour >= 0 and not walls_here & DIRECTION_BITS[direction] and neighbour not in parent:
+                    parent[neighbour] = (cell, direction)
+                    queue.append(neighbour)
+        return None
+
+    def slot_keeps_paths_open(self, slot, pawns):
+        """wall_keeps_paths_open for a slot index, always searching the paths."""
+        self._set_slot(slot, 1)
+        try:
+            return all(self.is_path_open(position, goal_y) for position, goal_y in pawns)
+        finally:
+            self._set_slot(slot, 0)
+
+    def wall_keeps_paths_open(self, wall, pawns):
+        """
+        Check that placing `wall` leaves every pawn a path to its goal row.
+
+        Parameters:
+        - wall: A wall that passes is_valid_wall.
+        - pawns: Iterable of ((x, y), goal_y) pairs.
+        """
+        slot = self.wall_slot(wall)
+        return not self.may_enclose_slot(slot) or self.slot_keeps_paths_open(slot, pawns)
+
+    def all_wall_slots(self):
+        """Every wall anchor on the board, horizontal slots first."""
+        span = self.size - 1
+        slots = [(x, y + 1, HORIZONTAL) for y in range(span) for x in range(span)]
+        slots += [(x + 1, y, VERTICAL) for x in range(span) for y in range(span)]
+        return slots
+
+    def legal_walls(self, pawns):
+        """
+        All walls that can be placed without overlap and without cutting off any of `pawns`, in slot order.
+
+        Only walls that may enclose a region (may_enclose_slot) are checked, and only for the pawns whose
+        shortest path (path_edges, found once) they cross: every other pawn keeps that path.
+        """
+        pawns = list(pawns)
+        paths = [self.path_edges(position, goal_y) for position, goal_y in pawns]
+        slot_edges = self.slot_edges
+        legal = []
+        for slot, wall in enumerate(self.slot_walls):
+            if not self.is_valid_slot(slot):
+                continue
+            if self.may_enclose_slot(slot):
+                first, second = slot_edges[slot]
+                crossed = [pawn for pawn, path in zip(pawns, paths)
+                           if path is None or first in path or second in path]
+                if crossed and not self.slot_keeps_paths_open(slot, crossed):
+                    continue
+            legal.append(wall)
+        return legal
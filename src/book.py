@@ -0,0 +1,133 @@
+"""
+Opening book: the bot's searched best action in the positions of the first plies of a game.
+
+Positions are stored under SearchState.canonical_key, so a position and its left-right mirror image
+share one entry, and actions are stored in the canonical orientation and mapped back on lookup.
+The book is built from the starting position by following the bot's best action at --depth and the
+user's --width best-ranked actions (get_all_possible_bot_actions) for --plies plies; a bot position
+whose mirror image or a transposition of it is already in the book is not searched again.
+
+The file is JSON: the fingerprint of the evaluation settings the actions were searched under (see
+bot.evaluation_fingerprint), their depth and {key: action code}. A book searched under other settings
+is ignored by open_book.
+
+Usage: python book.py [--plies 6] [--width 3] [--depth 4] [--out opening_book.json]
+"""
+import argparse
+import json
+import os
+
+from rules import encode_action, game_over, initial_positions
+from state import SearchState, USER, BOT
+
+
+class OpeningBook:
+    """
+    Book actions by canonical position key.
+
+    Parameters:
+    - depth: Search depth the actions were found at.
+    - entries: Optional {key: action code in the canonical orientation}.
+    """
+
+    def __init__(self, depth, entries=None):
+        self.depth = depth
+        self.entries = {} if entries is None else entries
+
+    def lookup(self, state, user_last_position):
+        """Return the bot's book action code for a SearchState in its own orientation, or None."""
+        key, mirrored = state.canonical_key(True, user_last_position)
+        code = self.entries.get(key)
+        if code is None:
+            return None
+        return state.mirror_code(code) if mirrored else code
+
+    def add(self, state, user_last_position, code):
+        """Store the bot's action code for a SearchState (in its own orientation)."""
+        key, mirrored = state.canonical_key(True, user_last_position)
+        self.entries[key] = state.mirror_code(code) if mirrored else code
+
+    def save(self, path, fingerprint):
+        with open(path, "w") as book_file:
+            json.dump({"fingerprint": fingerprint, "depth": self.depth,
+                       "entries": {str(key): code for key, code in self.entries.items()}}, book_file)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def open_book(path, fingerprint):
+    """Load a book; None if it is missing, unreadable or was searched under other settings."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as book_file:
+            data = json.load(book_file)
+        if data["fingerprint"] != fingerprint:
+            return None
+        return OpeningBook(data["depth"], {int(key): code for key, code in data["entries"].items()})
+    except (ValueError, KeyError, OSError):
+        return None
+
+
+def build_book(plies, width, depth):
+    """
+    Search the bot positions of the opening tree (see the module docstring).
+
+    Returns:
+    - (book, stats), stats counting the positions searched and those found in the book already.
+    """
+    import bot  # bot opens books with this module, so it is imported on use
+
+    book = OpeningBook(depth)
+    stats = {"searched": 0, "in_book": 0}
+    player_positions = initial_positions()
+    state = SearchState(player_positions, [], 10, 10)
+
+    def visit(to_move, user_last_position, ply):
+        if ply >= plies or game_over(state.positions()):
+            return
+        # The user's position before their last action, as bot_turn is given it
+        next_last_position = state.position(USER)
+        if to_move == BOT:
+            if book.lookup(state, user_last_position) is not None:
+                stats["in_book"] += 1
+                return
+            action, _ = bot.search_best_action(state.positions(), list(state.board.walls), depth,
+                                               state.walls_remaining[BOT], state.walls_remaining[USER],
+                                               user_last_position)
+            if action is None:
+                return
+            stats["searched"] += 1
+            codes = [encode_action(action)]
+            book.add(state, user_last_position, codes[0])
+        else:
+            codes = bot.get_all_possible_bot_actions(state, USER, user_last_position)[:width]
+        for code in codes:
+            state.apply(code, to_move)
+            visit(1 - to_move, next_last_position, ply + 1)
+            state.undo()
+
+    with bot.quiet():
+        visit(USER, player_positions[USER], 0)
+    return book, stats
+
+
+def main():
+    import bot
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plies", type=int, default=6, help="plies of the opening tree, counting both sides")
+    parser.add_argument("--width", type=int, default=3, help="user actions followed in each user position")
+    parser.add_argument("--depth", type=int, default=4, help="search depth of the bot positions")
+    parser.add_argument("--out", default=bot.BOOK_PATH, help="book file to write")
+    args = parser.parse_args()
+
+    book, stats = build_book(args.plies, args.width, args.depth)
+    book.save(args.out, bot.evaluation_fingerprint())
+    print(f"{len(book)} positions stored in {args.out}; {stats['searched']} searched, "
+          f"{stats['in_book']} found in the book as mirror images or transpositions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1268 @@
+"""Bot decision making: board evaluation, action generation and Minimax search."""
+import contextlib
+import json
+import math
+import os
+import random
+import time
+from collections import namedtuple
+
+from rules import (
+    GRID_SIZE, HORIZONTAL, VERTICAL, causes_overlap, is_path_open, shortest_path_length,
+    get_all_possible_moves, game_over, is_valid_wall, decode_action, illegal_reason
+)
+from mcts import MCTSBot, distance_field, keeps_paths_open, path_blocking_walls
+from state import SearchState, USER, BOT
+from ttable import EXACT, LOWER, UPPER, NO_MOVE, SharedTranspositionTable, TranspositionTable
+from evalcache import open_eval_cache, settings_fingerprint
+from book import open_book
+from timecontrol import SearchTimeout
+
+# Shared MCTS searcher so its tree is reused from one bot turn to the next
+MCTS_BOT = MCTSBot()
+
+# The bot prints its reasoning (choke points found, actions chosen and why) while VERBOSE is set; scripts that
+# run many searches turn it off with quiet()
+VERBOSE = True
+
+
+def say(message):
+    """Print a line of the bot's reasoning if VERBOSE is set."""
+    if VERBOSE:
+        print(message)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Keep the bot's reasoning out of the output inside the block."""
+    global VERBOSE
+    verbose = VERBOSE
+    VERBOSE = False
+    try:
+        yield
+    finally:
+        VERBOSE = verbose
+
+# Evaluation coefficients and bot_turn thresholds; tuner.py writes tuned values to WEIGHTS_PATH
+DEFAULT_WEIGHTS = {
+    "bot_distance": 10,
+    "user_distance": 15,
+    "wall_advantage": 2,
+    "choke_points": 5,
+    "early_turns": 6,  # Turns played in the early phase
+    "block_distance": 2,  # Block the user once they are this close to their goal
+}
+WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weights.json")
+
+
+def load_weights(path=WEIGHTS_PATH):
+    """Return DEFAULT_WEIGHTS updated with the values from a weights file, if there is one."""
+    weights = dict(DEFAULT_WEIGHTS)
+    if os.path.exists(path):
+        with open(path) as weights_file:
+            weights.update(json.load(weights_file))
+    return weights
+
+
+WEIGHTS = load_weights()
+
+# Leaf extension of the Minimax search: settled pawn races are scored as won or lost, and the side
+# losing the race may keep placing walls that lengthen the opponent's path for FORCING_WALL_PLIES plies
+RACE_EXTENSION = True
+FORCING_WALL_PLIES = 2
+MAX_FORCING_WALLS = 4
+RACE_WIN_SCORE = 1000
+
+# Selective Minimax (both off gives the full-width search):
+# - late-move reductions: at depth LMR_MIN_DEPTH or more, the actions ranked LMR_MIN_INDEX or later are first
+#   searched LMR_REDUCTION plies shallower with a zero-width window, and at full depth if they beat the best so far
+# - null-move pruning: a node at depth NULL_MOVE_MIN_DEPTH or more whose opponent cannot get below its bound with
+#   two actions in a row is cut, once a search of its own actions NULL_MOVE_REDUCTION plies shallower agrees
+LATE_MOVE_REDUCTIONS = True
+LMR_MIN_DEPTH = 3
+LMR_MIN_INDEX = 2
+LMR_REDUCTION = 1
+NULL_MOVE_PRUNING = True
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+
+# Learned evaluation (valuenet.py): with EVALUATOR = "network", Minimax leaves are scored by the value network in
+# VALUE_NET_PATH, the children of a depth-1 node in one batch. Won games and settled pawn races keep the scores
+# race_extension gives them; the network's estimate of the result is scaled to +/- NETWORK_SCORE_SCALE
+EVALUATOR = "heuristic"
+VALUE_NET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "value_net.npz")
+NETWORK_SCORE_SCALE = 100
+
+_value_net = None  # Loaded on the first network evaluation
+
+# Nodes visited by minimax in this process, and what the selective search did, for benchmarks
+search_stats = {"nodes": 0, "reductions": 0, "re_searches": 0, "null_cutoffs": 0, "null_refuted": 0}
+
+# Parallel Minimax: with SEARCH_WORKERS > 1, search_best_action scores its root actions in worker
+# processes that share one transposition table in shared memory (one table each without SHARED_TABLE)
+SEARCH_WORKERS = 1
+SHARED_TABLE = True
+TABLE_ENTRIES = 1 << 18
+
+# Transposition tables store a position and its left-right mirror image under one key
+# (SearchState.canonical_key); the evaluation cache and the opening book always do
+CANONICAL_KEYS = True
+
+_parallel_search = None  # Started on the first parallel search
+_worker_table = None  # The table of this process when it is a search worker
+
+# Searches under a clock (timed_search): iterative deepening up to TIMED_MAX_DEPTH plies, abandoned once
+# _clock() passes _deadline; minimax reads the clock every _check_nodes (DEADLINE_CHECK_NODES) nodes
+TIMED_MAX_DEPTH = 8
+TIMED_TABLE_ENTRIES = 1 << 16
+DEADLINE_CHECK_NODES = 64
+
+_deadline = None
+_clock = time.monotonic
+_check_nodes = DEADLINE_CHECK_NODES
+
+# Difficulty levels (level_search): iterative deepening up to max_depth plies, stopped once node_budget Minimax nodes
+# or time_limit seconds are used, then a random choice among the root actions scoring within margin of the best.
+# Their limits are short next to the cost of a node, so level searches read the clock every LEVEL_CHECK_NODES nodes
+DifficultyLevel = namedtuple("DifficultyLevel", ["max_depth", "node_budget", "time_limit", "margin"])
+DIFFICULTY_LEVELS = {
+    "beginner": DifficultyLevel(max_depth=1, node_budget=20, time_limit=0.02, margin=30),
+    "easy": DifficultyLevel(max_depth=2, node_budget=100, time_limit=0.05, margin=15),
+    "medium": DifficultyLevel(max_depth=3, node_budget=400, time_limit=0.2, margin=5),
+    "hard": DifficultyLevel(max_depth=4, node_budget=1500, time_limit=0.5, margin=0),
+    "expert": DifficultyLevel(max_depth=6, node_budget=6000, time_limit=2.0, margin=0),
+}
+LEVEL_CHECK_NODES = 1
+
+_node_limit = None  # Minimax raises SearchTimeout once search_stats["nodes"] reaches it
+_move_deadline = None  # Cap on every search of a bot turn, a time.monotonic() value (see move_deadline)
+
+# Search results computed offline (analyze.py --cache); bot_turn plays a cached action instead of searching
+EVAL_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_cache.qevc")
+# Bumped whenever search scores change meaning (2: finished games scored by terminal_score), so that
+# evaluation caches searched by older versions are ignored
+SCORE_VERSION = 2
+
+
+def evaluation_fingerprint():
+    """Fingerprint of the settings search scores depend on, so caches from other settings are ignored."""
+    return settings_fingerprint(dict(WEIGHTS, score_version=SCORE_VERSION, race_extension=RACE_EXTENSION,
+                                     forcing_wall_plies=FORCING_WALL_PLIES, max_forcing_walls=MAX_FORCING_WALLS,
+                                     evaluator=EVALUATOR,
+                                     late_move_reductions=LATE_MOVE_REDUCTIONS and (LMR_MIN_DEPTH, LMR_MIN_INDEX,
+                                                                                    LMR_REDUCTION),
+                                     null_move_pruning=NULL_MOVE_PRUNING and (NULL_MOVE_MIN_DEPTH,
+                                                                              NULL_MOVE_REDUCTION)))
+
+
+EVAL_CACHE = open_eval_cache(EVAL_CACHE_PATH, evaluation_fingerprint())
+
+# Opening book searched offline (book.py); bot_turn plays a book action before anything else
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.json")
+BOOK = open_book(BOOK_PATH, evaluation_fingerprint())
+
+
+def reopen_eval_cache():
+    """
+    Reopen EVAL_CACHE and reload BOOK for the current settings, so results searched under other settings
+    are not used.
+    """
+    global EVAL_CACHE, BOOK
+    if EVAL_CACHE is not None:
+        EVAL_CACHE.close()
+    EVAL_CACHE = open_eval_cache(EVAL_CACHE_PATH, evaluation_fingerprint())
+    BOOK = open_book(BOOK_PATH, evaluation_fingerprint())
+
+
+def set_weights(weights):
+    """Update WEIGHTS (e.g. with tuner candidates) and reopen the evaluation cache for them."""
+    WEIGHTS.update(weights)
+    reopen_eval_cache()
+
+
+def bot_move(bot_position, user_position, walls, history):
+    """
+    Determine the bot's next move towards its goal, considering walls and user position.
+
+    Parameters:
+    - bot_position: (x, y) tuple representing the bot's current position.
+    - user_position: (x, y) tuple representing the user's current position.
+    - walls: List of wall positions [(wall_x, wall_y, orientation)].
+    - history: Set of previously visited positions to avoid oscillation.
+
+    Returns:
+    - (move_x, move_y): The bot's next position.
+    """
+    goal_y = 0  # Bot's goal is to reach any cell at y = 0 (user's side)
+
+    # Add all valid moves (including jumps over the user) that were not visited before
+    possible_moves = [move for move in get_all_possible_moves(bot_position, walls, user_position)
+                      if move not in history]
+
+    # If there are valid moves, choose the one that minimizes the path length to the goal
+    if possible_moves:
+        best_move = min(possible_moves, key=lambda pos: shortest_path_length(pos, goal_y, walls))
+        history.add(best_move)
+        return best_move
+
+    return bot_position   # No move if no possible moves
+
+
+def evaluate_board(player_positions, user_last_position, walls, bot_walls_remaining, user_walls_remaining):
+    """
+    Evaluate the game state for the bot.
+    """
+    user_position, bot_position = player_positions
+
+    # Calculate shortest paths
+    user_distance = shortest_path_length(user_position, GRID_SIZE - 1, walls, bot_position)
+    bot_distance = shortest_path_length(bot_position, 0, walls, user_position)
+
+    # Wall advantage
+    wall_advantage = bot_walls_remaining - user_walls_remaining
+
+    # Choke point proximity
+    choke_points = find_choke_points(player_positions, user_last_position, walls)
+    choke_score = len(choke_points)
+
+    return weighted_score(bot_distance, user_distance, wall_advantage, choke_score)
+
+
+def weighted_score(bot_distance, user_distance, wall_advantage, choke_score):
+    """Scoring formula of evaluate_board."""
+    return (WEIGHTS["bot_distance"] * bot_distance) - (WEIGHTS["user_distance"] * user_distance) + \
+        (WEIGHTS["wall_advantage"] * wall_advantage) + (WEIGHTS["choke_points"] * choke_score)
+
+
+def minimax(state, depth, alpha, beta, maximizing_player, user_last_position, table=None, allow_null=True):
+    """
+    Minimax algorithm with Alpha-Beta Pruning for both moves and wall placements, with the
+    late-move reductions and null-move pruning configured above.
+
+    Parameters:
+    - state: SearchState of the position; actions are applied and undone in place.
+    - depth: Current depth of the Minimax recursion.
+    - alpha: Alpha value for pruning.
+    - beta: Beta value for pruning.
+    - maximizing_player: Boolean indicating whether it's the bot's turn.
+    - user_last_position: Last position of the user (x, y).
+    - table: Optional TranspositionTable (see ttable.py) for scores and best actions of searched positions.
+    - allow_null: False right after a null move, so the same player never passes twice in a row.
+
+    Returns:
+    - The best score from the evaluated actions.
+    """
+    search_stats["nodes"] += 1
+    if _deadline is not None and not search_stats["nodes"] % _check_nodes and _clock() >= _deadline:
+        raise SearchTimeout
+    if _node_limit is not None and search_stats["nodes"] >= _node_limit:
+        raise SearchTimeout
+    if _move_deadline is not None and not search_stats["nodes"] % DEADLINE_CHECK_NODES and \
+       time.monotonic() >= _move_deadline:
+        raise SearchTimeout
+    player_positions = state.positions()
+    if game_over(player_positions):
+        return terminal_score(player_positions, depth)
+    if EVALUATOR == "network" and depth == 0:
+        return network_scores(state, [None], maximizing_player)[0]
+    if depth == 0:
+        if RACE_EXTENSION:
+            return race_extension(state, alpha, beta, maximizing_player, user_last_position, FORCING_WALL_PLIES)
+        return evaluate_state(state, user_last_position)
+
+    # Reuse a stored result if it was searched deep enough, otherwise try its best action first
+    table_action = NO_MOVE
+    if table is not None:
+        if CANONICAL_KEYS:
+            key, mirrored = state.canonical_key(maximizing_player, user_last_position)
+        else:
+            key, mirrored = state.search_key(maximizing_player, user_last_position), False
+        entry = table.probe(key)
+        if entry is not None:
+            entry_depth, bound, score, table_action = entry
+            if entry_depth >= depth and (bound == EXACT or (bound == LOWER and score >= beta) or
+                                         (bound == UPPER and score <= alpha)):
+                return score
+            if mirrored and table_action != NO_MOVE:
+                table_action = state.mirror_code(table_action)
+        alpha_before, beta_before = alpha, beta
+
+    if NULL_MOVE_PRUNING and allow_null and depth >= NULL_MOVE_MIN_DEPTH:
+        score = null_move_cutoff(state, depth, alpha, beta, maximizing_player, user_last_position, table)
+        if score is not None:
+            return score
+
+    best_action = NO_MOVE
+    reduce_late = LATE_MOVE_REDUCTIONS and depth >= LMR_MIN_DEPTH
+    # Get all possible actions of the player to move
+    possible_actions = get_all_possible_bot_actions(state, BOT if maximizing_player else USER, user_last_position)
+    if table_action in possible_actions:
+        possible_actions.remove(table_action)
+        possible_actions.insert(0, table_action)
+    leaf_scores = None
+    if EVALUATOR == "network" and depth == 1:
+        leaf_scores = network_scores(state, possible_actions, maximizing_player)
+        search_stats["nodes"] += len(possible_actions)
+
+    if maximizing_player:  # Bot's turn
+        best_eval = float('-inf')
+
+        for index, action in enumerate(possible_actions):
+            if leaf_scores is not None:
+                eval = leaf_scores[index]
+            else:
+                # Apply the action, search below it and take it back
+                apply_action(state, action, is_bot=True)
+                if reduce_late and index >= LMR_MIN_INDEX:
+                    eval = reduced_search(state, depth, alpha, beta, False, user_last_position, table)
+                else:
+                    eval = minimax(state, depth - 1, alpha, beta, False, user_last_position, table)  # Minimizing next
+                state.undo()
+            if eval > best_eval:
+                best_eval, best_action = eval, action
+            alpha = max(alpha, eval)
+            if beta <= alpha:
+                break
+
+    else:  # User's turn
+        best_eval = float('inf')
+
+        for index, action in enumerate(possible_actions):
+            if leaf_scores is not None:
+                eval = leaf_scores[index]
+            else:
+                # Apply the action, search below it and take it back
+                apply_action(state, action, is_bot=False)
+                if reduce_late and index >= LMR_MIN_INDEX:
+                    eval = reduced_search(state, depth, alpha, beta, True, user_last_position, table)
+                else:
+                    eval = minimax(state, depth - 1, alpha, beta, True, user_last_position, table)  # Maximizing next
+                state.undo()
+            if eval < best_eval:
+                best_eval, best_action = eval, action
+            beta = min(beta, eval)
+            if beta <= alpha:
+                break
+
+    if table is not None:
+        if best_eval <= alpha_before:
+            bound = UPPER
+        elif best_eval >= beta_before:
+            bound = LOWER
+        else:
+            bound = EXACT
+        if mirrored and best_action != NO_MOVE:
+            best_action = state.mirror_code(best_action)
+        table.store(key, depth, bound, best_eval, best_action)
+    return best_eval
+
+
+def terminal_score(player_positions, depth):
+    """
+    Score of a finished game for the bot: RACE_WIN_SCORE plus the plies of search left, positive if the
+    bot won. A won game thus outscores every settled race (RACE_WIN_SCORE minus a distance of at least
+    one), and a sooner win (more plies left) outscores a later one.
+    """
+    score = RACE_WIN_SCORE + depth
+    return score if player_positions[BOT][1] == 0 else -score
+
+
+def reduced_search(state, depth, alpha, beta, maximizing_player, user_last_position, table):
+    """
+    Late-move reduction: search a late action of a node at `depth` (already applied to `state`)
+    LMR_REDUCTION plies shallower, with a zero-width window at the bound of the player who chose it,
+    and at full depth and window only if it looks better than that player's best action so far.
+
+    Parameters:
+    - Same as minimax, for the position after the action; `depth` is the depth of the node choosing it.
+
+    Returns:
+    - The score of the action, exact enough for the node to compare with its best so far.
+    """
+    search_stats["reductions"] += 1
+    reduced = max(0, depth - 1 - LMR_REDUCTION)
+    if maximizing_player:  # The user chose the action; it is interesting if it gets below beta
+        score = minimax(state, reduced, math.nextafter(beta, -math.inf), beta, True,
+                        user_last_position, table)
+        if score >= beta:
+            return score
+    else:
+        score = minimax(state, reduced, alpha, math.nextafter(alpha, math.inf), False,
+                        user_last_position, table)
+        if score <= alpha:
+            return score
+    search_stats["re_searches"] += 1
+    return minimax(state, depth - 1, alpha, beta, maximizing_player, user_last_position, table)
+
+
+def null_move_cutoff(state, depth, alpha, beta, maximizing_player, user_last_position, table):
+    """
+    Null-move pruning adapted to Quoridor, where passing is not a legal action.
+
+    The player to move passes and the opponent's reply is searched NULL_MOVE_REDUCTION plies shallower
+    with a zero-width window at the node's bound. If even two opponent actions in a row cannot get
+    past it, the node would most likely fail high. Pawn races are the exception: having to move can be
+    worse than passing there (stepping in front of the other pawn lets it jump), so a fail high is only
+    trusted once a search of the player's own actions, NULL_MOVE_REDUCTION plies shallower, confirms it.
+
+    Parameters:
+    - Same as minimax.
+
+    Returns:
+    - The verified score to cut the node with, or None to search it normally.
+    """
+    reduced = max(0, depth - 1 - NULL_MOVE_REDUCTION)
+    if maximizing_player:
+        if beta == math.inf:
+            return None
+        score = minimax(state, reduced, math.nextafter(beta, -math.inf), beta, False, user_last_position, table,
+                        allow_null=False)
+        if score < beta:
+            return None
+        verified = minimax(state, max(0, depth - NULL_MOVE_REDUCTION), alpha, beta, True, user_last_position, table,
+                           allow_null=False)
+        fails_high = verified >= beta
+    else:
+        if alpha == -math.inf:
+            return None
+        score = minimax(state, reduced, alpha, math.nextafter(alpha, math.inf), True, user_last_position, table,
+                        allow_null=False)
+        if score > alpha:
+            return None
+        verified = minimax(state, max(0, depth - NULL_MOVE_REDUCTION), alpha, beta, False, user_last_position, table,
+                           allow_null=False)
+        fails_high = verified <= alpha
+    if not fails_high:
+        search_stats["null_refuted"] += 1
+        return None
+    search_stats["null_cutoffs"] += 1
+    return verified
+
+
+def get_value_net():
+    """
+    The value network in VALUE_NET_PATH, loaded (with NumPy) on first use.
+
+    Raises ValueError if the network was trained for another board size than GRID_SIZE.
+    """
+    global _value_net
+    if _value_net is None:
+        from valuenet import ValueNet
+        net = ValueNet.load(VALUE_NET_PATH)
+        if net.grid_size != GRID_SIZE:
+            raise ValueError(f"{VALUE_NET_PATH} is a network for {net.grid_size}x{net.grid_size} boards, "
+                             f"not {GRID_SIZE}x{GRID_SIZE}")
+        _value_net = net
+    return _value_net
+
+
+def network_scores(state, actions, maximizing_player):
+    """
+    Value network scores of the positions after each of `actions`, evaluated in one batch.
+
+    Parameters:
+    - state: SearchState of the position; actions are applied and undone in place.
+    - actions: Action codes of the player to move, or None to score the position itself.
+    - maximizing_player: Boolean indicating whether it's the bot's turn.
+
+    Returns:
+    - List of scores for the bot, one per action: +/- (RACE_WIN_SCORE - the winner's distance) for won
+      games and settled races, otherwise the network's estimate times NETWORK_SCORE_SCALE.
+    """
+    batch = get_value_net().batch(len(actions))
+    children = []  # (bot to move, bot walls, user walls) of every scored position
+    for index, action in enumerate(actions):
+        bot_to_move = maximizing_player
+        if action is not None:
+            apply_action(state, action, is_bot=maximizing_player)
+            bot_to_move = not maximizing_player
+        batch.set(index, state, bot_to_move)
+        children.append((bot_to_move, state.walls_remaining[BOT], state.walls_remaining[USER]))
+        if action is not None:
+            state.undo()
+    user_distances, bot_distances = batch.distances()
+    values = _value_net.predict(batch.inputs)
+
+    scores = []
+    for index, (bot_to_move, bot_walls_remaining, user_walls_remaining) in enumerate(children):
+        user_distance, bot_distance = int(user_distances[index]), int(bot_distances[index])
+        winner = race_winner(user_distance, bot_distance, bot_to_move, bot_walls_remaining, user_walls_remaining)
+        if bot_distance == 0 or winner == 1:
+            scores.append(RACE_WIN_SCORE - bot_distance)
+        elif user_distance == 0 or winner == 0:
+            scores.append(-RACE_WIN_SCORE + user_distance)
+        else:
+            scores.append(float(values[index]) * NETWORK_SCORE_SCALE)
+    return scores
+
+
+def evaluate_state(state, user_last_position):
+    """evaluate_board for a SearchState, with the path lengths measured on its board."""
+    board = state.board
+    user_cell, bot_cell = state.cells
+    user_distance = board.shortest_path_length_index(user_cell, GRID_SIZE - 1, bot_cell)
+    bot_distance = board.shortest_path_length_index(bot_cell, 0, user_cell)
+    wall_advantage = state.walls_remaining[BOT] - state.walls_remaining[USER]
+    choke_score = len(find_choke_points(state.positions(), user_last_position, board.walls))
+    return weighted_score(bot_distance, user_distance, wall_advantage, choke_score)
+
+
+def race_winner(user_distance, bot_distance, maximizing_player, bot_walls_remaining, user_walls_remaining):
+    """
+    Decide a pawn race that walls can no longer change.
+
+    The player to move wins the race on equal distances. The race is settled when the player
+    behind has no walls left, since only their walls could lengthen the leader's path.
+
+    Returns:
+    - 1 if the bot wins the race, 0 if the user wins, None if the race is not settled.
+    """
+    if maximizing_player:
+        leader = 1 if bot_distance <= user_distance else 0
+    else:
+        leader = 0 if user_distance <= bot_distance else 1
+    trailer_walls = user_walls_remaining if leader == 1 else bot_walls_remaining
+    return leader if trailer_walls == 0 else None
+
+
+def forcing_walls(state, opponent, fields, mirrored=False):
+    """
+    Wall action codes that lengthen the shortest path of `opponent` (USER or BOT) and keep both
+    paths open, the most damaging first; equally damaging walls in the order of their codes in the
+    canonical orientation (mirrored as from SearchState.mirrored).
+    """
+    board = state.board
+    opponent_position = state.position(opponent)
+    opponent_goal = GRID_SIZE - 1 if opponent == USER else 0
+    opponent_cell = state.cells[opponent]
+    distance = fields[opponent][opponent_cell]
+
+    scored = []
+    for wall in path_blocking_walls(opponent_position, fields[opponent], board):
+        new_walls = board.walls + [wall]
+        new_distance = distance_field(opponent_goal, new_walls)[opponent_cell]
+        if distance < new_distance < float('inf') and keeps_paths_open(state.positions(), new_walls):
+            code = state.wall_code(board.wall_slot(wall))
+            scored.append((distance - new_distance, state.canonical_code(code, mirrored), code))
+    scored.sort()
+    return [code for _, _, code in scored[:MAX_FORCING_WALLS]]
+
+
+def race_extension(state, alpha, beta, maximizing_player, user_last_position, plies):
+    """
+    Quiescence-style replacement for evaluate_board at the Minimax leaves.
+
+    Settled pawn races are scored analytically (RACE_WIN_SCORE minus the winner's distance, so faster
+    wins score higher). Otherwise, if the player to move is losing the race and has walls left, only
+    its path-lengthening walls are searched, for at most `plies` more plies; the static evaluation is
+    the score of not placing one.
+
+    Parameters:
+    - Same as minimax, with `plies` the remaining wall plies instead of a depth.
+
+    Returns:
+    - The score of the position for the bot.
+    """
+    walls = state.board.walls
+    fields = (distance_field(GRID_SIZE - 1, walls), distance_field(0, walls))
+    user_distance = fields[USER][state.cells[USER]]
+    bot_distance = fields[BOT][state.cells[BOT]]
+    bot_walls_remaining, user_walls_remaining = state.walls_remaining[BOT], state.walls_remaining[USER]
+
+    winner = race_winner(user_distance, bot_distance, maximizing_player, bot_walls_remaining, user_walls_remaining)
+    if winner == 1:
+        return RACE_WIN_SCORE - bot_distance
+    if winner == 0:
+        return -RACE_WIN_SCORE + user_distance
+
+    stand_pat = evaluate_state(state, user_last_position)
+    walls_left = bot_walls_remaining if maximizing_player else user_walls_remaining
+    losing_race = bot_distance > user_distance if maximizing_player else user_distance > bot_distance
+    if plies == 0 or walls_left == 0 or not losing_race:
+        return stand_pat
+
+    best = stand_pat
+    for wall in forcing_walls(state, USER if maximizing_player else BOT, fields, state.mirrored(user_last_position)):
+        if maximizing_player:
+            alpha = max(alpha, best)
+        else:
+            beta = min(beta, best)
+        if beta <= alpha:
+            break
+        apply_action(state, wall, is_bot=maximizing_player)
+        score = race_extension(state, alpha, beta, not maximizing_player, user_last_position, plies - 1)
+        state.undo()
+        best = max(best, score) if maximizing_player else min(best, score)
+    return best
+
+
+def find_choke_points(player_positions, user_last_position, walls, mirrored=False):
+    """
+    Analyze choke points to prioritize placing a front wall for the bot first.
+    Validate that walls do not block paths for both players.
+
+    A horizontal wall in front of the user covers the user's column and the one to its right (same x)
+    or to its left (x - 1). The right one is tried first, or the left one when the canonical orientation
+    of the position is its mirror image, so a position and its mirror image get mirror-image walls.
+
+    Parameters:
+    - player_positions: List of current player positions [(user_x, user_y), (bot_x, bot_y)].
+    - user_last_position: Last position of the user (x, y).
+    - walls: List of currently placed walls.
+    - mirrored: SearchState.mirrored of the position.
+
+    Returns:
+    - List of choke points to block the user's path.
+    """
+    choke_points = []
+
+    # Extract positions
+    user_position = player_positions[0]
+    bot_position = player_positions[1]
+
+    user_x, user_y = user_position
+    last_x, last_y = user_last_position
+
+    def paths_stay_open(wall):
+        return (is_path_open(user_position, GRID_SIZE - 1, walls + [wall])
+                and is_path_open(bot_position, 0, walls + [wall]))
+
+    # Columns of the horizontal walls covering the user's column, in the order they are tried
+    sides = [(user_x, "directly in front of"), (user_x - 1, "to the left in front of")]
+    if mirrored:
+        sides.reverse()
+
+    # Step 1: Prioritize placing a front wall
+    # The bot's goal is to move upward (towards y = 0)
+    if user_y > 0:  # Ensure the bot is not already at the top
+        for wall_x, where in sides:
+            front_wall = (wall_x, user_y + 1, HORIZONTAL)
+            if (
+                    wall_x >= 0
+                    and front_wall not in walls
+                    and not causes_overlap(front_wall, walls)
+                    and is_valid_wall(front_wall, walls)
+                    and paths_stay_open(front_wall)
+            ):
+                choke_points.append(front_wall)
+                say(f"Choke point found {where} the user at: {front_wall}")
+                return choke_points  # Prioritize and return immediately
+
+    # Step 2: Analyze the user's movement direction
+    # Determine vertical movement
+    if user_y != last_y:
+        wall_y = user_y + 1 if user_y > last_y else user_y  # Behind the user's new cell when moving down, else above
+        for wall_x, _ in sides:
+            choke_point = (wall_x, wall_y, HORIZONTAL)
+            if is_valid_wall(choke_point, walls) and paths_stay_open(choke_point):
+                choke_points.append(choke_point)
+                break
+
+    # Determine horizontal movement
+    elif user_x > last_x:  # User moved right
+        choke_point = (user_x + 1, user_y, VERTICAL)
+        if is_valid_wall(choke_point, walls) and paths_stay_open(choke_point):
+            choke_points.append(choke_point)
+
+    elif user_x < last_x:  # User moved left
+        choke_point = (user_x, user_y, VERTICAL)
+        if is_valid_wall(choke_point, walls) and paths_stay_open(choke_point):
+            choke_points.append(choke_point)
+
+    return choke_points
+
+
+def bot_turn(player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position, turn_count,
+             engine="minimax", time_manager=None, level=None):
+    """
+    Bot's turn logic, prioritizing winning moves, blocking user paths, and fallback Minimax evaluation.
+    With engine="mcts" the whole decision is delegated to the Monte Carlo Tree Search bot.
+
+    Parameters:
+    - player_positions: List of player positions [(user_x, user_y), (bot_x, bot_y)].
+    - walls: List of currently placed walls [(x, y, orientation)].
+    - bot_walls_remaining: Number of walls the bot has left.
+    - user_walls_remaining: Number of walls the user has left.
+    - user_last_position: The user's last position (x, y).
+    - turn_count: Number of turns that have occurred in the game.
+    - engine: "minimax" for the phase-based heuristic bot, "mcts" for Monte Carlo Tree Search.
+    - time_manager: Optional TimeManager of a game under a clock; the turn is then decided by timed_search,
+      as deep as the move's share of the clock allows, instead of by the phase heuristics.
+    - level: Optional name of a difficulty level (DIFFICULTY_LEVELS); the turn is then decided by level_search,
+      within the level's budgets and without the evaluation cache, instead of by the phase heuristics.
+
+    Returns:
+    - Updated number of bot walls remaining.
+    """
+    if engine == "mcts":
+        return mcts_turn(player_positions, walls, bot_walls_remaining, user_walls_remaining)
+    if level is not None:
+        best_action, best_score = level_search(
+            player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position,
+            DIFFICULTY_LEVELS[level]
+        )
+        return play_bot_action(player_positions, walls, bot_walls_remaining, best_action, f"the {level} level")
+
+    best_action = book_action(player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position)
+    if best_action is not None:
+        return play_bot_action(player_positions, walls, bot_walls_remaining, best_action, "the opening book")
+
+    bot_position = player_positions[1]
+    user_position = player_positions[0]
+    # Walls and moves that tie are chosen in the canonical orientation, as in the search
+    state = SearchState(player_positions, walls, user_walls_remaining, bot_walls_remaining)
+    mirrored = state.mirrored(user_last_position)
+
+    # Calculate distances to goals
+    bot_distance = shortest_path_length(bot_position, 0, walls, user_position)
+    user_distance = shortest_path_length(user_position, GRID_SIZE - 1, walls, bot_position)
+
+    if time_manager is not None:
+        time_manager.allocate(turn_count, (user_walls_remaining, bot_walls_remaining), (user_distance, bot_distance))
+        best_action, best_score = timed_search(
+            player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position, time_manager
+        )
+        return play_bot_action(player_positions, walls, bot_walls_remaining, best_action, "the clock")
+
+    # Determine the game phase and dynamic depth
+    if turn_count < WEIGHTS["early_turns"] or bot_distance > user_distance:  # Early phase
+        phase = "early"
+        depth = 2  # Shallow exploration
+    else:  # Mid/Late phase
+        phase = "mid_late"
+        depth = 4  # Deeper exploration
+
+    # Step 1: Winning Move
+    possible_moves = get_all_possible_moves(bot_position, walls, user_position)
+    for move in possible_moves:
+        if move[1] == 0:  # Bot's goal row is y = 0
+            player_positions[1] = move
+            say(f"Bot moved to goal: {move}.")
+            return bot_walls_remaining
+
+    # Step 2: Block User if Close to Goal
+    if user_distance <= WEIGHTS["block_distance"] and bot_walls_remaining > 0:  # User is close to their goal
+        choke_points = find_choke_points(player_positions, user_last_position, walls, mirrored)
+        for choke_point in choke_points:
+            if is_valid_wall(choke_point, walls):
+                walls.append(choke_point)
+                bot_walls_remaining -= 1
+                say(f"Bot placed wall at {choke_point} to block user close to goal.")
+                return bot_walls_remaining
+
+    # Step 3: Logical Movement to Avoid Oscillation and Prioritize Wall Placement
+    # (possible_moves already turns a step onto the user into a straight or diagonal jump)
+    best_move = None
+    best_distance = float('inf')
+
+    for move in sorted(possible_moves, key=lambda move: state.canonical_code(state.board.cell(move), mirrored)):
+        move_distance = shortest_path_length(move, 0, walls, user_position)
+        if move_distance < best_distance:
+            best_move = move
+            best_distance = move_distance
+
+    if best_move:
+        if best_distance > bot_distance and bot_walls_remaining > 0:
+            say("All available moves increase path length; bot will prioritize placing a wall.")
+            choke_points = find_choke_points(player_positions, user_last_position, walls, mirrored)
+            for choke_point in choke_points:
+                if is_valid_wall(choke_point, walls):
+                    walls.append(choke_point)
+                    bot_walls_remaining -= 1
+                    say(f"Bot placed wall at {choke_point} instead of moving to a worse position.")
+                    return bot_walls_remaining
+        elif best_distance <= bot_distance:
+            player_positions[1] = best_move
+            say(f"Bot moved to: {best_move}.")
+            return bot_walls_remaining
+
+    # Step 4: Strategic Wall Placement in Early Phase
+    if phase == "early" and bot_walls_remaining > 0:
+        choke_points = find_choke_points(player_positions, user_last_position, walls, mirrored)
+        for choke_point in choke_points:
+            if is_valid_wall(choke_point, walls):
+                walls.append(choke_point)
+                bot_walls_remaining -= 1
+                say(f"Bot placed wall at {choke_point} to slow user.")
+                return bot_walls_remaining
+
+    # Step 5: Fallback to Minimax in Mid/Late Phases
+    if phase == "mid_late":
+        say("Bot is deciding using Minimax...")
+        best_action = cached_action(
+            player_positions, walls, depth, bot_walls_remaining, user_walls_remaining, user_last_position
+        )
+        if best_action is None:
+            best_action, best_score = search_best_action(
+                player_positions, walls, depth, bot_walls_remaining, user_walls_remaining, user_last_position
+            )
+
+        if best_action:
+            if best_action[0] == "move":
+                player_positions[1] = best_action[1]
+                say(f"Bot decided to move to {best_action[1]} using Minimax.")
+            elif best_action[0] == "wall":
+                if is_valid_wall(best_action[1], walls):
+                    walls.append(best_action[1])
+                    bot_walls_remaining -= 1
+                    say(f"Bot placed wall at {best_action[1]} using Minimax.")
+            return bot_walls_remaining
+
+    # Step 6: No Good Moves, Stay in Place
+    say("No advantageous moves found; bot will stay in place.")
+    return bot_walls_remaining
+
+
+def play_bot_action(player_positions, walls, bot_walls_remaining, action, searched_by):
+    """
+    Apply the bot action chosen by a search, or stay in place if there is none.
+
+    Parameters:
+    - searched_by: How the action was searched, for the message (e.g. "the clock").
+
+    Returns:
+    - Updated number of bot walls remaining.
+    """
+    if action is None:
+        say("No advantageous moves found; bot will stay in place.")
+    elif action[0] == "move":
+        player_positions[1] = action[1]
+        say(f"Bot decided to move to {action[1]} using Minimax within {searched_by}.")
+    else:
+        walls.append(action[1])
+        bot_walls_remaining -= 1
+        say(f"Bot placed wall at {action[1]} using Minimax within {searched_by}.")
+    return bot_walls_remaining
+
+
+def search_best_action(player_positions, walls, depth, bot_walls_remaining, user_walls_remaining,
+                       user_last_position, is_bot=True, table=None):
+    """
+    Run Minimax below every root action of the player to move and return the best one.
+
+    With SEARCH_WORKERS > 1 the root actions are searched in parallel by the shared ParallelSearch.
+
+    Parameters:
+    - player_positions: List of player positions [(user_x, user_y), (bot_x, bot_y)].
+    - walls: List of currently placed walls.
+    - depth: Search depth in plies, counting the root action.
+    - bot_walls_remaining: Number of walls the bot has left.
+    - user_walls_remaining: Number of walls the user has left.
+    - user_last_position: Last position of the user (x, y).
+    - is_bot: True to search for the bot (maximizing), False for the user (minimizing).
+    - table: Optional TranspositionTable for a search in this process.
+
+    Returns:
+    - (best_action, best_score), with best_action a ("move", ...) or ("wall", ...) tuple, or None
+      if there is no action. Raises SearchTimeout when run by timed_search and its deadline passes.
+    """
+    global _parallel_search
+    state = SearchState(player_positions, walls, user_walls_remaining, bot_walls_remaining)
+    possible_actions = get_all_possible_bot_actions(state, BOT if is_bot else USER, user_last_position)
+
+    if SEARCH_WORKERS > 1 and table is None:
+        if _parallel_search is None:
+            _parallel_search = ParallelSearch(SEARCH_WORKERS, SHARED_TABLE)
+        scores = _parallel_search.root_scores(player_positions, walls, depth, bot_walls_remaining,
+                                              user_walls_remaining, user_last_position, is_bot, possible_actions,
+                                              _deadline)
+    else:
+        scores = root_scores(state, possible_actions, depth, is_bot, user_last_position, table)
+
+    best_action = None
+    best_score = float('-inf') if is_bot else float('inf')
+    for action, score in zip(possible_actions, scores):
+        if (score > best_score) if is_bot else (score < best_score):
+            best_score = score
+            best_action = action
+
+    if best_action is None:
+        return None, best_score
+    return decode_action(best_action), best_score
+
+
+def root_scores(state, actions, depth, is_bot, user_last_position, table=None, margin=0):
+    """
+    Minimax score of every root action, searched to `depth` plies counting the action.
+
+    The first action is searched with a full window, every later one with the best score so far less
+    `margin` as its bound (alpha for the bot, beta plus margin for the user), so the search below it can
+    cut. Scores within `margin` of the best are exact; the others are only bounds beyond it.
+    """
+    scores = []
+    best = -math.inf if is_bot else math.inf
+    for action in actions:
+        apply_action(state, action, is_bot=is_bot)
+        if is_bot:
+            score = minimax(state, depth - 1, math.nextafter(best - margin, -math.inf), math.inf, False,
+                            user_last_position, table)
+            best = max(best, score)
+        else:
+            score = minimax(state, depth - 1, -math.inf, math.nextafter(best + margin, math.inf), True,
+                            user_last_position, table)
+            best = min(best, score)
+        scores.append(score)
+        state.undo()
+    return scores
+
+
+def timed_search(player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position,
+                 time_manager, is_bot=True):
+    """
+    Iterative deepening Minimax within the limits planned by a TimeManager (see timecontrol.py).
+
+    Searches depth 1, 2, ... up to TIMED_MAX_DEPTH with one transposition table, reporting every
+    completed iteration to the time manager, until it advises against another iteration or the hard
+    deadline interrupts one. The time manager's deadline does not apply to the depth 1 iteration, but a
+    bot turn's cap (move_deadline) does; if that interrupts depth 1, the first action of the move ordering
+    is played, as in level_search. Parallel workers (SEARCH_WORKERS > 1) compare the deadline with
+    time.monotonic().
+
+    Parameters:
+    - player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position, is_bot: As
+      for search_best_action.
+    - time_manager: TimeManager whose allocate() was called for this move.
+
+    Returns:
+    - (best_action, best_score) of the deepest completed iteration; best_score is None if none completed.
+    """
+    global _deadline, _clock
+    table = TranspositionTable(TIMED_TABLE_ENTRIES) if SEARCH_WORKERS <= 1 else None
+    result = None, 0
+    _clock = time_manager.clock
+    try:
+        for depth in range(1, TIMED_MAX_DEPTH + 1):
+            _deadline = time_manager.hard_deadline if depth > 1 else None
+            try:
+                result = search_best_action(player_positions, walls, depth, bot_walls_remaining,
+                                            user_walls_remaining, user_last_position, is_bot, table)
+            except SearchTimeout:
+                say(f"Search stopped by the clock during depth {depth}.")
+                if depth == 1:
+                    result = first_action(player_positions, walls, bot_walls_remaining, user_walls_remaining,
+                                          user_last_position, is_bot), None
+                break
+            time_manager.iteration_done(depth, result[0])
+            if result[0] is None or not time_manager.continue_search():
+                break
+    finally:
+        _deadline = None
+        _clock = time.monotonic
+    return result
+
+
+def level_search(player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position, level,
+                 is_bot=True, rng=random):
+    """
+    Iterative deepening Minimax within the budgets of a difficulty level (see DIFFICULTY_LEVELS).
+
+    Searches depth 1, 2, ... up to level.max_depth in this process with one transposition table, searching
+    the best root actions of the previous iteration first. Minimax abandons an iteration once level.node_budget
+    nodes or level.time_limit seconds (from the call) are used, so no level runs longer than its limit plus
+    the work of LEVEL_CHECK_NODES nodes. The action is then drawn at random among the root actions of the deepest
+    completed iteration that score within level.margin of its best one; if not even depth 1 completed,
+    the first action of the move ordering is played.
+
+    Parameters:
+    - player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position, is_bot: As
+      for search_best_action.
+    - level: DifficultyLevel.
+    - rng: random.Random (or the random module) for the choice among near-best actions.
+
+    Returns:
+    - (best_action, best_score); best_score is None if no iteration completed.
+    """
+    global _deadline, _clock, _node_limit, _check_nodes
+    _clock = time.monotonic
+    _deadline = _clock() + level.time_limit
+    _node_limit = search_stats["nodes"] + level.node_budget
+    _check_nodes = LEVEL_CHECK_NODES
+    try:
+        state = SearchState(player_positions, walls, user_walls_remaining, bot_walls_remaining)
+        actions = get_all_possible_bot_actions(state, BOT if is_bot else USER, user_last_position)
+        if not actions:
+            return None, None
+        table = TranspositionTable(TIMED_TABLE_ENTRIES)
+        scored = None
+        for depth in range(1, level.max_depth + 1):
+            try:
+                scores = root_scores(state, actions, depth, is_bot, user_last_position, table, level.margin)
+            except SearchTimeout:
+                break  # The state is left mid-search; it is not used again
+            scored = sorted(zip(scores, actions), key=lambda item: -item[0] if is_bot else item[0])
+            actions = [action for _, action in scored]
+    finally:
+        _deadline = _node_limit = None
+        _check_nodes = DEADLINE_CHECK_NODES
+    if scored is None:
+        return decode_action(actions[0]), None
+    best_score = scored[0][0]
+    candidates = [action for score, action in scored if abs(score - best_score) <= level.margin]
+    return decode_action(rng.choice(candidates)), best_score
+
+
+def first_action(player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position, is_bot=True):
+    """The first action of the move ordering, played when not even a depth 1 search completed (None if none)."""
+    state = SearchState(player_positions, walls, user_walls_remaining, bot_walls_remaining)
+    actions = get_all_possible_bot_actions(state, BOT if is_bot else USER, user_last_position)
+    return decode_action(actions[0]) if actions else None
+
+
+@contextlib.contextmanager
+def move_deadline(seconds):
+    """
+    Cap the searches of the bot turns played inside the block at `seconds` from now.
+
+    Minimax searches raise SearchTimeout once the cap passes (timed_search and level_search catch it and
+    play their last completed iteration, a plain search_best_action lets it out of bot_turn), and MCTS_BOT
+    searches for at most `seconds`. Used by the game server so a late search frees its worker.
+    """
+    global _move_deadline
+    time_limit = MCTS_BOT.time_limit
+    _move_deadline = time.monotonic() + seconds
+    MCTS_BOT.time_limit = min(time_limit, seconds)
+    try:
+        yield
+    finally:
+        _move_deadline = None
+        MCTS_BOT.time_limit = time_limit
+
+
+def cached_action(player_positions, walls, depth, bot_walls_remaining, user_walls_remaining, user_last_position):
+    """
+    Look the bot's position up in EVAL_CACHE.
+
+    Returns:
+    - The cached best action if it was searched at least `depth` plies deep and is legal, else None.
+    """
+    if EVAL_CACHE is None:
+        return None
+    state = SearchState(player_positions, walls, user_walls_remaining, bot_walls_remaining)
+    key, mirrored = state.canonical_key(True, user_last_position)
+    entry = EVAL_CACHE.lookup(key)
+    if entry is None or entry[0] < depth or entry[2] == NO_MOVE:
+        return None
+    action = decode_action(state.mirror_code(entry[2]) if mirrored else entry[2])
+    if illegal_reason(player_positions, walls, [user_walls_remaining, bot_walls_remaining], BOT, action,
+                      allow_stay=False):
+        return None  # A different position with the same hash
+    say(f"Found a depth {entry[0]} result in the evaluation cache.")
+    return action
+
+
+def book_action(player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position):
+    """
+    Look the bot's position up in BOOK.
+
+    Returns:
+    - The book action if there is one and it is legal, else None.
+    """
+    if BOOK is None:
+        return None
+    code = BOOK.lookup(SearchState(player_positions, walls, user_walls_remaining, bot_walls_remaining),
+                       user_last_position)
+    if code is None:
+        return None
+    action = decode_action(code)
+    if illegal_reason(player_positions, walls, [user_walls_remaining, bot_walls_remaining], BOT, action,
+                      allow_stay=False):
+        return None  # A different position with the same hash
+    say(f"Found the position in the opening book (depth {BOOK.depth}).")
+    return action
+
+
+def _init_search_worker(handle, entries):
+    """Pool initializer: attach to the shared table, or make this worker's own table."""
+    global _worker_table
+    if handle is None:
+        _worker_table = TranspositionTable(entries)
+    else:
+        _worker_table = SharedTranspositionTable.attach(*handle)
+
+
+def _search_root_action(task):
+    """Score one root action with the worker's table (runs in a worker process); the score is None on timeout."""
+    global _deadline
+    (player_positions, walls, depth, bot_walls_remaining, user_walls_remaining, user_last_position, is_bot, action,
+     _deadline) = task
+    state = SearchState(player_positions, walls, user_walls_remaining, bot_walls_remaining)
+    search_stats["nodes"] = 0
+    _worker_table.reset_stats()
+    apply_action(state, action, is_bot=is_bot)
+    try:
+        if _deadline is not None and _clock() >= _deadline:
+            raise SearchTimeout  # Queued behind other actions until the time was up
+        with quiet():
+            score = minimax(state, depth - 1, float('-inf'), float('inf'), not is_bot, user_last_position,
+                            _worker_table)
+    except SearchTimeout:
+        score = None
+    finally:
+        _deadline = None
+    return score, search_stats["nodes"], _worker_table.stats()
+
+
+class ParallelSearch:
+    """
+    Process pool that scores the root actions of a Minimax search in parallel.
+
+    Parameters:
+    - workers: Number of worker processes.
+    - shared: True for one SharedTranspositionTable used by every worker, False for one table per worker.
+    - entries: Size of the table(s).
+
+    After each search, stats holds the nodes and table counters summed over the workers.
+    """
+
+    def __init__(self, workers, shared=True, entries=TABLE_ENTRIES):
+        from concurrent.futures import ProcessPoolExecutor  # Imported on first use to keep `import bot` fast
+
+        self.table = SharedTranspositionTable(entries) if shared else None
+        handle = self.table.handle() if shared else None
+        self.pool = ProcessPoolExecutor(workers, initializer=_init_search_worker, initargs=(handle, entries))
+        self.stats = {}
+
+    def root_scores(self, player_positions, walls, depth, bot_walls_remaining, user_walls_remaining,
+                    user_last_position, is_bot, actions, deadline=None):
+        """
+        Minimax score of every root action code in `actions`, in order.
+
+        Raises SearchTimeout if a worker passed `deadline` (a time.monotonic() value) before it was done.
+        """
+        tasks = [(player_positions, walls, depth, bot_walls_remaining, user_walls_remaining, user_last_position,
+                  is_bot, action, deadline) for action in actions]
+        results = list(self.pool.map(_search_root_action, tasks))
+        self.stats = {"nodes": sum(nodes for _, nodes, _ in results)}
+        for name in ("probes", "hits", "collisions", "stores"):
+            self.stats[name] = sum(table_stats[name] for _, _, table_stats in results)
+        self.stats["collision_rate"] = self.stats["collisions"] / max(1, self.stats["probes"])
+        if any(score is None for score, _, _ in results):
+            raise SearchTimeout
+        return [score for score, _, _ in results]
+
+    def close(self):
+        self.pool.shutdown()
+        if self.table is not None:
+            self.table.close()
+            self.table.unlink()
+
+
+def mcts_turn(player_positions, walls, bot_walls_remaining, user_walls_remaining):
+    """
+    Play the bot's turn with the shared MCTS searcher.
+
+    Returns:
+    - Updated number of bot walls remaining.
+    """
+    action = MCTS_BOT.choose_action(player_positions, walls, bot_walls_remaining, user_walls_remaining)
+    if action is None:
+        say("No advantageous moves found; bot will stay in place.")
+    elif action[0] == "move":
+        player_positions[1] = action[1]
+        say(f"Bot decided to move to {action[1]} using MCTS.")
+    elif action[0] == "wall":
+        walls.append(action[1])
+        bot_walls_remaining -= 1
+        say(f"Bot placed wall at {action[1]} using MCTS.")
+    return bot_walls_remaining
+
+
+def get_all_possible_user_actions(user_position, walls, user_walls_remaining, bot_position):
+    actions = []
+
+    # Add all valid moves
+    possible_moves = get_all_possible_moves(user_position, walls, bot_position)
+    for move in possible_moves:
+        actions.append(("move", move))
+
+    # Add all valid wall placements if walls are remaining
+    if user_walls_remaining > 0:
+        for x in range(1, GRID_SIZE - 1):  # Exclude borders
+            for y in range(1, GRID_SIZE - 1):  # Exclude borders
+                for orientation in [HORIZONTAL, VERTICAL]:
+                    new_wall = (x, y, orientation)
+                    if new_wall not in walls and not causes_overlap(new_wall, walls):
+                        # Ensure the wall does not block paths
+                        if is_path_open(user_position, GRID_SIZE - 1, walls + [new_wall]) and \
+                           is_path_open(bot_position, 0, walls + [new_wall]):
+                            actions.append(("wall", new_wall))
+
+    return actions
+
+
+def evaluate_action_priority(state, action, player, other_path_length):
+    """
+    Rank actions by their impact.
+    Moves are ranked by distance to the bot's goal, and walls by impact on the other player's path.
+
+    Parameters:
+    - state: SearchState of the position.
+    - action: Integer action code.
+    - player: The player making the action (USER or BOT).
+    - other_path_length: The other player's current distance to row GRID_SIZE - 1.
+    """
+    board = state.board
+    other_cell = state.cells[1 - player]
+    if state.is_move(action):
+        # Rank moves by proximity to the bot's goal (closer is better)
+        return board.shortest_path_length_index(action, 0, other_cell)
+    # Rank walls by their impact on the other player's shortest path
+    slot = action - state.cell_count
+    board.place_slot(slot)
+    new_path = board.shortest_path_length_index(other_cell, GRID_SIZE - 1)
+    board.remove_slot(slot)
+    return -(new_path - other_path_length)  # Negative to prioritize walls that block more
+
+
+def get_all_possible_bot_actions(state, player, user_last_position):
+    """
+    Generate all valid actions for a player, including moves and wall placements.
+    Exclude walls placed on the borders, sort actions by their strategic impact, and limit irrelevant placements.
+    Actions of equal impact are ordered by their codes in the canonical orientation of the position
+    (SearchState.mirrored), so a position and its mirror image keep mirror-image actions in the same order.
+
+    Parameters:
+    - state: SearchState of the position.
+    - player: The player to generate actions for (BOT, or USER when searching the user's replies).
+    - user_last_position: Last position of the user (x, y).
+
+    Returns:
+    - List of integer action codes (see rules.encode_action).
+    """
+    board = state.board
+    mirrored = state.mirrored(user_last_position)
+    # Step 1: Add valid moves
+    actions = board.pawn_moves_index(state.cells[player], state.cells[1 - player])
+
+    # Step 2: Add wall placements if walls are remaining
+    if state.walls_remaining[player] > 0:
+        # Use find_choke_points to generate strategic wall positions against the other player
+        choke_points = find_choke_points([state.position(1 - player), state.position(player)], user_last_position,
+                                         board.walls, mirrored)
+
+        for choke_point in choke_points:
+            # Validate the wall placement like is_valid_wall
+            slot = board.wall_slot(choke_point)
+            if slot >= 0 and board.is_valid_slot(slot):
+                actions.append(state.wall_code(slot))
+
+    # Sort actions by their impact, ties by their canonical codes
+    other_path_length = board.shortest_path_length_index(state.cells[1 - player], GRID_SIZE - 1)
+    actions.sort(key=lambda action: (evaluate_action_priority(state, action, player, other_path_length),
+                                     state.canonical_code(action, mirrored)))
+
+    # Step 3: Limit total actions to prevent irrelevant placements
+    max_actions = 10  # Limit the number of actions to evaluate
+    return actions[:max_actions]
+
+
+def apply_action(state, action, is_bot):
+    """
+    Apply an integer-coded action to a SearchState in place; take it back with state.undo().
+
+    Parameters:
+    - state: SearchState of the position.
+    - action: Integer action code (see rules.encode_action).
+    - is_bot: Boolean indicating if the bot is performing the action.
+    """
+    state.apply(action, BOT if is_bot else USER)
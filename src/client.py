@@ -0,0 +1,133 @@
+"""
+Blocking client for the game server (see server.py), also used by the pygame UI.
+
+Run on its own it is a small load test: it plays --games human-vs-bot games at once, the "human"
+always stepping along its shortest path, starts --bot-games bot-vs-bot games, and reports the
+results and the server's reply times.
+
+Usage: python client.py [--connect 127.0.0.1:8765 | --connect /tmp/quoridor.sock] [--games 4] [--bot-games 2]
+                        [--level easy]
+"""
+import argparse
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rules import GRID_SIZE, get_all_possible_moves, shortest_path_length
+
+
+class ServerError(Exception):
+    """The server rejected a request."""
+
+
+def parse_state(state):
+    """Turn the JSON lists of a state's positions and walls back into tuples."""
+    state["positions"] = [tuple(position) for position in state["positions"]]
+    state["walls"] = [tuple(wall) for wall in state["walls"]]
+    if state["last_action"] is not None:
+        kind, value = state["last_action"]
+        state["last_action"] = (kind, tuple(value))
+    return state
+
+
+class GameClient:
+    """
+    One connection to the game server.
+
+    Parameters:
+    - address: "host:port" for TCP, anything else is taken as a Unix socket path.
+    """
+
+    def __init__(self, address):
+        host, _, port = address.rpartition(":")
+        if host and port.isdigit():
+            self.socket = socket.create_connection((host, int(port)))
+        else:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(address)
+        self.file = self.socket.makefile("rw")
+
+    def request(self, **fields):
+        """Send one request and return the state from the answer; raises ServerError on errors."""
+        self.file.write(json.dumps(fields) + "\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ServerError(response["error"])
+        return parse_state(response["state"])
+
+    def new_game(self, mode="human", engine="minimax", level=None):
+        return self.request(cmd="new", mode=mode, engine=engine, level=level)
+
+    def play(self, game, action):
+        """Play a user action; the returned state includes the bot's reply."""
+        return self.request(cmd="play", game=game, action=action)
+
+    def state(self, game):
+        return self.request(cmd="state", game=game)
+
+    def wait(self, game):
+        return self.request(cmd="wait", game=game)
+
+    def close_game(self, game):
+        return self.request(cmd="close", game=game)
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+
+def play_greedy_game(address, engine, level=None):
+    """Play one game as a user who always steps along the shortest path; returns (state, reply times)."""
+    client = GameClient(address)
+    try:
+        state = client.new_game("human", engine, level)
+        reply_times = []
+        while state["winner"] is None:
+            user_position, bot_position = state["positions"]
+            moves = get_all_possible_moves(user_position, state["walls"], bot_position)
+            move = min(moves, key=lambda m: shortest_path_length(m, GRID_SIZE - 1, state["walls"], bot_position))
+            start = time.perf_counter()
+            state = client.play(state["game"], ("move", move))
+            reply_times.append(time.perf_counter() - start)
+        client.close_game(state["game"])
+        return state, reply_times
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connect", default="127.0.0.1:8765", help="host:port or Unix socket path")
+    parser.add_argument("--games", type=int, default=4, help="concurrent human-vs-bot games")
+    parser.add_argument("--bot-games", type=int, default=2, help="bot-vs-bot games")
+    parser.add_argument("--engine", default="minimax", choices=["minimax", "mcts"])
+    parser.add_argument("--level", help="difficulty level of the human-vs-bot games (bot.DIFFICULTY_LEVELS)")
+    args = parser.parse_args()
+
+    watcher = GameClient(args.connect)
+    bot_games = [watcher.new_game("bots", args.engine)["game"] for _ in range(args.bot_games)]
+
+    with ThreadPoolExecutor(max(1, args.games)) as threads:
+        results = list(threads.map(play_greedy_game, [args.connect] * args.games, [args.engine] * args.games,
+                                   [args.level] * args.games))
+    reply_times = sorted(t for _, times in results for t in times)
+    for state, _ in results:
+        print(f"Game {state['game']}: {state['winner']} wins ({state['reason']}), {len(state['walls'])} walls")
+    if reply_times:
+        print(f"{len(reply_times)} bot replies, median {reply_times[len(reply_times) // 2] * 1000:.0f} ms, "
+              f"max {reply_times[-1] * 1000:.0f} ms")
+
+    for game in bot_games:
+        state = watcher.wait(game)
+        print(f"Bot game {game}: {state['winner']} wins ({state['reason']}) after {len(state['walls'])} walls")
+        watcher.close_game(game)
+    watcher.close()
+
+
+if __name__ == "__main__":
+    main()
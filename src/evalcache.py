@@ -0,0 +1,138 @@
+"""
+Persistent cache of Minimax search results: position hash -> (depth, score, best action).
+
+The file is an open-addressing hash table of fixed-size records behind a small header, so a reader
+only maps it into memory: opening costs the same for any cache size and a lookup reads at most
+PROBE_LIMIT records. Offline jobs (analyze.py --cache) insert results with EvalCacheWriter; the bot
+opens the cache read-only at startup and probes it in bot_turn before searching.
+
+Header: b"QEVC", version, log2 of the record count, and a fingerprint of the evaluation settings the
+scores were searched with. A cache written under other settings is ignored by open_eval_cache.
+Record: position key (uint64, never 0), score (double), best action code (uint16), depth (int8).
+"""
+import mmap
+import os
+import struct
+import zlib
+
+MAGIC = b"QEVC"
+VERSION = 4  # 4: positions stored under SearchState.canonical_key, searched with symmetric move ordering
+HEADER = struct.Struct("<4sBBxxQ")
+RECORD = struct.Struct("<QdHb5x")
+PROBE_LIMIT = 8
+
+
+def settings_fingerprint(settings):
+    """Stable 64-bit fingerprint of a JSON-like settings dict (e.g. the evaluation weights)."""
+    text = repr(sorted(settings.items())).encode()
+    return zlib.crc32(text) << 32 | zlib.adler32(text)
+
+
+class EvalCache:
+    """
+    Read-only view of a cache file.
+
+    Parameters:
+    - path: Cache file written by EvalCacheWriter.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size_log2, self.fingerprint = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} evaluation cache")
+        self.mask = (1 << size_log2) - 1
+
+    def lookup(self, key):
+        """Return (depth, score, action code) stored for a position key, or None."""
+        key = key or 1  # 0 marks an empty record
+        data = self.map
+        for step in range(PROBE_LIMIT):
+            offset = HEADER.size + ((key + step) & self.mask) * RECORD.size
+            stored_key, score, action, depth = RECORD.unpack_from(data, offset)
+            if stored_key == key:
+                return depth, score, action
+            if stored_key == 0:
+                return None
+        return None
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EvalCacheWriter(EvalCache):
+    """
+    Writable cache, created with 2 ** size_log2 records if the file does not exist yet.
+
+    A result replaces the stored one for the same position if it was searched at least as deep; when
+    all PROBE_LIMIT records of a position's window are taken, the shallowest one is replaced.
+    """
+
+    def __init__(self, path, fingerprint, size_log2=18):
+        if not os.path.exists(path):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "wb") as new_file:
+                new_file.write(HEADER.pack(MAGIC, VERSION, size_log2, fingerprint))
+                new_file.truncate(HEADER.size + (RECORD.size << size_log2))
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, version, size_log2, stored_fingerprint = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} evaluation cache")
+        if stored_fingerprint != fingerprint:
+            self.close()
+            raise ValueError(f"{path} was written with other evaluation settings")
+        self.fingerprint = fingerprint
+        self.mask = (1 << size_log2) - 1
+
+    def store(self, key, depth, score, action):
+        key = key or 1
+        data = self.map
+        target = None
+        shallowest = None
+        for step in range(PROBE_LIMIT):
+            offset = HEADER.size + ((key + step) & self.mask) * RECORD.size
+            stored_key, _, _, stored_depth = RECORD.unpack_from(data, offset)
+            if stored_key == key:
+                if depth < stored_depth:
+                    return
+                target = offset
+                break
+            if stored_key == 0:
+                target = offset
+                break
+            if shallowest is None or stored_depth < shallowest[0]:
+                shallowest = (stored_depth, offset)
+        if target is None:
+            target = shallowest[1]
+        RECORD.pack_into(data, target, key, score, action, depth)
+
+    def close(self):
+        self.map.flush()
+        super().close()
+
+
+def open_eval_cache(path, fingerprint):
+    """Open a cache read-only; None if it is missing, unreadable or was written under other settings."""
+    if not os.path.exists(path):
+        return None
+    try:
+        cache = EvalCache(path)
+    except (ValueError, OSError):
+        return None
+    if cache.fingerprint != fingerprint:
+        cache.close()
+        return None
+    return cache
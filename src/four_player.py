@@ -0,0 +1,304 @@
+"""
+Four-player Quoridor: pawns start in the middle of each side and race to the opposite side,
+5 walls each, turns go clockwise. Bots search with paranoid alpha-beta.
+
+Usage: python four_player.py [--depth 4] [--seed 0]   (bot-only self-play in the terminal)
+"""
+import argparse
+import math
+import random
+
+from board import Board, DIRECTION_BITS, PERPENDICULAR
+from mcts import path_blocking_walls
+from rules import GRID_SIZE
+
+FOUR_PLAYER_WALLS = 5
+PLAYER_NAMES = ["Top", "Right", "Bottom", "Left"]  # Clockwise, which is also the turn order
+WIN_SCORE = 10000
+MAX_WALL_CANDIDATES = 6
+
+
+def start_positions(grid_size=GRID_SIZE):
+    """Starting (x, y) of each player, clockwise from the top."""
+    middle, last = grid_size // 2, grid_size - 1
+    return [(middle, 0), (last, middle), (middle, last), (0, middle)]
+
+
+def goal_cells(player, grid_size=GRID_SIZE):
+    """Flat indices of the side opposite a player's start: bottom row, left column, top row, right column."""
+    last = grid_size - 1
+    if player == 0:
+        return list(range(last * grid_size, last * grid_size + grid_size))
+    if player == 1:
+        return list(range(0, grid_size * grid_size, grid_size))
+    if player == 2:
+        return list(range(grid_size))
+    return list(range(last, grid_size * grid_size, grid_size))
+
+
+class FourPlayerGame:
+    """
+    Mutable four-player position with apply/undo for search.
+
+    Keeps one distance field per player and only recomputes a field when a new wall closes an edge
+    that lies on one of its shortest paths; wall legality checks all four players in one flood fill.
+    """
+    __slots__ = ("size", "board", "positions", "walls_remaining", "to_move", "goals", "goal_bits",
+                 "fields", "history")
+
+    def __init__(self, grid_size=GRID_SIZE, walls_per_player=FOUR_PLAYER_WALLS):
+        self.size = grid_size
+        self.board = Board(grid_size)
+        self.positions = [self.board.cell(position) for position in start_positions(grid_size)]
+        self.walls_remaining = [walls_per_player] * 4
+        self.to_move = 0
+        self.goals = [goal_cells(player, grid_size) for player in range(4)]
+
+        # goal_bits[cell] has bit p set if cell is on player p's goal side
+        self.goal_bits = bytearray(grid_size * grid_size)
+        for player, cells in enumerate(self.goals):
+            for cell in cells:
+                self.goal_bits[cell] |= 1 << player
+
+        self.fields = [self.board.distance_field_from(cells) for cells in self.goals]
+        self.history = []
+
+    def distance(self, player):
+        return self.fields[player][self.positions[player]]
+
+    def winner(self):
+        """Return the player standing on their goal side, or None."""
+        for player, cell in enumerate(self.positions):
+            if self.goal_bits[cell] >> player & 1:
+                return player
+        return None
+
+    def pawn_moves(self, player):
+        """Flat-index pawn moves with straight and diagonal jumps over any adjacent pawn."""
+        neighbours = self.board.neighbours
+        blocked = self.board.blocked
+        cell = self.positions[player]
+        occupied = set(self.positions)
+        moves = []
+        for direction in range(4):
+            neighbour = neighbours[cell][direction]
+            if neighbour < 0 or blocked[cell] & DIRECTION_BITS[direction]:
+                continue
+            if neighbour not in occupied:
+                moves.append(neighbour)
+                continue
+
+            # Jump straight over the pawn if the cell behind it is open and free
+            jump = neighbours[neighbour][direction]
+            if jump >= 0 and not blocked[neighbour] & DIRECTION_BITS[direction] and jump not in occupied:
+                moves.append(jump)
+                continue
+
+            # Otherwise step diagonally to either side of it
+            for side_direction in PERPENDICULAR[direction]:
+                side = neighbours[neighbour][side_direction]
+                if side >= 0 and side not in occupied and not blocked[neighbour] & DIRECTION_BITS[side_direction]:
+                    moves.append(side)
+        return moves
+
+    def is_legal_wall(self, wall):
+        """
+        Check overlap and that every player keeps a path to their goal side.
+
+        A wall touching the existing walls and border in fewer than two points cannot enclose
+        anything (Board.may_enclose_slot), so only walls closing a loop need the one-pass flood fill.
+        """
+        slot = self.board.wall_slot(wall)
+        if slot < 0 or not self.board.is_valid_slot(slot):
+            return False
+        if not self.board.may_enclose_slot(slot):
+            return True
+
+        self.board.place_wall(wall)
+        try:
+            labels, reachable_goals = self._components()
+        finally:
+            self.board.remove_wall(wall)
+        return all(reachable_goals[labels[cell]] >> player & 1 for player, cell in enumerate(self.positions))
+
+    def _components(self):
+        """Label the connected regions of the board and OR together the goal bits found in each, in one pass."""
+        neighbours = self.board.neighbours
+        blocked = self.board.blocked
+        labels = [-1] * (self.size * self.size)
+        reachable_goals = []
+        for start in range(self.size * self.size):
+            if labels[start] >= 0:
+                continue
+            label = len(reachable_goals)
+            bits = 0
+            labels[start] = label
+            stack = [start]
+            while stack:
+                cell = stack.pop()
+                bits |= self.goal_bits[cell]
+                for direction in range(4):
+                    neighbour = neighbours[cell][direction]
+                    if neighbour >= 0 and labels[neighbour] < 0 and not blocked[cell] & DIRECTION_BITS[direction]:
+                        labels[neighbour] = label
+                        stack.append(neighbour)
+            reachable_goals.append(bits)
+        return labels, reachable_goals
+
+    def apply(self, action):
+        """Play an action for the player to move: ("move", cell), ("wall", wall) or ("pass", None)."""
+        player = self.to_move
+        kind, value = action
+        if kind == "move":
+            self.history.append((kind, player, self.positions[player], None))
+            self.positions[player] = value
+        elif kind == "wall":
+            self.history.append((kind, player, value, self.fields[:]))
+            self.board.place_wall(value)
+            self.walls_remaining[player] -= 1
+            self._update_fields(value)
+        else:
+            self.history.append((kind, player, None, None))
+        self.to_move = (player + 1) % 4
+
+    def undo(self):
+        kind, player, value, old_fields = self.history.pop()
+        if kind == "move":
+            self.positions[player] = value
+        elif kind == "wall":
+            self.board.remove_wall(value)
+            self.walls_remaining[player] += 1
+            self.fields = old_fields
+        self.to_move = player
+
+    def _update_fields(self, wall):
+        """Recompute only the distance fields whose shortest paths used one of the edges the wall closed."""
+        edges = [(cell, self.board.neighbours[cell][direction]) for cell, direction in self.board.wall_edges(wall)]
+        for player, field in enumerate(self.fields):
+            if any(abs(field[a] - field[b]) == 1 for a, b in edges):
+                self.fields[player] = self.board.distance_field_from(self.goals[player])
+
+    def legal_actions(self, root):
+        """
+        Ordered actions for the player to move: pawn moves closest to the goal first, then walls
+        on the shortest path of the player they most need to slow down (for the paranoid coalition
+        that is always `root`, for `root` it is the opponent closest to winning).
+        """
+        player = self.to_move
+        field = self.fields[player]
+        actions = [("move", cell) for cell in sorted(self.pawn_moves(player), key=field.__getitem__)]
+
+        if self.walls_remaining[player] > 0:
+            if player == root:
+                target = min((p for p in range(4) if p != root), key=self.distance)
+            else:
+                target = root
+            candidates = path_blocking_walls(self.board.position(self.positions[target]), self.fields[target],
+                                             self.board)
+            walls = [wall for wall in candidates if self.is_legal_wall(wall)]
+            actions += [("wall", wall) for wall in walls[:MAX_WALL_CANDIDATES]]
+
+        return actions or [("pass", None)]
+
+
+def evaluate(game, root):
+    """Paranoid evaluation for `root`: its lead over the closest opponent in the race, plus spare walls."""
+    leader = game.winner()
+    if leader is not None:
+        return WIN_SCORE if leader == root else -WIN_SCORE
+    opponent_distance = min(game.distance(p) for p in range(4) if p != root)
+    spare_walls = game.walls_remaining[root] - max(game.walls_remaining[p] for p in range(4) if p != root)
+    return 10 * (opponent_distance - game.distance(root)) + spare_walls
+
+
+def paranoid(game, depth, alpha, beta, root, stats):
+    """
+    Paranoid alpha-beta: `root` maximizes and the three other players are assumed to minimize together.
+
+    Parameters:
+    - game: FourPlayerGame, modified in place and restored.
+    - depth: Remaining plies (4 plies = one full round).
+    - alpha, beta: Alpha-beta window.
+    - root: The player the search is run for.
+    - stats: Dict counting searched "nodes".
+
+    Returns:
+    - The score of the position for `root`.
+    """
+    stats["nodes"] += 1
+    if depth == 0 or game.winner() is not None:
+        score = evaluate(game, root)
+        # Prefer faster wins and slower losses
+        if score == WIN_SCORE:
+            return score + depth
+        if score == -WIN_SCORE:
+            return score - depth
+        return score
+
+    maximizing = game.to_move == root
+    best = float('-inf') if maximizing else float('inf')
+    for action in game.legal_actions(root):
+        game.apply(action)
+        score = paranoid(game, depth - 1, alpha, beta, root, stats)
+        game.undo()
+        if maximizing:
+            best = max(best, score)
+            alpha = max(alpha, score)
+        else:
+            best = min(best, score)
+            beta = min(beta, score)
+        if beta <= alpha:
+            break
+    return best
+
+
+def choose_action(game, depth=4, rng=None):
+    """
+    Pick the action of the player to move with a paranoid search.
+
+    Every root action after the first is searched with a bound just below the best score so far, so
+    an action that ties with the best is scored exactly and a worse one fails low below it; the choice
+    is made at random among the exact ties.
+
+    Returns:
+    - (action, score, nodes searched)
+    """
+    root = game.to_move
+    stats = {"nodes": 0}
+    best_actions, best_score = [], float('-inf')
+    alpha = float('-inf')
+    for action in game.legal_actions(root):
+        game.apply(action)
+        score = paranoid(game, depth - 1, math.nextafter(alpha, -math.inf), float('inf'), root, stats)
+        game.undo()
+        if score > best_score:
+            best_actions, best_score = [action], score
+        elif score == best_score:
+            best_actions.append(action)
+        alpha = max(alpha, score)
+    action = (rng or random).choice(best_actions)
+    return action, best_score, stats["nodes"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=400)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    game = FourPlayerGame()
+    for _ in range(args.max_turns):
+        player = game.to_move
+        action, score, nodes = choose_action(game, args.depth, rng)
+        shown = game.board.position(action[1]) if action[0] == "move" else action[1]
+        print(f"{PLAYER_NAMES[player]}: {action[0]} {shown} (score {score}, {nodes} nodes)")
+        game.apply(action)
+        if game.winner() is not None:
+            print(f"{PLAYER_NAMES[game.winner()]} wins!")
+            break
+
+
+if __name__ == "__main__":
+    main()
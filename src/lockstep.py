@@ -0,0 +1,315 @@
+"""
+Lockstep self-play: many games advanced together as NumPy arrays, to generate training data fast.
+
+LockstepGames keeps N games as arrays: pawn cells, Board.blocked edge bytes, wall slot occupancy and
+walls left. step() plays one action in every game at once. Distance fields (valuenet.distance_fields),
+pawn move legality (steps, straight jumps and diagonal side-steps, as Board.pawn_moves_index) and the
+wall candidates are all computed for every game together, so the interpreter cost is per step
+rather than per game.
+
+Both sides play the same greedy policy:
+- walls: the legal walls that cut one of the opponent's next shortest-path steps are tried, with a
+  distance field pair each. The one that lengthens the opponent's path most relative to the mover's
+  own path is placed if it gains WALL_MIN_GAIN steps, or one step while the mover is behind in the race.
+- moves: otherwise the pawn takes the legal move closest to its goal row (ties broken at random),
+  or, with probability epsilon, a random legal move, so that the games differ.
+
+Finished games (a pawn on its goal row, or max_actions reached) are written to the record file as
+they end and their slots restart with new games, until --games games have been played.
+
+Usage: python lockstep.py [--games 10000] [--batch 1024] [--out ../records/lockstep.qrec] [--epsilon 0.1]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from board import DIRECTION_BITS, PERPENDICULAR, board_geometry, wall_slot_tables
+from mcts import USER, goal_rows
+from records import GameRecordWriter
+from rules import GRID_SIZE, initial_positions
+from valuenet import distance_fields
+
+WALL_MIN_GAIN = 2  # Steps a wall must cost the opponent more than the mover to be placed while ahead
+WALL_CANDIDATES = 8  # Walls tried per game and step: two per shortest-path step of the opponent
+
+_table_cache = {}
+
+
+def lockstep_tables(grid_size=GRID_SIZE):
+    """
+    Board geometry and wall slot tables as NumPy arrays, built once per board size.
+
+    - neighbours[cell, direction] (the cell itself off the board) and on_board[cell, direction];
+    - slot_cells / slot_bits (slots, 4): the edge bits a wall sets, both ways across both edges it closes;
+    - conflicts (slots, 3): the slots a wall crosses or overlaps (the padding slot, never occupied, if none);
+    - edge_slots (cells, 4, 2): the slots whose wall closes each edge (padding slot if fewer than two).
+    """
+    tables = _table_cache.get(grid_size)
+    if tables is not None:
+        return tables
+    span = grid_size - 1
+    slot_count = 2 * span * span
+    padding = slot_count
+    geometry = np.array(board_geometry(grid_size))
+    on_board = geometry >= 0
+    neighbours = np.where(on_board, geometry, np.arange(grid_size * grid_size)[:, None])
+
+    _, slot_edges = wall_slot_tables(grid_size)
+    slot_cells = np.zeros((slot_count, 4), np.intp)
+    slot_bits = np.zeros((slot_count, 4), np.uint8)
+    edge_slots = np.full((grid_size * grid_size, 4, 2), padding, np.intp)
+    edge_counts = np.zeros((grid_size * grid_size, 4), np.intp)
+    for slot, edges in enumerate(slot_edges):
+        for index, (cell, direction) in enumerate(edges):
+            other = geometry[cell, direction]
+            back = direction - 1  # down <-> up, right <-> left
+            slot_cells[slot, 2 * index:2 * index + 2] = cell, other
+            slot_bits[slot, 2 * index:2 * index + 2] = DIRECTION_BITS[direction], DIRECTION_BITS[back]
+            for edge_cell, edge_direction in ((cell, direction), (other, back)):
+                edge_slots[edge_cell, edge_direction, edge_counts[edge_cell, edge_direction]] = slot
+                edge_counts[edge_cell, edge_direction] += 1
+
+    conflicts = np.full((slot_count, 3), padding, np.intp)
+    for slot in range(slot_count):
+        horizontal = slot < span * span
+        corner = slot % (span * span)
+        conflicts[slot, 0] = (slot + span * span) % slot_count  # The other orientation on the same crossing
+        step = 1 if horizontal else span
+        position = corner % span if horizontal else corner // span
+        if position > 0:
+            conflicts[slot, 1] = slot - step
+        if position < span - 1:
+            conflicts[slot, 2] = slot + step
+
+    tables = _table_cache[grid_size] = (neighbours, on_board, slot_cells, slot_bits, conflicts, edge_slots)
+    return tables
+
+
+class LockstepGames:
+    """
+    A batch of self-play games advanced one action at a time, all together.
+
+    Parameters:
+    - count: Number of games played at once.
+    - rng: numpy.random.Generator for tie-breaks and exploration.
+    - grid_size: Number of cells per side of the board.
+    - walls_per_player: Walls each side starts with.
+    - epsilon: Probability of a random pawn move instead of the greedy action.
+    - max_actions: Games still running after this many actions end unfinished.
+    """
+
+    def __init__(self, count, rng, grid_size=GRID_SIZE, walls_per_player=10, epsilon=0.1, max_actions=200):
+        self.rng = rng
+        self.grid_size = grid_size
+        self.walls_per_player = walls_per_player
+        self.epsilon = epsilon
+        self.max_actions = max_actions
+        cells = grid_size * grid_size
+        slots = 2 * (grid_size - 1) ** 2
+        self.tables = lockstep_tables(grid_size)
+        self.goals = np.array(goal_rows(grid_size))
+        self.start_cells = np.array([y * grid_size + x for x, y in initial_positions(grid_size)])
+
+        self.pawns = np.zeros((count, 2), np.intp)
+        self.blocked = np.zeros((count, cells), np.uint8)
+        self.occupied = np.zeros((count, slots + 1), np.uint8)  # Last column: the padding slot, never occupied
+        self.walls_left = np.zeros((count, 2), np.intp)
+        self.to_move = np.zeros(count, np.intp)
+        self.codes = np.zeros((count, max_actions), np.int16)
+        self.lengths = np.zeros(count, np.intp)
+        self.reset(np.arange(count))
+
+    def reset(self, games):
+        """Start new games in the given slots."""
+        self.pawns[games] = self.start_cells
+        self.blocked[games] = 0
+        self.occupied[games] = 0
+        self.walls_left[games] = self.walls_per_player
+        self.to_move[games] = USER
+        self.lengths[games] = 0
+
+    def keep(self, games):
+        """Drop every slot but the given ones (when no new games are to be started)."""
+        for name in ("pawns", "blocked", "occupied", "walls_left", "to_move", "codes", "lengths"):
+            setattr(self, name, getattr(self, name)[games])
+
+    def pawn_moves(self, own, opponent):
+        """
+        Legal pawn moves of every game's mover.
+
+        Returns:
+        - (targets, legal): (games, 12) arrays of target cells and whether each is a legal move; per
+          direction the step or straight jump, then the two diagonal side-steps.
+        """
+        neighbours, on_board = self.tables[:2]
+        games = np.arange(len(own))
+        targets = np.zeros((len(own), 12), np.intp)
+        legal = np.zeros((len(own), 12), bool)
+        for direction in range(4):
+            bit = DIRECTION_BITS[direction]
+            neighbour = neighbours[own, direction]
+            step_open = on_board[own, direction] & (self.blocked[games, own] & bit == 0)
+            adjacent = step_open & (neighbour == opponent)
+            jump_open = adjacent & on_board[neighbour, direction] & (self.blocked[games, neighbour] & bit == 0)
+            column = 3 * direction
+            targets[:, column] = np.where(jump_open, neighbours[neighbour, direction], neighbour)
+            legal[:, column] = (step_open & ~adjacent) | jump_open
+            for offset, side_direction in enumerate(PERPENDICULAR[direction], 1):
+                side_open = on_board[neighbour, side_direction] & \
+                    (self.blocked[games, neighbour] & DIRECTION_BITS[side_direction] == 0)
+                targets[:, column + offset] = neighbours[neighbour, side_direction]
+                legal[:, column + offset] = adjacent & ~jump_open & side_open
+        return targets, legal
+
+    def best_walls(self, own, opponent, own_goal, opponent_goal, own_distance, opponent_distance, opponent_field):
+        """
+        The most damaging legal wall of every game's mover, among the walls that cut one of the
+        opponent's next shortest-path steps.
+
+        Returns:
+        - (slots, gains): the wall slot of every game and how many more steps it costs the opponent than
+          the mover (gain below 1, and slot meaningless, if there is no useful legal wall).
+        """
+        neighbours, on_board, slot_cells, slot_bits, conflicts, edge_slots = self.tables
+        count = len(own)
+        cells = self.grid_size * self.grid_size
+        games = np.arange(count)
+
+        # Walls across the opponent's steps that shorten its distance
+        candidates = np.zeros((count, WALL_CANDIDATES), np.intp)
+        for direction in range(4):
+            neighbour = neighbours[opponent, direction]
+            on_path = on_board[opponent, direction] & \
+                (self.blocked[games, opponent] & DIRECTION_BITS[direction] == 0) & \
+                (opponent_field[games, neighbour] == opponent_distance - 1)
+            padding = self.occupied.shape[1] - 1
+            candidates[:, 2 * direction:2 * direction + 2] = np.where(on_path[:, None], edge_slots[opponent, direction],
+                                                                      padding)
+        valid = candidates < self.occupied.shape[1] - 1
+        valid &= (self.walls_left[games, self.to_move] > 0)[:, None]
+        valid &= self.occupied[games[:, None], candidates] == 0
+        for column in range(3):
+            valid &= self.occupied[games[:, None], conflicts[np.minimum(candidates, len(conflicts) - 1), column]] == 0
+
+        gains = np.zeros((count, WALL_CANDIDATES), np.intp)
+        game_index, candidate_index = np.nonzero(valid)
+        if len(game_index):
+            slots = candidates[game_index, candidate_index]
+            boards = self.blocked[game_index].copy()
+            for column in range(4):
+                boards[np.arange(len(slots)), slot_cells[slots, column]] |= slot_bits[slots, column]
+            fields = distance_fields(np.concatenate([boards, boards]),
+                                     np.concatenate([own_goal[game_index], opponent_goal[game_index]]),
+                                     self.grid_size)
+            tried = np.arange(len(slots))
+            new_own = fields[tried, own[game_index]]
+            new_opponent = fields[len(slots) + tried, opponent[game_index]]
+            paths_open = (new_own < cells) & (new_opponent < cells)
+            gain = (new_opponent - opponent_distance[game_index]) - (new_own - own_distance[game_index])
+            gains[game_index, candidate_index] = np.where(paths_open, gain, 0)
+        best = np.argmax(gains + self.rng.random(gains.shape) * 0.5, axis=1)
+        return candidates[games, best], gains[games, best]
+
+    def step(self):
+        """
+        Play one action in every game.
+
+        Returns:
+        - (finished, winners): indices of the games that ended with this action, and their winners
+          (USER, BOT or -1 for games stopped at max_actions).
+        """
+        count = len(self.to_move)
+        games = np.arange(count)
+        cells = self.grid_size * self.grid_size
+        mover = self.to_move
+        own = self.pawns[games, mover]
+        opponent = self.pawns[games, 1 - mover]
+        own_goal = self.goals[mover]
+        opponent_goal = self.goals[1 - mover]
+
+        fields = distance_fields(np.concatenate([self.blocked, self.blocked]),
+                                 np.concatenate([own_goal, opponent_goal]), self.grid_size)
+        own_field, opponent_field = fields[:count], fields[count:]
+        own_distance = own_field[games, own]
+        opponent_distance = opponent_field[games, opponent]
+
+        # Greedy pawn move, or a random one with probability epsilon
+        targets, legal = self.pawn_moves(own, opponent)
+        explore = self.rng.random(count) < self.epsilon
+        keys = np.where(explore[:, None], 0, own_field[games[:, None], targets]) + self.rng.random(targets.shape)
+        choice = np.argmin(np.where(legal, keys, np.inf), axis=1)
+        move_codes = np.where(legal.any(axis=1), targets[games, choice], own)  # Stay put without a legal move
+
+        slots, gains = self.best_walls(own, opponent, own_goal, opponent_goal, own_distance, opponent_distance,
+                                       opponent_field)
+        place_wall = ~explore & ((gains >= WALL_MIN_GAIN) | ((gains >= 1) & (own_distance > opponent_distance)))
+
+        moving = games[~place_wall]
+        self.pawns[moving, mover[moving]] = move_codes[moving]
+        walling = games[place_wall]
+        wall_slots = slots[walling]
+        self.occupied[walling, wall_slots] = 1
+        _, _, slot_cells, slot_bits, _, _ = self.tables
+        for column in range(4):
+            self.blocked[walling, slot_cells[wall_slots, column]] |= slot_bits[wall_slots, column]
+        self.walls_left[walling, mover[walling]] -= 1
+
+        self.codes[games, self.lengths] = np.where(place_wall, cells + slots, move_codes)
+        self.lengths += 1
+        won = self.pawns[games, mover] // self.grid_size == own_goal
+        finished = np.nonzero(won | (self.lengths >= self.max_actions))[0]
+        self.to_move = 1 - mover
+        return finished, np.where(won[finished], mover[finished], -1)
+
+
+def play(total, batch, writer, rng, grid_size=GRID_SIZE, epsilon=0.1, max_actions=200):
+    """
+    Play `total` games, `batch` at a time, writing each one to `writer` as it ends.
+
+    Returns:
+    - [user wins, bot wins, unfinished games].
+    """
+    games = LockstepGames(min(batch, total), rng, grid_size, epsilon=epsilon, max_actions=max_actions)
+    started = len(games.to_move)
+    results = [0, 0, 0]
+    while len(games.to_move):
+        finished, winners = games.step()
+        if not len(finished):
+            continue
+        for game, winner in zip(finished, winners):
+            writer.begin_game(grid_size, games.walls_per_player, first_player=USER)
+            writer.record_codes(games.codes[game, :games.lengths[game]].tolist())
+            writer.end_game(None if winner < 0 else int(winner))
+            results[winner] += 1
+        restart = finished[:max(0, total - started)]
+        games.reset(restart)
+        started += len(restart)
+        retired = finished[len(restart):]
+        if len(retired):
+            games.keep(np.setdiff1d(np.arange(len(games.to_move)), retired))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=1024, help="games played at once")
+    parser.add_argument("--out", default="../records/lockstep.qrec")
+    parser.add_argument("--epsilon", type=float, default=0.1, help="probability of a random pawn move")
+    parser.add_argument("--max-actions", type=int, default=200)
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with GameRecordWriter(args.out) as writer:
+        user_wins, bot_wins, unfinished = play(args.games, args.batch, writer, np.random.default_rng(args.seed),
+                                               args.grid_size, args.epsilon, args.max_actions)
+    seconds = time.perf_counter() - start
+    print(f"{args.games} games in {seconds:.1f} s ({args.games / seconds * 3600:.0f} games per hour): "
+          f"user side {user_wins} - bot side {bot_wins}, {unfinished} unfinished -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
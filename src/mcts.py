@@ -0,0 +1,374 @@
+"""Monte Carlo Tree Search (UCT) bot, an alternative to the Minimax search in bot.py."""
+import math
+import random
+import time
+
+from board import Board
+from rules import GRID_SIZE, HORIZONTAL, VERTICAL
+
+# Player indices (the user walks down to the last row, the bot walks up to row 0)
+USER, BOT = 0, 1
+
+# Distance fields are keyed by wall set, so they are shared by every node and rollout with the same walls
+DISTANCE_CACHE_LIMIT = 20000
+_distance_cache = {}
+
+
+def goal_rows(grid_size=GRID_SIZE):
+    """Goal row of each player, indexed by USER / BOT."""
+    return grid_size - 1, 0
+
+
+def distance_field(goal_y, walls, grid_size=GRID_SIZE):
+    """
+    Return the number of steps from every cell to the goal row, cached per wall configuration.
+
+    Parameters:
+    - goal_y: Integer for the target row (0 or grid_size - 1).
+    - walls: Iterable of wall positions (x, y, orientation).
+    - grid_size: Number of cells per side of the board.
+
+    Returns:
+    - Flat list indexed by y * grid_size + x, float('inf') for cells cut off from the goal.
+    """
+    key = (grid_size, goal_y, frozenset(walls))
+    field = _distance_cache.get(key)
+    if field is None:
+        if len(_distance_cache) >= DISTANCE_CACHE_LIMIT:
+            _distance_cache.clear()
+        field = Board(grid_size, key[2]).distance_field(goal_y)
+        _distance_cache[key] = field
+    return field
+
+
+def blocking_walls(position, move):
+    """Return the two wall slots that would block a single step from position to move."""
+    x, y = position
+    move_x, move_y = move
+    if move_y < y:  # Moving up
+        return [(x, y, HORIZONTAL), (x - 1, y, HORIZONTAL)]
+    if move_y > y:  # Moving down
+        return [(x, y + 1, HORIZONTAL), (x - 1, y + 1, HORIZONTAL)]
+    if move_x < x:  # Moving left
+        return [(x, y, VERTICAL), (x, y - 1, VERTICAL)]
+    return [(x + 1, y, VERTICAL), (x + 1, y - 1, VERTICAL)]  # Moving right
+
+
+def path_blocking_walls(position, field, board):
+    """
+    Collect the wall slots along a shortest path, i.e. the walls that can lengthen it.
+
+    Parameters:
+    - position: (x, y) start of the path.
+    - field: Distance field of the path owner's goal row.
+    - board: Board holding the currently placed walls.
+
+    Returns:
+    - List of distinct wall slots that pass is_valid_wall (path blocking is not checked here).
+    """
+    candidates = []
+    seen = set()
+    cell = board.cell(position)
+    while field[cell] not in (0, float('inf')):
+        for move in board.pawn_moves_index(cell):
+            if field[move] == field[cell] - 1:
+                break
+        else:
+            break
+        for wall in blocking_walls(board.position(cell), board.position(move)):
+            if wall not in seen and board.is_valid_wall(wall):
+                seen.add(wall)
+                candidates.append(wall)
+        cell = move
+    return candidates
+
+
+def keeps_paths_open(positions, walls, grid_size=GRID_SIZE):
+    """Check with the cached distance fields that both players can still reach their goal rows."""
+    return all(
+        distance_field(goal_y, walls, grid_size)[y * grid_size + x] != float('inf')
+        for (x, y), goal_y in zip(positions, goal_rows(grid_size))
+    )
+
+
+def winner(state, grid_size=GRID_SIZE):
+    """Return the index of the player standing on their goal row, or None."""
+    positions = state[0]
+    for player, goal_y in enumerate(goal_rows(grid_size)):
+        if positions[player][1] == goal_y:
+            return player
+    return None
+
+
+def state_key(state):
+    """Hashable identity of a state that ignores the order the walls were placed in."""
+    positions, walls, walls_remaining, to_move = state
+    return positions, frozenset(walls), walls_remaining, to_move
+
+
+def legal_actions(state, grid_size=GRID_SIZE):
+    """
+    Generate the actions searched by the tree.
+
+    Pawn moves are complete; wall placements are limited to slots along the opponent's
+    shortest path, which are the only walls that can lengthen it.
+    """
+    positions, walls, walls_remaining, to_move = state
+    opponent = 1 - to_move
+    board = Board(grid_size, walls)
+    actions = [("move", move) for move in board.pawn_moves(positions[to_move], positions[opponent])]
+
+    if walls_remaining[to_move] > 0:
+        field = distance_field(goal_rows(grid_size)[opponent], walls, grid_size)
+        for wall in path_blocking_walls(positions[opponent], field, board):
+            if keeps_paths_open(positions, walls + (wall,), grid_size):
+                actions.append(("wall", wall))
+
+    return actions
+
+
+def next_state(state, action):
+    """Apply an action to an immutable state and return the new state."""
+    positions, walls, walls_remaining, to_move = state
+    if action[0] == "move":
+        positions = list(positions)
+        positions[to_move] = action[1]
+        positions = tuple(positions)
+    else:
+        walls = walls + (action[1],)
+        walls_remaining = list(walls_remaining)
+        walls_remaining[to_move] -= 1
+        walls_remaining = tuple(walls_remaining)
+    return positions, walls, walls_remaining, 1 - to_move
+
+
+class MCTSNode:
+    """A search tree node; `wins` counts rollouts won by the player who played `action`."""
+    __slots__ = ("state", "parent", "action", "children", "untried_actions", "visits", "wins")
+
+    def __init__(self, state, parent=None, action=None):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.children = []
+        self.untried_actions = None  # Generated on the first expansion
+        self.visits = 0
+        self.wins = 0.0
+
+
+class MCTSBot:
+    """
+    UCT search with shortest-path rollouts and tree reuse between moves.
+
+    Parameters:
+    - iterations: Node budget, the maximum number of playouts per move.
+    - time_limit: Time budget per move in seconds.
+    - exploration: UCT exploration constant.
+    - wall_probability: Chance that a rollout player with walls left places one on the opponent's path.
+    - max_rollout_moves: Rollouts longer than this are decided by the pawn race.
+    - workers: Number of processes for root-parallel search (1 keeps the tree for reuse).
+    - seed: Optional random seed.
+    - grid_size: Number of cells per side of the board.
+    """
+
+    def __init__(self, iterations=3000, time_limit=2.0, exploration=1.4, wall_probability=0.15,
+                 max_rollout_moves=60, workers=1, seed=None, grid_size=GRID_SIZE):
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.wall_probability = wall_probability
+        self.max_rollout_moves = max_rollout_moves
+        self.workers = workers
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.grid_size = grid_size
+        self.goal_rows = goal_rows(grid_size)
+        self.root = None
+
+    def choose_action(self, player_positions, walls, bot_walls_remaining, user_walls_remaining, player=BOT):
+        """
+        Search the position and return the most visited action for `player`.
+
+        Returns:
+        - ("move", (x, y)) or ("wall", (x, y, orientation)), or None if the player has no action.
+        """
+        state = (tuple(player_positions), tuple(walls), (user_walls_remaining, bot_walls_remaining), player)
+
+        if self.workers > 1:
+            return self._choose_parallel(state)
+
+        root = self.search(state)
+        if not root.children:
+            return None
+        best = max(root.children, key=lambda child: child.visits)
+        # Keep the chosen subtree; the opponent's reply is looked up among its children next turn
+        best.parent = None
+        self.root = best
+        return best.action
+
+    def search(self, state):
+        """Run playouts from `state` until the node or time budget runs out and return the root."""
+        root = self._reuse_root(state)
+        deadline = time.perf_counter() + self.time_limit
+        for _ in range(self.iterations):
+            if time.perf_counter() >= deadline:
+                break
+            self._playout(root)
+        return root
+
+    def _reuse_root(self, state):
+        """Find `state` in the tree kept from the previous move, or start a new tree."""
+        key = state_key(state)
+        if self.root is not None:
+            for node in [self.root] + self.root.children:
+                if state_key(node.state) == key:
+                    node.parent = None
+                    return node
+        return MCTSNode(state)
+
+    def _playout(self, root):
+        node = root
+
+        # Selection
+        while node.untried_actions == [] and node.children:
+            node = self._select_child(node)
+
+        # Expansion
+        if winner(node.state, self.grid_size) is None:
+            if node.untried_actions is None:
+                node.untried_actions = self._ordered_actions(node.state)
+            if node.untried_actions:
+                action = node.untried_actions.pop()
+                child = MCTSNode(next_state(node.state, action), node, action)
+                node.children.append(child)
+                node = child
+
+        # Simulation
+        result = self.rollout(node.state)
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if node.parent is not None and node.parent.state[3] == result:
+                node.wins += 1
+            node = node.parent
+
+    def _select_child(self, node):
+        log_visits = math.log(node.visits)
+        return max(
+            node.children,
+            key=lambda child: child.wins / child.visits + self.exploration * math.sqrt(log_visits / child.visits)
+        )
+
+    def _ordered_actions(self, state):
+        """Legal actions ordered so that pop() expands the shortest-path moves first."""
+        positions, walls, _, to_move = state
+        size = self.grid_size
+        actions = legal_actions(state, size)
+        self.rng.shuffle(actions)
+        field = distance_field(self.goal_rows[to_move], walls, size)
+        actions.sort(
+            key=lambda action: -field[action[1][1] * size + action[1][0]] if action[0] == "move" else -float('inf')
+        )
+        return actions
+
+    def rollout(self, state):
+        """
+        Play the state out with the cached shortest-path policy and return the winning player.
+
+        Each player steps along its distance field, occasionally placing a wall on the opponent's
+        shortest path. Once no walls are left (or the move cap is hit) the race is decided from the distances.
+        """
+        result = winner(state, self.grid_size)
+        if result is not None:
+            return result
+
+        positions = list(state[0])
+        board = Board(self.grid_size, state[1])
+        walls_remaining = list(state[2])
+        to_move = state[3]
+        fields = self._fields(board)
+
+        for _ in range(self.max_rollout_moves):
+            if not walls_remaining[USER] and not walls_remaining[BOT]:
+                break
+            opponent = 1 - to_move
+
+            if walls_remaining[to_move] and self.rng.random() < self.wall_probability:
+                wall = self._rollout_wall(positions, board, opponent, fields[opponent])
+                if wall is not None:
+                    board.place_wall(wall)
+                    fields = self._fields(board)
+                    walls_remaining[to_move] -= 1
+                    to_move = opponent
+                    continue
+
+            positions[to_move] = self._rollout_step(positions, board, to_move, fields[to_move])
+            if positions[to_move][1] == self.goal_rows[to_move]:
+                return to_move
+            to_move = opponent
+
+        return self._race_winner(positions, fields, to_move)
+
+    def _fields(self, board):
+        return tuple(distance_field(goal_y, board.walls, self.grid_size) for goal_y in self.goal_rows)
+
+    def _rollout_step(self, positions, board, player, field):
+        """Move (or jump) to a cell that is closest to the goal, breaking ties randomly."""
+        best_moves = []
+        best_distance = float('inf')
+        for move in board.pawn_moves_index(board.cell(positions[player]), board.cell(positions[1 - player])):
+            distance = field[move]
+            if distance < best_distance:
+                best_moves = [move]
+                best_distance = distance
+            elif distance == best_distance:
+                best_moves.append(move)
+        return board.position(self.rng.choice(best_moves)) if best_moves else positions[player]
+
+    def _rollout_wall(self, positions, board, opponent, opponent_field):
+        """Pick a random legal wall on the opponent's shortest path, or None."""
+        candidates = path_blocking_walls(positions[opponent], opponent_field, board)
+        self.rng.shuffle(candidates)
+        pawns = list(zip(positions, self.goal_rows))
+        for wall in candidates[:3]:
+            if board.wall_keeps_paths_open(wall, pawns):
+                return wall
+        return None
+
+    def _race_winner(self, positions, fields, to_move):
+        """With walls out of play, the player to move wins ties in the pawn race."""
+        opponent = 1 - to_move
+        size = self.grid_size
+        my_x, my_y = positions[to_move]
+        opponent_x, opponent_y = positions[opponent]
+        my_distance = fields[to_move][my_y * size + my_x]
+        opponent_distance = fields[opponent][opponent_y * size + opponent_x]
+        return to_move if my_distance <= opponent_distance else opponent
+
+    def _choose_parallel(self, state):
+        """Root-parallel search: independent trees in worker processes with merged root statistics."""
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing is slow to import; only load it here
+
+        base_seed = self.rng.randrange(2 ** 31)
+        visits = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(_root_statistics, state, self.iterations, self.time_limit, self.exploration,
+                                self.wall_probability, self.max_rollout_moves, base_seed + i, self.grid_size)
+                for i in range(self.workers)
+            ]
+            for future in futures:
+                for action, action_visits in future.result().items():
+                    visits[action] = visits.get(action, 0) + action_visits
+        self.root = None
+        return max(visits, key=visits.get) if visits else None
+
+
+def _root_statistics(state, iterations, time_limit, exploration, wall_probability, max_rollout_moves, seed,
+                     grid_size):
+    """Worker entry point for root-parallel search; returns visit counts per root action."""
+    searcher = MCTSBot(iterations, time_limit, exploration, wall_probability, max_rollout_moves, seed=seed,
+                       grid_size=grid_size)
+    root = searcher.search(state)
+    return {child.action: child.visits for child in root.children}
@@ -0,0 +1,381 @@
+"""
+Differential testing of rules engines against reference implementations of the rules.
+
+An engine is a class built from one wall list that answers the five questions the search asks all
+the time (see RulesEngine, the reference). The reference answers the path questions with the plain
+breadth-first searches below, kept apart from rules.py so that its A* (the "astar" engine) is
+checked against them too. Random games of random legal actions produce positions.
+On every position each engine answers every question below, and each comparison counts as one case:
+- is_wall_blocking_move: every step between adjacent cells;
+- causes_overlap: every wall slot;
+- get_all_possible_moves: both pawns, with the opponent where it is and on each neighbouring cell
+  (jumps and diagonal side-steps);
+- shortest_path_length and is_path_open: both pawns, also after adding a few random walls, which
+  may cut a pawn off.
+
+Games are spread over worker processes. The first case that differs, in game order, is shrunk: walls
+are dropped, and the opponent removed, as long as the answers still differ. It is then printed with
+a diagram of the board, and the script exits with status 1.
+
+Engines are given as "board" (the array-backed Board), "astar" (the rules.py functions) or
+"module:Class" for a new engine.
+
+Usage: python oracle.py [--engine board] [--games 200] [--plies 40] [--workers 4] [--seed 0]
+"""
+import argparse
+import importlib
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import rules
+from board import Board
+from rules import GRID_SIZE, HORIZONTAL, VERTICAL, initial_positions
+
+EXTRA_WALLS = 4  # Random walls added to each position for the path questions
+WALL_PROBABILITY = 0.3  # Chance that a random game places a wall instead of moving
+OPPONENT_ARGUMENT = {"get_all_possible_moves": 1, "shortest_path_length": 2}  # Index of the opponent position
+
+
+def bfs_is_path_open(player_position, goal_y, walls, grid_size=GRID_SIZE):
+    """Reference: breadth-first search for any path to the goal row."""
+    visited = set()
+    queue = deque([player_position])
+
+    while queue:
+        x, y = queue.popleft()
+        if (x, y) in visited:
+            continue
+        visited.add((x, y))
+
+        # Check if the player reached the goal row
+        if y == goal_y:
+            return True
+
+        # Add valid moves to the queue
+        for move_x, move_y in [(x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)]:
+            if 0 <= move_x < grid_size and 0 <= move_y < grid_size and \
+               not rules.is_wall_blocking_move((x, y), (move_x, move_y), walls) and \
+               (move_x, move_y) not in visited:
+                queue.append((move_x, move_y))
+
+    return False
+
+
+def bfs_shortest_path_length(start, goal_y, walls, opponent_position=None, grid_size=GRID_SIZE):
+    """Reference: breadth-first shortest path length, jumping over the opponent; inf if there is no path."""
+    queue = deque([(start, 0)])  # (position, distance)
+    visited = set()
+
+    while queue:
+        (x, y), dist = queue.popleft()
+        if (x, y) in visited:
+            continue
+        visited.add((x, y))
+
+        # Check if the goal row is reached
+        if y == goal_y:
+            return dist
+
+        # Add valid moves to the queue, considering walls and jumps
+        for move in rules.get_all_possible_moves((x, y), walls, opponent_position, grid_size):
+            if move not in visited:
+                queue.append((move, dist + 1))
+
+    return float('inf')
+
+
+class RulesEngine:
+    """
+    Reference engine: the list-based functions of rules.py, with the breadth-first searches above for
+    the path questions.
+
+    Parameters:
+    - walls: List of placed walls.
+    - grid_size: Number of cells per side of the board.
+    """
+
+    def __init__(self, walls, grid_size=GRID_SIZE):
+        self.walls = list(walls)
+        self.grid_size = grid_size
+
+    def is_wall_blocking_move(self, position, move):
+        return rules.is_wall_blocking_move(position, move, self.walls)
+
+    def causes_overlap(self, wall):
+        return rules.causes_overlap(wall, self.walls)
+
+    def is_path_open(self, position, goal_y):
+        return bfs_is_path_open(position, goal_y, self.walls, self.grid_size)
+
+    def shortest_path_length(self, start, goal_y, opponent_position=None):
+        return bfs_shortest_path_length(start, goal_y, self.walls, opponent_position, self.grid_size)
+
+    def get_all_possible_moves(self, position, opponent_position=None):
+        return rules.get_all_possible_moves(position, self.walls, opponent_position, self.grid_size)
+
+
+class AStarEngine(RulesEngine):
+    """The A* path searches of rules.py (rules.find_path) behind the RulesEngine interface."""
+
+    def is_path_open(self, position, goal_y):
+        return rules.is_path_open(position, goal_y, self.walls, self.grid_size)
+
+    def shortest_path_length(self, start, goal_y, opponent_position=None):
+        return rules.shortest_path_length(start, goal_y, self.walls, opponent_position, self.grid_size)
+
+
+class BoardEngine:
+    """The array-backed Board of board.py behind the RulesEngine interface."""
+
+    def __init__(self, walls, grid_size=GRID_SIZE):
+        self.board = Board(grid_size, walls)
+
+    def is_wall_blocking_move(self, position, move):
+        return self.board.is_wall_blocking_move(position, move)
+
+    def causes_overlap(self, wall):
+        # For walls inside the board, overlapping or crossing a wall is the only way to be invalid
+        return not self.board.is_valid_wall(wall)
+
+    def is_path_open(self, position, goal_y):
+        return self.board.is_path_open(position, goal_y)
+
+    def shortest_path_length(self, start, goal_y, opponent_position=None):
+        return self.board.shortest_path_length(start, goal_y, opponent_position)
+
+    def get_all_possible_moves(self, position, opponent_position=None):
+        return self.board.pawn_moves(position, opponent_position)
+
+
+ENGINES = {"board": BoardEngine, "astar": AStarEngine}
+
+
+def load_engine(spec):
+    """Engine class for a name in ENGINES or a "module:Class" spec."""
+    if spec in ENGINES:
+        return ENGINES[spec]
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def neighbours(position, grid_size):
+    x, y = position
+    return [(nx, ny) for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y))
+            if 0 <= nx < grid_size and 0 <= ny < grid_size]
+
+
+def all_walls(grid_size):
+    """Every wall that fits on the board, horizontal ones first."""
+    span = grid_size - 1
+    return ([(x, y + 1, HORIZONTAL) for y in range(span) for x in range(span)] +
+            [(x + 1, y, VERTICAL) for x in range(span) for y in range(span)])
+
+
+def position_questions(positions, walls, rng, grid_size):
+    """
+    Every question asked about one position.
+
+    Returns:
+    - List of (walls, method name, arguments) triples.
+    """
+    questions = []
+    for x in range(grid_size):
+        for y in range(grid_size):
+            for move in neighbours((x, y), grid_size):
+                questions.append((walls, "is_wall_blocking_move", ((x, y), move)))
+    for wall in all_walls(grid_size):
+        questions.append((walls, "causes_overlap", (wall,)))
+
+    goals = (grid_size - 1, 0)
+    for player in (0, 1):
+        position = positions[player]
+        opponent = positions[1 - player]
+        questions.append((walls, "get_all_possible_moves", (position, opponent)))
+        for cell in neighbours(position, grid_size):
+            questions.append((walls, "get_all_possible_moves", (position, cell)))
+        questions.append((walls, "shortest_path_length", (position, goals[player], opponent)))
+        questions.append((walls, "shortest_path_length", (position, goals[player])))
+        questions.append((walls, "is_path_open", (position, goals[player])))
+
+    # A few more walls, without the legality check, so cut-off pawns are asked about too
+    reference = RulesEngine(walls, grid_size)
+    extra_walls = list(walls)
+    for wall in rng.sample(all_walls(grid_size), EXTRA_WALLS):
+        if not reference.causes_overlap(wall):
+            extra_walls.append(wall)
+            reference = RulesEngine(extra_walls, grid_size)
+    for player in (0, 1):
+        questions.append((extra_walls, "shortest_path_length",
+                          (positions[player], goals[player], positions[1 - player])))
+        questions.append((extra_walls, "is_path_open", (positions[player], goals[player])))
+    return questions
+
+
+def answers_differ(engine_class, walls, method, arguments, grid_size):
+    """(reference answer, engine answer) if they differ, else None."""
+    expected = getattr(RulesEngine(walls, grid_size), method)(*arguments)
+    try:
+        actual = getattr(engine_class(walls, grid_size), method)(*arguments)
+    except Exception as error:
+        actual = f"raised {error!r}"
+    return None if actual == expected else (expected, actual)
+
+
+def random_action(positions, walls, walls_remaining, player, rng, grid_size):
+    """A random legal action: a wall that leaves both paths open, or a pawn move."""
+    if walls_remaining[player] and rng.random() < WALL_PROBABILITY:
+        candidates = all_walls(grid_size)
+        rng.shuffle(candidates)
+        for wall in candidates:
+            new_walls = walls + [wall]
+            if rules.is_valid_wall(wall, walls, grid_size) and all(
+                    bfs_is_path_open(positions[p], goal_y, new_walls, grid_size)
+                    for p, goal_y in ((0, grid_size - 1), (1, 0))):
+                return "wall", wall
+    return "move", rng.choice(rules.get_all_possible_moves(positions[player], walls, positions[1 - player], grid_size))
+
+
+def check_games(task):
+    """
+    Play random games and compare every answer (runs in a worker process).
+
+    Parameters:
+    - task: (engine spec, seed, games, plies per game, grid size).
+
+    Returns:
+    - (cases compared, first divergence or None); a divergence is a dict with the position, the
+      question and both answers.
+    """
+    engine_spec, seed, games, plies, grid_size = task
+    engine_class = load_engine(engine_spec)
+    rng = random.Random(seed)
+    cases = 0
+    for game in range(games):
+        positions = initial_positions(grid_size)
+        walls = []
+        walls_remaining = [10, 10]
+        for ply in range(plies):
+            questions = position_questions(positions, walls, rng, grid_size)
+            # Build each engine once per wall list
+            engines = {}
+            for question_walls, method, arguments in questions:
+                key = id(question_walls)
+                if key not in engines:
+                    engines[key] = (RulesEngine(question_walls, grid_size), engine_class(question_walls, grid_size))
+                reference, engine = engines[key]
+                expected = getattr(reference, method)(*arguments)
+                try:
+                    actual = getattr(engine, method)(*arguments)
+                except Exception as error:
+                    actual = f"raised {error!r}"
+                cases += 1
+                if actual != expected:
+                    return cases, {"seed": seed, "game": game, "ply": ply, "positions": list(positions),
+                                   "walls": list(question_walls), "method": method, "arguments": arguments,
+                                   "expected": expected, "actual": actual}
+
+            player = ply % 2
+            kind, value = random_action(positions, walls, walls_remaining, player, rng, grid_size)
+            if kind == "move":
+                positions[player] = value
+            else:
+                walls.append(value)
+                walls_remaining[player] -= 1
+            if positions[0][1] == grid_size - 1 or positions[1][1] == 0:
+                break
+    return cases, None
+
+
+def minimize(engine_class, divergence, grid_size):
+    """Drop walls (and the opponent pawn) from a divergence for as long as the answers still differ."""
+    walls = list(divergence["walls"])
+    method = divergence["method"]
+    arguments = tuple(divergence["arguments"])
+    answers = divergence["expected"], divergence["actual"]
+    shrinking = True
+    while shrinking:
+        shrinking = False
+        for index in range(len(walls)):
+            trial = walls[:index] + walls[index + 1:]
+            result = answers_differ(engine_class, trial, method, arguments, grid_size)
+            if result is not None:
+                walls, answers, shrinking = trial, result, True
+                break
+    opponent_index = OPPONENT_ARGUMENT.get(method)
+    if opponent_index is not None and len(arguments) > opponent_index:
+        trial_arguments = arguments[:opponent_index]
+        result = answers_differ(engine_class, walls, method, trial_arguments, grid_size)
+        if result is not None:
+            arguments, answers = trial_arguments, result
+    return dict(divergence, walls=walls, arguments=arguments, expected=answers[0], actual=answers[1])
+
+
+def board_diagram(walls, marks, grid_size):
+    """
+    Text picture of a board: cells as ".", `marks` ({(x, y): letter}) on their cells, walls as - and |.
+    """
+    rows = [[" "] * (2 * grid_size - 1) for _ in range(2 * grid_size - 1)]
+    for x in range(grid_size):
+        for y in range(grid_size):
+            rows[2 * y][2 * x] = marks.get((x, y), ".")
+    for x, y, orientation in walls:
+        if orientation == HORIZONTAL:  # Between rows y - 1 and y, under columns x and x + 1
+            for column in range(2 * x, 2 * x + 3):
+                rows[2 * y - 1][column] = "-"
+        else:  # Between columns x - 1 and x, beside rows y and y + 1
+            for row in range(2 * y, 2 * y + 3):
+                rows[row][2 * x - 1] = "|"
+    return "\n".join(("    " + "".join(row)).rstrip() for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", default="board", help="engine name or module:Class")
+    parser.add_argument("--games", type=int, default=200, help="random games")
+    parser.add_argument("--plies", type=int, default=40, help="actions per random game")
+    parser.add_argument("--chunk", type=int, default=5, help="games per worker task")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine_class = load_engine(args.engine)
+    tasks = [(args.engine, args.seed + index, min(args.chunk, args.games - start), args.plies, args.grid_size)
+             for index, start in enumerate(range(0, args.games, args.chunk))]
+    cases = 0
+    divergence = None
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as executor:
+        # map() returns results in task order, so the first divergence found is the first in game order
+        for task_cases, divergence in executor.map(check_games, tasks):
+            cases += task_cases
+            if divergence is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+    seconds = time.perf_counter() - start
+    print(f"{cases} cases compared in {seconds:.1f} s ({cases / max(seconds, 1e-9):.0f} per second)")
+    if divergence is None:
+        print(f"No divergence between the reference and {args.engine}")
+        return
+
+    divergence = minimize(engine_class, divergence, args.grid_size)
+    arguments = ", ".join(repr(argument) for argument in divergence["arguments"])
+    marks = {divergence["arguments"][0]: "A"}
+    opponent_index = OPPONENT_ARGUMENT.get(divergence["method"])
+    if opponent_index is not None and len(divergence["arguments"]) > opponent_index:
+        marks[divergence["arguments"][opponent_index]] = "B"
+    print(f"First divergence (seed {divergence['seed']}, game {divergence['game']}, ply {divergence['ply']}), "
+          f"minimized to {len(divergence['walls'])} walls:")
+    print(f"  {divergence['method']}({arguments})")
+    print(f"  walls:     {divergence['walls']}")
+    print(f"  reference: {divergence['expected']!r}")
+    print(f"  {args.engine}: {divergence['actual']!r}")
+    print(board_diagram(divergence["walls"], marks, args.grid_size))
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Opt-in profiling of the engine: calls and time of the rules and search functions, per call stack.
+
+enable() swaps every function in TARGETS for a timing wrapper, in its own module and in every module
+that imported it by name (`from rules import ...`); disable() puts the originals back. Nothing is
+wrapped until enable() is called, so with profiling off the hot paths run exactly the code they run
+without this module. Only the calling process is profiled, not the workers of a parallel search.
+
+A Profiler keeps, for every distinct stack of profiled calls, the number of calls and the self time
+(time not spent in profiled callees), and writes:
+- collapsed stacks, one "bot_turn;search_best_action;minimax;evaluate_state 1234" line per stack
+  weighted by microseconds of self time: the input of flamegraph.pl, inferno and speedscope;
+- a JSON summary with the calls, total and self seconds of every function, by self time.
+
+Run on its own it plays bot_turn against an MCTS user and writes both files for every game.
+
+Usage: python profiling.py [--games 3] [--out ../profiles] [--opponent-iterations 200] [--seed 0]
+"""
+import argparse
+import functools
+import importlib
+import json
+import os
+import sys
+import time
+
+import bot
+from mcts import MCTSBot
+from rules import GRID_SIZE, initial_positions
+from state import USER, BOT
+
+# (module, function or Class.method) pairs wrapped by enable()
+TARGETS = [
+    ("rules", "is_wall_blocking_move"),
+    ("rules", "causes_overlap"),
+    ("rules", "is_path_open"),
+    ("rules", "shortest_path_length"),
+    ("rules", "calculate_shortest_path"),
+    ("rules", "get_all_possible_moves"),
+    ("rules", "is_valid_wall"),
+    ("rules", "game_over"),
+    ("board", "Board.is_valid_slot"),
+    ("board", "Board.pawn_moves_index"),
+    ("board", "Board.distance_field_from"),
+    ("board", "Board.shortest_path_length_index"),
+    ("board", "Board.is_path_open"),
+    ("board", "Board.wall_keeps_paths_open"),
+    ("board", "Board.legal_walls"),
+    ("state", "SearchState.apply"),
+    ("state", "SearchState.undo"),
+    ("mcts", "distance_field"),
+    ("mcts", "keeps_paths_open"),
+    ("mcts", "path_blocking_walls"),
+    ("mcts", "MCTSBot.choose_action"),
+    ("bot", "bot_turn"),
+    ("bot", "cached_action"),
+    ("bot", "search_best_action"),
+    ("bot", "timed_search"),
+    ("bot", "minimax"),
+    ("bot", "evaluate_board"),
+    ("bot", "evaluate_state"),
+    ("bot", "network_scores"),
+    ("bot", "race_extension"),
+    ("bot", "forcing_walls"),
+    ("bot", "find_choke_points"),
+    ("bot", "get_all_possible_bot_actions"),
+    ("bot", "evaluate_action_priority"),
+]
+
+_installed = []  # (owner, attribute, original) of every swapped function, while profiling is enabled
+
+
+class Profiler:
+    """Call counts and times per stack of profiled calls."""
+
+    def __init__(self):
+        self.stack = []  # Names of the profiled calls in progress
+        self.frames = []  # [start ns, ns spent in profiled callees] of the calls in progress
+        self.stacks = {}  # Tuple of names -> [calls, self ns]
+        self.totals = {}  # Name -> [calls, total ns]; recursive calls add their time at the outermost level only
+
+    def wrap(self, name, function):
+        """Return a wrapper of `function` that records its calls under `name`."""
+        stack = self.stack
+        frames = self.frames
+        stacks = self.stacks
+        totals = self.totals
+        clock = time.perf_counter_ns
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            stack.append(name)
+            frame = [clock(), 0]
+            frames.append(frame)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - frame[0]
+                frames.pop()
+                key = tuple(stack)
+                stack.pop()
+                entry = stacks.get(key)
+                if entry is None:
+                    entry = stacks[key] = [0, 0]
+                entry[0] += 1
+                entry[1] += elapsed - frame[1]
+                total = totals.get(name)
+                if total is None:
+                    total = totals[name] = [0, 0]
+                total[0] += 1
+                if name not in stack:
+                    total[1] += elapsed
+                if frames:
+                    frames[-1][1] += elapsed
+
+        return wrapper
+
+    def reset(self):
+        """Forget everything recorded so far (e.g. between games); calls in progress are kept."""
+        self.stacks.clear()
+        self.totals.clear()
+
+    def collapsed_stacks(self):
+        """Lines of collapsed-stack output, weighted by microseconds of self time."""
+        return [f"{';'.join(key)} {self_ns // 1000}" for key, (_, self_ns) in sorted(self.stacks.items())]
+
+    def summary(self):
+        """Per function: calls, total seconds and self seconds, ordered by self time."""
+        self_times = {}
+        for key, (_, self_ns) in self.stacks.items():
+            self_times[key[-1]] = self_times.get(key[-1], 0) + self_ns
+        functions = {
+            name: {"calls": calls, "total_seconds": total_ns / 1e9, "self_seconds": self_times.get(name, 0) / 1e9}
+            for name, (calls, total_ns) in self.totals.items()
+        }
+        return dict(sorted(functions.items(), key=lambda item: -item[1]["self_seconds"]))
+
+    def write(self, folded_path, json_path, **info):
+        """Write the collapsed stacks and the JSON summary (with `info` added at its top level)."""
+        with open(folded_path, "w") as folded_file:
+            folded_file.write("\n".join(self.collapsed_stacks()) + "\n")
+        with open(json_path, "w") as json_file:
+            json.dump(dict(info, functions=self.summary()), json_file, indent=2)
+
+
+def enable(profiler=None):
+    """
+    Start profiling the TARGETS functions.
+
+    Returns:
+    - The Profiler that records the calls (a new one unless given).
+    """
+    if _installed:
+        raise RuntimeError("profiling is already enabled")
+    profiler = profiler or Profiler()
+    for module_name, target in TARGETS:
+        owner = importlib.import_module(module_name)
+        *classes, attribute = target.split(".")
+        for class_name in classes:
+            owner = getattr(owner, class_name)
+        original = getattr(owner, attribute)
+        wrapper = profiler.wrap(target, original)
+        setattr(owner, attribute, wrapper)
+        _installed.append((owner, attribute, original))
+        if classes:
+            continue
+        # Modules that imported the function by name call it through their own global
+        for module in list(sys.modules.values()):
+            if module is not owner and getattr(module, "__dict__", {}).get(attribute) is original:
+                setattr(module, attribute, wrapper)
+                _installed.append((module, attribute, original))
+    return profiler
+
+
+def disable():
+    """Put the original functions back."""
+    while _installed:
+        owner, attribute, original = _installed.pop()
+        setattr(owner, attribute, original)
+
+
+def play_profiled_game(opponent_iterations, seed, max_actions=200):
+    """
+    Play one game of bot_turn against an MCTS user.
+
+    Returns:
+    - The winner ("user", "bot" or None if the game was still running after max_actions) and the bot's turns.
+    """
+    opponent = MCTSBot(opponent_iterations, time_limit=10.0, seed=seed)
+    player_positions = initial_positions(GRID_SIZE)
+    walls = []
+    walls_remaining = [10, 10]
+    user_last_position = player_positions[USER]
+    turn_count = 0
+    with bot.quiet():
+        for _ in range(max_actions // 2):
+            action = opponent.choose_action(player_positions, walls, walls_remaining[BOT], walls_remaining[USER],
+                                            player=USER)
+            if action is not None:
+                if action[0] == "move":
+                    player_positions[USER] = action[1]
+                else:
+                    walls.append(action[1])
+                    walls_remaining[USER] -= 1
+            if player_positions[USER][1] == GRID_SIZE - 1:
+                return "user", turn_count
+
+            walls_remaining[BOT] = bot.bot_turn(player_positions, walls, walls_remaining[BOT], walls_remaining[USER],
+                                                user_last_position, turn_count)
+            user_last_position = player_positions[USER]
+            turn_count += 1
+            if player_positions[BOT][1] == 0:
+                return "bot", turn_count
+    return None, turn_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--out", default="../profiles", help="directory for game_N.folded and game_N.json")
+    parser.add_argument("--opponent-iterations", type=int, default=200, help="MCTS playouts per user move")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=8, help="functions listed per game")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    profiler = enable()
+    try:
+        for game in range(1, args.games + 1):
+            profiler.reset()
+            start = time.perf_counter()
+            winner, turns = play_profiled_game(args.opponent_iterations, args.seed + game)
+            seconds = time.perf_counter() - start
+            folded_path = os.path.join(args.out, f"game_{game}.folded")
+            profiler.write(folded_path, os.path.join(args.out, f"game_{game}.json"), game=game, seed=args.seed + game,
+                           winner=winner, bot_turns=turns, seconds=seconds)
+            print(f"Game {game}: {winner or 'nobody'} wins after {turns} bot turns, {seconds:.1f} s -> {folded_path}")
+            print(f"  {'function':<36} {'calls':>9} {'self s':>8} {'total s':>8}")
+            for name, entry in list(profiler.summary().items())[:args.top]:
+                print(f"  {name:<36} {entry['calls']:>9} {entry['self_seconds']:>8.3f} {entry['total_seconds']:>8.3f}")
+    finally:
+        disable()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Compact binary game records.
+
+File layout: the 5-byte file header b"QREC" + version, then games back to back. Each game is a
+6-byte header (grid size, walls per player, first player, winner or 255, action count as uint16)
+followed by one code per action from rules.encode_action: one byte on boards up to 9x9, two
+bytes (little-endian) on bigger boards. Starting positions are always rules.initial_positions.
+"""
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from rules import GRID_SIZE, decode_action, encode_action, initial_positions
+
+MAGIC = b"QREC"
+VERSION = 1
+FILE_HEADER = MAGIC + bytes([VERSION])
+GAME_HEADER = struct.Struct("<BBBBH")
+NO_WINNER = 255
+
+GameRecord = namedtuple("GameRecord", ["grid_size", "walls_per_player", "first_player", "winner", "codes"])
+
+
+def action_width(grid_size):
+    """Bytes per encoded action: 1 while every move and wall code fits in a byte."""
+    return 1 if grid_size * grid_size + 2 * (grid_size - 1) ** 2 <= 256 else 2
+
+
+class GameRecordWriter:
+    """
+    Append games to a record file, one game at a time.
+
+    Usage:
+        with GameRecordWriter(path) as writer:
+            writer.begin_game()
+            writer.record(("move", (4, 1)))
+            writer.end_game(winner=0)
+
+    Each game is buffered in memory and written (and flushed) by end_game, so a crashed
+    process never leaves a half-written game behind.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER)
+        self.game = None
+
+    def begin_game(self, grid_size=GRID_SIZE, walls_per_player=10, first_player=0):
+        self.game = (grid_size, walls_per_player, first_player, bytearray())
+
+    def record(self, action):
+        """Append one ("move", (x, y)) or ("wall", (x, y, orientation)) action to the current game."""
+        grid_size, _, _, codes = self.game
+        codes += encode_action(action, grid_size).to_bytes(action_width(grid_size), "little")
+
+    def record_codes(self, action_codes):
+        """Append already encoded actions (rules.encode_action codes) to the current game."""
+        grid_size, _, _, codes = self.game
+        width = action_width(grid_size)
+        for code in action_codes:
+            codes += code.to_bytes(width, "little")
+
+    def end_game(self, winner=None):
+        """Write the current game; winner is the index of the winning player or None if unfinished."""
+        grid_size, walls_per_player, first_player, codes = self.game
+        count = len(codes) // action_width(grid_size)
+        self.file.write(GAME_HEADER.pack(grid_size, walls_per_player, first_player,
+                                         NO_WINNER if winner is None else winner, count))
+        self.file.write(codes)
+        self.file.flush()
+        self.game = None
+
+    def close(self):
+        if self.game is not None:
+            self.end_game()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameRecordReader:
+    """
+    Iterate the games of a record file through a read-only memory map.
+
+    Games are yielded one at a time as GameRecord tuples, so archives with millions of games
+    are streamed instead of being loaded into memory.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if size and self.map[:len(FILE_HEADER)] != FILE_HEADER:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} game record file")
+
+    def __iter__(self):
+        data = self.map
+        offset = len(FILE_HEADER)
+        end = len(data)
+        while offset < end:
+            grid_size, walls_per_player, first_player, winner, count = GAME_HEADER.unpack_from(data, offset)
+            offset += GAME_HEADER.size
+            length = count * action_width(grid_size)
+            codes = data[offset:offset + length]
+            if action_width(grid_size) == 2:
+                codes = [int.from_bytes(codes[i:i + 2], "little") for i in range(0, length, 2)]
+            offset += length
+            yield GameRecord(grid_size, walls_per_player, first_player,
+                             None if winner == NO_WINNER else winner, codes)
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def game_actions(record):
+    """Decode the actions of a GameRecord."""
+    return [decode_action(code, record.grid_size) for code in record.codes]
+
+
+def replay_game(record):
+    """
+    Replay a recorded game.
+
+    Yields:
+    - (player_positions, walls, walls_remaining, to_move, action) before each action is applied;
+      the lists are fresh copies, walls_remaining is [user, bot].
+    """
+    player_positions = initial_positions(record.grid_size)
+    walls = []
+    walls_remaining = [record.walls_per_player, record.walls_per_player]
+    to_move = record.first_player
+    for action in game_actions(record):
+        yield player_positions[:], walls[:], walls_remaining[:], to_move, action
+        if action[0] == "move":
+            player_positions[to_move] = action[1]
+        else:
+            walls.append(action[1])
+            walls_remaining[to_move] -= 1
+        to_move = 1 - to_move
@@ -0,0 +1,436 @@
+"""Quoridor rules: wall geometry, pawn moves and path metrics shared by the UI and the bots."""
+import threading
+from heapq import heappop, heappush
+
+GRID_SIZE = 9
+
+# Wall orientation constants
+HORIZONTAL = 'H'
+VERTICAL = 'V'
+
+# Step directions in move generation order: up, down, left, right
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+
+def build_move_tables(grid_size):
+    """
+    Precompute the board geometry used by the pawn move generator.
+
+    Parameters:
+    - grid_size: Number of cells per side.
+
+    Returns:
+    - step_table: {cell: [(direction, neighbour), ...]} for the in-bounds single steps.
+    - jump_table: {cell: [landing or None per direction]} for straight jumps (two cells away).
+    - side_table: {cell: [[side cells] per direction]} for the cells beside `cell` across a direction,
+      i.e. the diagonal landings when a jump over a pawn on `cell` is blocked.
+    """
+    def in_bounds(x, y):
+        return 0 <= x < grid_size and 0 <= y < grid_size
+
+    step_table, jump_table, side_table = {}, {}, {}
+    for x in range(grid_size):
+        for y in range(grid_size):
+            steps, jumps, sides = [], [], []
+            for direction, (dx, dy) in enumerate(DIRECTIONS):
+                if in_bounds(x + dx, y + dy):
+                    steps.append((direction, (x + dx, y + dy)))
+                jumps.append((x + 2 * dx, y + 2 * dy) if in_bounds(x + 2 * dx, y + 2 * dy) else None)
+                sides.append([(x + dy * sign, y + dx * sign) for sign in (-1, 1)
+                              if in_bounds(x + dy * sign, y + dx * sign)])
+            step_table[(x, y)] = steps
+            jump_table[(x, y)] = jumps
+            side_table[(x, y)] = sides
+    return step_table, jump_table, side_table
+
+
+_move_tables = {}
+
+
+def get_move_tables(grid_size=GRID_SIZE):
+    """Return the (step, jump, side) tables for a board size, building them on first use."""
+    tables = _move_tables.get(grid_size)
+    if tables is None:
+        tables = _move_tables[grid_size] = build_move_tables(grid_size)
+    return tables
+
+
+_path_buffers = threading.local()  # Per thread: {grid_size: PathBuffers}
+_row_estimate_cache = {}  # {(grid_size, goal_y, opponent_y): row estimates of find_path}
+
+
+class PathBuffers:
+    """
+    Scratch arrays of the path searches, allocated once per board size and thread and reused by every query.
+
+    A cell has been reached by the current query if seen[cell] == stamp; a query starts by bumping the
+    stamp, which forgets every cell at once. cost and parent hold the path length to a reached cell and
+    the cell it was reached from.
+    """
+    __slots__ = ("stamp", "seen", "cost", "parent")
+
+    def __init__(self, grid_size):
+        cells = grid_size * grid_size
+        self.stamp = 0
+        self.seen = [0] * cells
+        self.cost = [0] * cells
+        self.parent = [0] * cells
+
+
+def get_path_buffers(grid_size=GRID_SIZE):
+    """Return this thread's PathBuffers for a board size, allocating them on first use."""
+    buffers = getattr(_path_buffers, "by_size", None)
+    if buffers is None:
+        buffers = _path_buffers.by_size = {}
+    if grid_size not in buffers:
+        buffers[grid_size] = PathBuffers(grid_size)
+    return buffers[grid_size]
+
+
+def row_estimates(goal_y, opponent_y, grid_size=GRID_SIZE):
+    """
+    The A* heuristic of find_path for every row, built once per board size, goal row and opponent row.
+
+    Returns:
+    - Tuple of the rows left from each row to goal_y, one less for rows with the opponent's row
+      (opponent_y, -1 for none) strictly between them and the goal.
+    """
+    key = (grid_size, goal_y, opponent_y)
+    estimates = _row_estimate_cache.get(key)
+    if estimates is None:
+        estimates = _row_estimate_cache[key] = tuple(abs(y - goal_y) - (min(y, goal_y) < opponent_y < max(y, goal_y))
+                                                     for y in range(grid_size))
+    return estimates
+
+
+def find_path(start, goal_y, walls, opponent_position=None, grid_size=GRID_SIZE):
+    """
+    A* search from a cell to a goal row, over the moves of get_all_possible_moves.
+
+    The heuristic is the number of rows left to the goal, one less while the opponent stands on a row
+    in between (one straight jump over it covers two rows). It never overestimates and drops by at most
+    one per move, so the first goal cell taken off the queue is at the shortest distance and, on open
+    boards, the search hardly leaves the straight line to the goal.
+
+    Parameters:
+    - start: (x, y) tuple for the starting position.
+    - goal_y: Integer for the target row.
+    - walls: List of wall positions.
+    - opponent_position: Optional (x, y) of the other pawn, which the path may jump over.
+    - grid_size: Number of cells per side of the board.
+
+    Returns:
+    - The goal cell index (y * grid_size + x) reached, or -1 if the goal row can't be reached. The
+      path lengths and predecessors are left in get_path_buffers(grid_size) until the next search.
+    """
+    buffers = get_path_buffers(grid_size)
+    buffers.stamp += 1
+    stamp = buffers.stamp
+    seen, cost, parent = buffers.seen, buffers.cost, buffers.parent
+    row_estimate = row_estimates(goal_y, -1 if opponent_position is None else opponent_position[1], grid_size)
+
+    x, y = start
+    cell = y * grid_size + x
+    seen[cell] = stamp
+    cost[cell] = 0
+    parent[cell] = -1
+    queue = [(row_estimate[y], row_estimate[y], x, y)]  # (estimated total, rows estimate, x, y)
+    while queue:
+        total, estimate, x, y = heappop(queue)
+        cell = y * grid_size + x
+        dist = total - estimate
+        if dist > cost[cell]:
+            continue  # Reached again by a shorter path since it was queued
+        if y == goal_y:
+            return cell
+        for move in get_all_possible_moves((x, y), walls, opponent_position, grid_size):
+            move_x, move_y = move
+            move_cell = move_y * grid_size + move_x
+            if seen[move_cell] != stamp or dist + 1 < cost[move_cell]:
+                seen[move_cell] = stamp
+                cost[move_cell] = dist + 1
+                parent[move_cell] = cell
+                heappush(queue, (dist + 1 + row_estimate[move_y], row_estimate[move_y], move_x, move_y))
+    return -1
+
+
+def initial_positions(grid_size=GRID_SIZE):
+    """Starting cells [(user_x, user_y), (bot_x, bot_y)]: the middle of the top and bottom rows."""
+    return [(grid_size // 2, 0), (grid_size // 2, grid_size - 1)]
+
+
+def is_wall_blocking_move(position, move, walls):
+    """
+    Check if a wall is blocking the move.
+
+    Parameters:
+    - position: (x, y) - current position of the player.
+    - move: (move_x, move_y) - target position after the move.
+    - walls: List of walls with each wall as (x, y, orientation).
+
+    Returns:
+    - True if a wall blocks the move, False otherwise.
+    """
+    x, y = position
+    move_x, move_y = move
+
+    # Check for horizontal walls blocking upward or downward movement
+    if move_y < y:  # Moving up
+        for wall_x, wall_y, orientation in walls:
+            if orientation == HORIZONTAL and wall_y == y and (wall_x == x or wall_x == x - 1):
+                return True
+    if move_y > y:  # Moving down
+        for wall_x, wall_y, orientation in walls:
+            if orientation == HORIZONTAL and wall_y == y + 1 and (wall_x == x or wall_x == x - 1):
+                return True
+
+    # Check for vertical walls blocking left or right movement
+    if move_x < x:  # Moving left
+        for wall_x, wall_y, orientation in walls:
+            if orientation == VERTICAL and wall_x == x and (wall_y == y or wall_y == y - 1):
+                return True
+    if move_x > x:  # Moving right
+        for wall_x, wall_y, orientation in walls:
+            if orientation == VERTICAL and wall_x == x + 1 and (wall_y == y or wall_y == y - 1):
+                return True
+
+    return False
+
+
+def causes_overlap(new_wall, walls):
+    """
+    Check if the new wall causes improper overlap, crossing, or intersection in the middle.
+    Optimized to avoid redundant checks.
+    """
+    x, y, orientation = new_wall
+
+    for wall_x, wall_y, wall_orientation in walls:
+        if orientation == HORIZONTAL:
+            # Overlapping horizontal walls
+            if wall_orientation == HORIZONTAL and wall_y == y and abs(wall_x - x) <= 1:
+                return True
+            # Crossing a vertical wall
+            if wall_orientation == VERTICAL and wall_x == x + 1 and wall_y == y - 1:
+                return True
+        elif orientation == VERTICAL:
+            # Overlapping vertical walls
+            if wall_orientation == VERTICAL and wall_x == x and abs(wall_y - y) <= 1:
+                return True
+            # Crossing a horizontal wall
+            if wall_orientation == HORIZONTAL and wall_y == y + 1 and wall_x == x - 1:
+                return True
+
+    return False
+
+
+def is_path_open(player_position, goal_y, walls, grid_size=GRID_SIZE):
+    """Check if there is still a valid path to the goal."""
+    return find_path(player_position, goal_y, walls, None, grid_size) >= 0
+
+
+def shortest_path_length(start, goal_y, walls, opponent_position=None, grid_size=GRID_SIZE):
+    """
+    Calculate the shortest path length from a position to the goal row using A* (see find_path).
+
+    Parameters:
+    - start: (x, y) tuple for the starting position.
+    - goal_y: Integer for the target row (0 or GRID_SIZE - 1).
+    - walls: List of wall positions.
+    - opponent_position: Optional (x, y) of the other pawn; when given, the path may jump over it
+      (the opponent is assumed to stay where it is).
+    - grid_size: Number of cells per side of the board.
+
+    Returns:
+    - Length of the shortest path to the goal row.
+    """
+    goal = find_path(start, goal_y, walls, opponent_position, grid_size)
+    if goal < 0:
+        return float('inf')  # No path
+    return get_path_buffers(grid_size).cost[goal]
+
+
+def get_all_possible_moves(position, walls, opponent_position=None, grid_size=GRID_SIZE):
+    """
+    Generate all valid moves for a player based on the current position and wall placements.
+    Table-driven: single steps, straight jumps over an adjacent opponent and, when the
+    straight jump is blocked by a wall or the border, the diagonal side-steps.
+
+    Parameters:
+    - position: (x, y) tuple for the player's current position.
+    - walls: List of wall positions.
+    - opponent_position: Optional (x, y) tuple for the other pawn, which can't be stepped on but can be jumped.
+    - grid_size: Number of cells per side of the board.
+
+    Returns:
+    - List of valid (x, y) positions.
+    """
+    step_table, jump_table, side_table = get_move_tables(grid_size)
+    possible_moves = []
+
+    for direction, neighbour in step_table[position]:
+        if is_wall_blocking_move(position, neighbour, walls):
+            continue
+        if neighbour != opponent_position:
+            possible_moves.append(neighbour)
+            continue
+
+        # The opponent is adjacent: jump straight over it if nothing is behind it
+        jump = jump_table[position][direction]
+        if jump is not None and not is_wall_blocking_move(neighbour, jump, walls):
+            possible_moves.append(jump)
+            continue
+
+        # Otherwise step diagonally to either side of the opponent
+        for side in side_table[neighbour][direction]:
+            if not is_wall_blocking_move(neighbour, side, walls):
+                possible_moves.append(side)
+
+    return possible_moves
+
+def game_over(player_positions, grid_size=GRID_SIZE):
+    """
+    Check if the game is over.
+
+    Parameters:
+    - player_positions: List of player positions [(user_x, user_y), (bot_x, bot_y)].
+    - grid_size: Number of cells per side of the board.
+
+    Returns:
+    - True if either player has reached their goal, False otherwise.
+    """
+    user_position, bot_position = player_positions
+    return user_position[1] == grid_size - 1 or bot_position[1] == 0
+
+
+def calculate_shortest_path(start, goal_y, walls, opponent_position=None, grid_size=GRID_SIZE):
+    """
+    Calculate a shortest path from a position to the goal row using A* (see find_path).
+
+    Parameters:
+    - start: (x, y) tuple for the starting position.
+    - goal_y: Integer for the target row (0 or GRID_SIZE - 1).
+    - walls: List of wall positions.
+    - opponent_position: Optional (x, y) of the other pawn, which the path may jump over.
+    - grid_size: Number of cells per side of the board.
+
+    Returns:
+    - List of positions representing the shortest path to the goal row.
+    """
+    goal = find_path(start, goal_y, walls, opponent_position, grid_size)
+    if goal < 0:
+        return []  # No path found
+
+    # Follow the predecessors back from the goal
+    parent = get_path_buffers(grid_size).parent
+    path = []
+    cell = goal
+    while cell >= 0:
+        path.append((cell % grid_size, cell // grid_size))
+        cell = parent[cell]
+    path.reverse()
+    return path
+
+
+def is_valid_wall(wall, walls, grid_size=GRID_SIZE):
+    """
+    Check if the wall position is valid (horizontal or vertical, not on borders and does not overlap).
+
+    Parameters:
+    - wall: Tuple (x, y, orientation) representing the wall's position and orientation.
+    - walls: List of currently placed walls.
+    - grid_size: Number of cells per side of the board.
+
+    Returns:
+    - True if the wall is valid, False otherwise.
+    """
+    x, y, orientation = wall
+
+    # Wall is invalid if it's on the borders
+    if orientation == HORIZONTAL:
+        if y <= 0 or y >= grid_size or x < 0 or x >= grid_size - 1:
+            return False
+    elif orientation == VERTICAL:
+        if x <= 0 or x >= grid_size or y < 0 or y >= grid_size - 1:
+            return False
+    else:
+        return False
+
+    # Wall is invalid if it overlaps existing walls
+    if wall in walls or causes_overlap(wall, walls):
+        return False
+
+    return True
+
+
+def illegal_reason(player_positions, walls, walls_remaining, to_move, action, grid_size=GRID_SIZE,
+                   allow_stay=True):
+    """
+    Check an action with the rules.
+
+    Parameters:
+    - player_positions: List of player positions [(user_x, user_y), (bot_x, bot_y)].
+    - walls: List of currently placed walls.
+    - walls_remaining: [user, bot] walls left.
+    - to_move: Index of the player making the action.
+    - action: ("move", (x, y)) or ("wall", (x, y, orientation)).
+    - grid_size: Number of cells per side of the board.
+    - allow_stay: Accept a move to the player's own cell (how game records store a bot staying in place).
+
+    Returns:
+    - None if the action is legal, otherwise a short reason why not.
+    """
+    opponent = 1 - to_move
+    if action[0] == "move":
+        if action[1] == player_positions[to_move]:
+            return None if allow_stay else "pawn must move"
+        if action[1] not in get_all_possible_moves(player_positions[to_move], walls, player_positions[opponent],
+                                                   grid_size):
+            return "unreachable pawn move"
+        return None
+    wall = action[1]
+    if walls_remaining[to_move] <= 0:
+        return "no walls left"
+    if not is_valid_wall(wall, walls, grid_size):
+        return "wall overlaps or is out of bounds"
+    if not is_path_open(player_positions[0], grid_size - 1, walls + [wall], grid_size) or \
+       not is_path_open(player_positions[1], 0, walls + [wall], grid_size):
+        return "wall blocks a path"
+    return None
+
+
+def encode_action(action, grid_size=GRID_SIZE):
+    """
+    Encode an action as a small integer.
+
+    Parameters:
+    - action: ("move", (x, y)) or ("wall", (x, y, orientation)).
+    - grid_size: Number of cells per side of the board.
+
+    Returns:
+    - The destination cell index y * grid_size + x for moves, or grid_size ** 2 plus the wall slot
+      for walls. Horizontal slots come first, numbered by the crossing the wall is centred on.
+    """
+    kind, value = action
+    if kind == "move":
+        x, y = value
+        return y * grid_size + x
+    x, y, orientation = value
+    span = grid_size - 1
+    if orientation == HORIZONTAL:
+        slot = (y - 1) * span + x
+    else:
+        slot = span * span + y * span + (x - 1)
+    return grid_size * grid_size + slot
+
+
+def decode_action(code, grid_size=GRID_SIZE):
+    """Inverse of encode_action."""
+    cells = grid_size * grid_size
+    if code < cells:
+        return "move", (code % grid_size, code // grid_size)
+    span = grid_size - 1
+    slot = code - cells
+    if slot < span * span:
+        return "wall", (slot % span, slot // span + 1, HORIZONTAL)
+    slot -= span * span
+    return "wall", (slot % span + 1, slot // span, VERTICAL)
@@ -0,0 +1,81 @@
+"""
+Bot-vs-bot self-play that streams every game to a record file.
+
+Usage: python selfplay.py [--games 10] [--out ../records/selfplay.qrec] [--iterations 300] [--seed 0]
+"""
+import argparse
+
+from mcts import MCTSBot, USER, BOT, goal_rows
+from records import GameRecordWriter
+from rules import GRID_SIZE, initial_positions
+
+
+def play_game(bots, writer=None, grid_size=GRID_SIZE, walls_per_player=10, max_actions=200):
+    """
+    Play one game between two bots that have a choose_action method like MCTSBot.
+
+    Parameters:
+    - bots: [user_bot, bot_bot]; the user side moves first.
+    - writer: Optional GameRecordWriter that receives every action.
+    - grid_size: Number of cells per side of the board.
+    - walls_per_player: Walls each side starts with.
+    - max_actions: Games still running after this many actions are recorded as unfinished.
+
+    Returns:
+    - The index of the winner, or None.
+    """
+    player_positions = initial_positions(grid_size)
+    walls = []
+    walls_remaining = [walls_per_player, walls_per_player]
+    to_move = USER
+    winner = None
+    if writer is not None:
+        writer.begin_game(grid_size, walls_per_player, first_player=USER)
+
+    for _ in range(max_actions):
+        action = bots[to_move].choose_action(player_positions, walls, walls_remaining[BOT], walls_remaining[USER],
+                                             player=to_move)
+        if action is None:  # No legal action; stay in place
+            action = ("move", player_positions[to_move])
+        if action[0] == "move":
+            player_positions[to_move] = action[1]
+        else:
+            walls.append(action[1])
+            walls_remaining[to_move] -= 1
+        if writer is not None:
+            writer.record(action)
+
+        if player_positions[to_move][1] == goal_rows(grid_size)[to_move]:
+            winner = to_move
+            break
+        to_move = 1 - to_move
+
+    if writer is not None:
+        writer.end_game(winner)
+    return winner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--out", default="../records/selfplay.qrec")
+    parser.add_argument("--iterations", type=int, default=300, help="MCTS playouts per move")
+    parser.add_argument("--time-limit", type=float, default=1.0, help="seconds per move")
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    wins = [0, 0]
+    with GameRecordWriter(args.out) as writer:
+        for game in range(args.games):
+            bots = [MCTSBot(args.iterations, args.time_limit, seed=args.seed + 2 * game + side,
+                            grid_size=args.grid_size) for side in (USER, BOT)]
+            winner = play_game(bots, writer, args.grid_size)
+            if winner is not None:
+                wins[winner] += 1
+            print(f"Game {game + 1}: winner {winner}")
+    print(f"User side {wins[USER]} - Bot side {wins[BOT]}")
+
+
+if __name__ == "__main__":
+    main()
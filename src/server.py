@@ -0,0 +1,367 @@
+"""
+Asyncio game server hosting many human-vs-bot and bot-vs-bot games over a JSON lines protocol.
+
+Every request is one JSON object on one line and is answered by one JSON object on one line:
+    {"cmd": "new", "mode": "human", "engine": "minimax"}   start a game against the bot
+    {"cmd": "new", "mode": "human", "level": "easy"}       ... whose Minimax search keeps to a difficulty level
+    {"cmd": "new", "mode": "bots", "engine": "mcts"}       start a bot-vs-bot game played in the background
+    {"cmd": "play", "game": 1, "action": ["move", [4, 1]]}  user action; answered after the bot's reply
+    {"cmd": "state", "game": 1}                             current state of a game
+    {"cmd": "wait", "game": 1}                              answered once the game is over
+    {"cmd": "close", "game": 1}                             forget a game
+Answers are {"ok": true, "state": {...}} or {"ok": false, "error": "..."}.
+
+Bot searches run in a bounded process pool so the event loop never blocks. A bot that is not done
+after --move-time seconds plays the first step of its shortest path instead, and its worker abandons
+the search at the same time; a human who takes longer than --human-time seconds for a move loses on time.
+A bot search that fails (including a crashed worker, which breaks the pool and has it replaced) answers
+the request with an error and leaves the game as it was before the request.
+
+Usage: python server.py [--host 127.0.0.1] [--port 8765 | --unix /tmp/quoridor.sock] [--workers 4]
+                        [--move-time 5] [--human-time 300]
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from bot import DIFFICULTY_LEVELS, bot_turn, move_deadline, quiet
+from mcts import MCTSBot, USER, BOT, goal_rows
+from rules import (
+    GRID_SIZE, HORIZONTAL, VERTICAL, get_all_possible_moves, illegal_reason, initial_positions, shortest_path_length
+)
+from timecontrol import SearchTimeout
+
+ENGINES = ("minimax", "mcts")
+PLAYER_NAMES = ("user", "bot")
+
+
+def parse_action(data):
+    """
+    Turn a JSON action like ["wall", [3, 4, "H"]] into the ("wall", (3, 4, 'H')) tuple form.
+
+    Raises ValueError unless the coordinates are integers and a wall's orientation is "H" or "V"; the
+    rules then check the action's bounds and legality.
+    """
+    kind, value = data
+    if kind not in ("move", "wall") or len(value) != (2 if kind == "move" else 3):
+        raise ValueError(f"bad action {data!r}")
+    if any(type(coordinate) is not int for coordinate in value[:2]) or \
+       (kind == "wall" and value[2] not in (HORIZONTAL, VERTICAL)):
+        raise ValueError(f"bad action {data!r}")
+    return kind, tuple(value)
+
+
+def bot_action(player_positions, walls, bot_walls_remaining, user_walls_remaining, user_last_position, turn_count,
+               engine, level=None, time_limit=None):
+    """
+    Run bot_turn on copies of the state and return the action it took (runs in a worker process).
+
+    With a time_limit the search is abandoned after that many seconds and the fallback action is
+    returned, so a search the server stopped waiting for does not keep the worker busy.
+    """
+    positions = list(player_positions)
+    new_walls = list(walls)
+    limit = contextlib.nullcontext() if time_limit is None else move_deadline(time_limit)
+    try:
+        with limit, quiet():
+            bot_turn(positions, new_walls, bot_walls_remaining, user_walls_remaining, user_last_position,
+                     turn_count, engine=engine, level=level)
+    except SearchTimeout:
+        return fallback_action(player_positions, walls, BOT)
+    if len(new_walls) > len(walls):
+        return "wall", new_walls[-1]
+    return "move", positions[BOT]  # A bot that stays in place moves to its own cell
+
+
+def user_bot_action(player_positions, walls, bot_walls_remaining, user_walls_remaining, iterations, time_limit,
+                    seed):
+    """Pick the user side's action in a bot-vs-bot game with MCTS (runs in a worker process)."""
+    searcher = MCTSBot(iterations, time_limit, seed=seed)
+    action = searcher.choose_action(player_positions, walls, bot_walls_remaining, user_walls_remaining, player=USER)
+    return action or ("move", player_positions[USER])
+
+
+def fallback_action(player_positions, walls, player):
+    """First step along the shortest path, for a bot that ran out of time."""
+    goal_y = goal_rows()[player]
+    opponent_position = player_positions[1 - player]
+    moves = get_all_possible_moves(player_positions[player], walls, opponent_position)
+    if not moves:
+        return "move", player_positions[player]
+    return "move", min(moves, key=lambda move: shortest_path_length(move, goal_y, walls, opponent_position))
+
+
+class GameSession:
+    """One game held in memory by the server."""
+
+    def __init__(self, game_id, mode, engine, level=None):
+        self.game_id = game_id
+        self.mode = mode
+        self.engine = engine
+        self.level = level
+        self.player_positions = initial_positions(GRID_SIZE)
+        self.walls = []
+        self.walls_remaining = [10, 10]  # [user, bot]
+        self.to_move = USER
+        self.user_last_position = self.player_positions[USER]
+        self.turn_count = 0
+        self.winner = None
+        self.reason = None
+        self.actions = []
+        self.lock = asyncio.Lock()  # One action at a time per game
+        self.finished = asyncio.Event()
+        self.clock = None  # Timer handle of the human's move clock
+
+    def apply(self, action):
+        """Apply an action (assumed legal) for the player to move and check for a winner."""
+        player = self.to_move
+        if action[0] == "move":
+            self.player_positions[player] = action[1]
+        else:
+            self.walls.append(action[1])
+            self.walls_remaining[player] -= 1
+        self.actions.append(action)
+        if self.player_positions[player][1] == goal_rows()[player]:
+            self.finish(player, "goal")
+        self.to_move = 1 - player
+
+    def save(self):
+        """Copy of the state an action changes, for restore()."""
+        return (list(self.player_positions), len(self.walls), list(self.walls_remaining), len(self.actions),
+                self.to_move)
+
+    def restore(self, saved):
+        """Undo the actions applied since save() (which cannot have finished the game)."""
+        self.player_positions, walls, self.walls_remaining, actions, self.to_move = saved
+        del self.walls[walls:]
+        del self.actions[actions:]
+
+    def finish(self, winner, reason):
+        self.winner = winner
+        self.reason = reason
+        if self.clock is not None:
+            self.clock.cancel()
+        self.finished.set()
+
+    def snapshot(self):
+        return {
+            "game": self.game_id,
+            "mode": self.mode,
+            "positions": self.player_positions,
+            "walls": self.walls,
+            "walls_remaining": self.walls_remaining,
+            "to_move": PLAYER_NAMES[self.to_move],
+            "last_action": self.actions[-1] if self.actions else None,
+            "winner": None if self.winner is None else PLAYER_NAMES[self.winner],
+            "reason": self.reason,
+        }
+
+
+class GameServer:
+    """
+    Holds the game sessions and answers the protocol requests of every connected client.
+
+    Parameters:
+    - workers: Size of the process pool shared by every game's bot searches.
+    - move_time: Seconds a bot search may take before the fallback move is played.
+    - human_time: Seconds a human may take for a move before losing on time.
+    - opponent_iterations: MCTS playouts per move of the user side in bot-vs-bot games.
+    """
+
+    def __init__(self, workers=None, move_time=5.0, human_time=300.0, opponent_iterations=300):
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(workers)
+        self.move_time = move_time
+        self.human_time = human_time
+        self.opponent_iterations = opponent_iterations
+        self.sessions = {}
+        self.game_ids = itertools.count(1)
+        self.tasks = set()
+
+    async def handle_client(self, reader, writer):
+        """Answer one client's requests, one JSON line each, until it disconnects."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.dispatch(json.loads(line))
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {"ok": False, "error": str(error)}
+                except Exception as error:  # A failed bot search, e.g. BrokenProcessPool after a worker crashed
+                    response = {"ok": False, "error": f"bot search failed: {type(error).__name__}: {error}"}
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request):
+        command = request["cmd"]
+        if command == "new":
+            session = self.new_game(request.get("mode", "human"), request.get("engine", "minimax"),
+                                    request.get("level"))
+            return {"ok": True, "state": session.snapshot()}
+
+        session = self.sessions.get(request["game"])
+        if session is None:
+            raise KeyError(f"no game {request['game']}")
+        if command == "play":
+            error = await self.play(session, parse_action(request["action"]))
+            if error:
+                return {"ok": False, "error": error, "state": session.snapshot()}
+        elif command == "wait":
+            await session.finished.wait()
+        elif command == "close":
+            self.close_game(session)
+        elif command != "state":
+            raise ValueError(f"unknown command {command!r}")
+        return {"ok": True, "state": session.snapshot()}
+
+    def new_game(self, mode, engine, level=None):
+        if mode not in ("human", "bots") or engine not in ENGINES:
+            raise ValueError(f"unknown mode {mode!r} or engine {engine!r}")
+        if level is not None and level not in DIFFICULTY_LEVELS:
+            raise ValueError(f"unknown level {level!r}")
+        session = GameSession(next(self.game_ids), mode, engine, level)
+        self.sessions[session.game_id] = session
+        if mode == "bots":
+            task = asyncio.get_running_loop().create_task(self.play_bots(session))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        else:
+            self.start_clock(session)
+        return session
+
+    def close_game(self, session):
+        if session.winner is None:
+            session.finish(None, "closed")
+        del self.sessions[session.game_id]
+
+    def start_clock(self, session):
+        """Start the human's move clock; running out of time loses the game."""
+        session.clock = asyncio.get_running_loop().call_later(self.human_time, session.finish, BOT, "time")
+
+    async def play(self, session, action):
+        """Play a human action and the bot's reply; returns an error message or None."""
+        async with session.lock:
+            if session.mode != "human" or session.winner is not None:
+                return "game is not waiting for a user action"
+            reason = illegal_reason(session.player_positions, session.walls, session.walls_remaining, USER, action,
+                                    allow_stay=False)
+            if reason:
+                return reason
+            session.clock.cancel()
+            saved = session.save()
+            session.apply(action)
+            if session.winner is None:
+                try:
+                    reply = await self.bot_move(session)
+                except Exception:
+                    session.restore(saved)  # The user may send the action again
+                    self.start_clock(session)
+                    raise
+                session.apply(reply)
+                session.user_last_position = session.player_positions[USER]
+                session.turn_count += 1
+            if session.winner is None:
+                self.start_clock(session)
+            return None
+
+    async def bot_move(self, session):
+        """Run the bot's search in the process pool within the move time limit."""
+        future = self.run_in_pool(bot_action, list(session.player_positions), list(session.walls),
+                                  session.walls_remaining[BOT], session.walls_remaining[USER],
+                                  session.user_last_position, session.turn_count, session.engine, session.level,
+                                  self.move_time)
+        return await self.within_time(future, session, BOT)
+
+    async def run_in_pool(self, function, *args):
+        """Run a function in the process pool, replacing the pool if a crashed worker broke it."""
+        pool = self.pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, function, *args)
+        except BrokenProcessPool:
+            if pool is self.pool:  # Not yet replaced by another game's failed search
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = ProcessPoolExecutor(self.workers)
+            raise
+
+    async def within_time(self, future, session, player):
+        try:
+            return await asyncio.wait_for(future, self.move_time)
+        except asyncio.TimeoutError:
+            # The worker gives up the search by itself (its time limit is the move time too); its result is dropped
+            return fallback_action(session.player_positions, session.walls, player)
+
+    async def play_bots(self, session, max_actions=200):
+        """Play a bot-vs-bot game: MCTS on the user side against bot_turn with the session's engine."""
+        for ply in range(max_actions):
+            if session.winner is not None:
+                return
+            try:
+                if session.to_move == USER:
+                    future = self.run_in_pool(user_bot_action, list(session.player_positions), list(session.walls),
+                                              session.walls_remaining[BOT], session.walls_remaining[USER],
+                                              self.opponent_iterations, self.move_time * 0.8,
+                                              session.game_id * max_actions + ply)
+                    action = await self.within_time(future, session, USER)
+                else:
+                    action = await self.bot_move(session)
+            except Exception as error:  # A failed search ends the game instead of leaving "wait" hanging
+                session.finish(None, f"bot search failed: {type(error).__name__}")
+                return
+            async with session.lock:
+                session.apply(action)
+                if session.to_move == USER:  # The bot just moved
+                    session.user_last_position = session.player_positions[USER]
+                    session.turn_count += 1
+        if session.winner is None:
+            session.finish(None, "move limit")
+
+    def shutdown(self):
+        for task in self.tasks:
+            task.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(args):
+    server = GameServer(args.workers, args.move_time, args.human_time, args.opponent_iterations)
+    if args.unix:
+        listener = await asyncio.start_unix_server(server.handle_client, path=args.unix)
+        print(f"Serving on {args.unix}")
+    else:
+        listener = await asyncio.start_server(server.handle_client, args.host, args.port)
+        print(f"Serving on {args.host}:{args.port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on a Unix socket at this path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="bot search processes (default: all cores)")
+    parser.add_argument("--move-time", type=float, default=5.0, help="seconds per bot move")
+    parser.add_argument("--human-time", type=float, default=300.0, help="seconds per human move")
+    parser.add_argument("--opponent-iterations", type=int, default=300,
+                        help="MCTS playouts per move of the user side in bot-vs-bot games")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Integer-coded two-player game state for the Minimax search.
+
+Actions are the small integers of rules.encode_action: the destination cell index y * grid_size + x
+for a pawn move, or grid_size ** 2 plus the wall slot for a wall. Pawns are flat cell indices and
+walls live in a Board, so applying and undoing an action allocates nothing. The state also keeps
+a 64-bit Zobrist hash of itself up to date for the transposition tables (see ttable.py).
+
+The board is left-right symmetric: mirroring every pawn and wall (x -> grid_size - 1 - x) gives a
+position with the same value. The state keeps the hash of its mirror image too; mirrored() picks one
+orientation of the pair by the smaller hash, and canonical_key names both orientations by the key of
+that one, so tables, caches and the opening book store one entry for the pair. Stored actions are kept
+in the canonical orientation and mapped back with mirror_code. The search breaks ties between equally
+ranked actions in the canonical orientation too, so a position and its mirror image are searched alike.
+"""
+import random
+from collections import namedtuple
+
+from board import Board
+from rules import GRID_SIZE
+
+USER, BOT = 0, 1
+MAX_WALLS = 32  # Largest walls-remaining count the Zobrist keys cover
+
+ZobristKeys = namedtuple("ZobristKeys", ["pawn", "wall", "walls_left", "last_position", "side"])
+
+_position_cache = {}
+_zobrist_cache = {}
+_mirror_cache = {}
+
+
+def cell_positions(grid_size=GRID_SIZE):
+    """(x, y) tuple of every flat cell index, built once per board size."""
+    positions = _position_cache.get(grid_size)
+    if positions is None:
+        positions = _position_cache[grid_size] = tuple((cell % grid_size, cell // grid_size)
+                                                       for cell in range(grid_size * grid_size))
+    return positions
+
+
+def zobrist_keys(grid_size=GRID_SIZE):
+    """
+    Random 64-bit keys for every hashed feature of a position, the same in every process.
+
+    - pawn[player][cell], wall[slot], walls_left[player][count], last_position[cell] (the user's
+      previous cell, which the evaluation looks at) and side[maximizing_player].
+    """
+    keys = _zobrist_cache.get(grid_size)
+    if keys is None:
+        rng = random.Random(grid_size)  # Fixed seed: worker processes must agree on the keys
+        cells = grid_size * grid_size
+        slots = 2 * (grid_size - 1) ** 2
+
+        def draw(count):
+            return tuple(rng.getrandbits(64) for _ in range(count))
+
+        keys = _zobrist_cache[grid_size] = ZobristKeys(
+            (draw(cells), draw(cells)), draw(slots), (draw(MAX_WALLS + 1), draw(MAX_WALLS + 1)), draw(cells), draw(2)
+        )
+    return keys
+
+
+def mirror_tables(grid_size=GRID_SIZE):
+    """
+    Left-right mirror images of every cell and wall slot, built once per board size.
+
+    A horizontal wall covers two columns and a vertical one lies between two, so the mirror of the wall
+    anchored on crossing (x, y) is anchored on crossing (grid_size - 2 - x, y) for both orientations.
+
+    Returns:
+    - (cells, slots): cells[cell] and slots[slot] are the mirrored flat cell index and wall slot.
+    """
+    tables = _mirror_cache.get(grid_size)
+    if tables is None:
+        span = grid_size - 1
+        cells = tuple(cell - cell % grid_size + span - cell % grid_size for cell in range(grid_size * grid_size))
+        slots = tuple(slot - slot % span + span - 1 - slot % span for slot in range(2 * span * span))
+        tables = _mirror_cache[grid_size] = (cells, slots)
+    return tables
+
+
+def mirror_code(code, grid_size=GRID_SIZE):
+    """Left-right mirror image of an action code (see rules.encode_action); its own inverse."""
+    cells, slots = mirror_tables(grid_size)
+    if code < len(cells):
+        return cells[code]
+    return len(cells) + slots[code - len(cells)]
+
+
+class SearchState:
+    """
+    Mutable position for search, changed in place by apply and restored by undo.
+
+    - cells: [user_cell, bot_cell] flat pawn indices.
+    - walls_remaining: [user, bot].
+    - board: Board with the placed walls; board.walls is kept as the usual list of wall tuples.
+    - hash: Zobrist hash of the pawns, walls and walls remaining (not of the side to move).
+    - mirror_hash: The same hash of the left-right mirror image of the position.
+    """
+    __slots__ = ("size", "cell_count", "board", "cells", "walls_remaining", "positions_table", "history", "keys",
+                 "hash", "mirror_hash", "mirror_cells", "mirror_slots")
+
+    def __init__(self, player_positions, walls, user_walls_remaining, bot_walls_remaining, grid_size=GRID_SIZE):
+        self.size = grid_size
+        self.cell_count = grid_size * grid_size
+        self.board = Board(grid_size, walls)
+        self.cells = [self.board.cell(position) for position in player_positions]
+        self.walls_remaining = [user_walls_remaining, bot_walls_remaining]
+        self.positions_table = cell_positions(grid_size)
+        # Flat undo stack of (player, code, previous pawn cell or -1) triples
+        self.history = []
+
+        self.keys = zobrist_keys(grid_size)
+        self.mirror_cells, self.mirror_slots = mirror_tables(grid_size)
+        self.hash = self.mirror_hash = 0
+        for player in (USER, BOT):
+            walls_left_key = self.keys.walls_left[player][self.walls_remaining[player]]
+            self.hash ^= self.keys.pawn[player][self.cells[player]] ^ walls_left_key
+            self.mirror_hash ^= self.keys.pawn[player][self.mirror_cells[self.cells[player]]] ^ walls_left_key
+        for wall in self.board.walls:
+            slot = self.board.wall_slot(wall)
+            self.hash ^= self.keys.wall[slot]
+            self.mirror_hash ^= self.keys.wall[self.mirror_slots[slot]]
+
+    def search_key(self, maximizing_player, user_last_position):
+        """Hash of the state together with the side to move and the user's previous position."""
+        x, y = user_last_position
+        return self.hash ^ self.keys.side[maximizing_player] ^ self.keys.last_position[y * self.size + x]
+
+    def mirrored(self, user_last_position):
+        """
+        True if the mirror image is the canonical orientation of the state with the user's previous position:
+        the one with the smaller hash. A position and its mirror image always disagree, unless the position
+        is its own mirror image.
+        """
+        x, y = user_last_position
+        last_cell = y * self.size + x
+        last_keys = self.keys.last_position
+        return self.mirror_hash ^ last_keys[self.mirror_cells[last_cell]] < self.hash ^ last_keys[last_cell]
+
+    def canonical_key(self, maximizing_player, user_last_position):
+        """
+        search_key of the canonical orientation of the state (see mirrored).
+
+        Returns:
+        - (key, mirrored), mirrored being True if the key is that of the mirror image, whose actions
+          then have to be mapped with mirror_code.
+        """
+        x, y = user_last_position
+        last_cell = y * self.size + x
+        keys = self.keys
+        side_key = keys.side[maximizing_player]
+        key = self.hash ^ keys.last_position[last_cell]
+        mirror_key = self.mirror_hash ^ keys.last_position[self.mirror_cells[last_cell]]
+        if mirror_key < key:
+            return mirror_key ^ side_key, True
+        return key ^ side_key, False
+
+    def mirror_code(self, code):
+        """Module-level mirror_code on this state's board, without the table lookup."""
+        if code < self.cell_count:
+            return self.mirror_cells[code]
+        return self.cell_count + self.mirror_slots[code - self.cell_count]
+
+    def canonical_code(self, code, mirrored):
+        """An action code in the canonical orientation (mirrored as from mirrored()), to break ties between actions."""
+        return self.mirror_code(code) if mirrored else code
+
+    def positions(self):
+        """Pawn positions as the [(user_x, user_y), (bot_x, bot_y)] list the rules functions take."""
+        table = self.positions_table
+        return [table[self.cells[USER]], table[self.cells[BOT]]]
+
+    def position(self, player):
+        return self.positions_table[self.cells[player]]
+
+    def is_move(self, code):
+        return code < self.cell_count
+
+    def wall_code(self, slot):
+        return self.cell_count + slot
+
+    def apply(self, code, player):
+        """Play action `code` for `player` (assumed legal)."""
+        history = self.history
+        history.append(player)
+        history.append(code)
+        keys = self.keys
+        if code < self.cell_count:
+            history.append(self.cells[player])
+            pawn_keys = keys.pawn[player]
+            self.hash ^= pawn_keys[self.cells[player]] ^ pawn_keys[code]
+            self.mirror_hash ^= pawn_keys[self.mirror_cells[self.cells[player]]] ^ pawn_keys[self.mirror_cells[code]]
+            self.cells[player] = code
+        else:
+            history.append(-1)
+            slot = code - self.cell_count
+            left = self.walls_remaining[player]
+            walls_left_keys = keys.walls_left[player][left] ^ keys.walls_left[player][left - 1]
+            self.hash ^= keys.wall[slot] ^ walls_left_keys
+            self.mirror_hash ^= keys.wall[self.mirror_slots[slot]] ^ walls_left_keys
+            self.board.place_slot(slot)
+            self.walls_remaining[player] = left - 1
+
+    def undo(self):
+        """Take back the last applied action."""
+        history = self.history
+        previous_cell = history.pop()
+        code = history.pop()
+        player = history.pop()
+        keys = self.keys
+        if previous_cell >= 0:
+            pawn_keys = keys.pawn[player]
+            self.hash ^= pawn_keys[code] ^ pawn_keys[previous_cell]
+            self.mirror_hash ^= pawn_keys[self.mirror_cells[code]] ^ pawn_keys[self.mirror_cells[previous_cell]]
+            self.cells[player] = previous_cell
+        else:
+            slot = code - self.cell_count
+            left = self.walls_remaining[player]
+            walls_left_keys = keys.walls_left[player][left] ^ keys.walls_left[player][left + 1]
+            self.hash ^= keys.wall[slot] ^ walls_left_keys
+            self.mirror_hash ^= keys.wall[self.mirror_slots[slot]] ^ walls_left_keys
+            self.board.remove_slot(slot)
+            self.walls_remaining[player] = left + 1
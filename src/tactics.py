@@ -0,0 +1,201 @@
+"""
+Tactical test suite: how soon the bot's search finds the best action of positions with known answers.
+
+Positions are read from a text file (tactics.txt by default), one per line:
+
+    name | to move | user x,y walls left | bot x,y walls left | walls | best actions
+
+with cells written "x,y", walls "x,y,H" or "x,y,V" ("-" for none) and actions either a cell (a pawn
+move) or a wall. Every position is searched by iterative deepening (bot.search_best_action at depth
+1, 2, ... --max-depth, sharing one transposition table, like bot.timed_search). A position is solved
+at the first depth from which every deeper iteration also plays one of its best actions; the nodes
+and time it took are counted from the start of the search up to that depth.
+
+Node counts do not depend on the machine, so they compare engine versions exactly; times compare
+them on the same machine. --json saves a run and --baseline prints it next to a new one.
+
+Usage: python tactics.py [--suite tactics.txt] [--max-depth 6] [--positions block-corner ...]
+                         [--json tactics.json] [--baseline old_tactics.json]
+"""
+import argparse
+import json
+import os
+import time
+from collections import namedtuple
+
+import bot
+from rules import GRID_SIZE, HORIZONTAL, VERTICAL, illegal_reason, is_path_open, is_valid_wall
+from state import USER, BOT
+from ttable import TranspositionTable
+
+SUITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tactics.txt")
+PLAYER_NAMES = ("user", "bot")
+
+TacticalPosition = namedtuple("TacticalPosition",
+                              ["name", "to_move", "player_positions", "walls_remaining", "walls", "best"])
+
+
+def parse_action(text):
+    """Turn "x,y" into ("move", (x, y)) and "x,y,H" / "x,y,V" into ("wall", (x, y, orientation))."""
+    fields = text.split(",")
+    if len(fields) == 2:
+        return "move", (int(fields[0]), int(fields[1]))
+    if len(fields) == 3 and fields[2] in (HORIZONTAL, VERTICAL):
+        return "wall", (int(fields[0]), int(fields[1]), fields[2])
+    raise ValueError(f"bad action {text!r}")
+
+
+def format_action(action):
+    """Inverse of parse_action."""
+    return ",".join(str(value) for value in action[1])
+
+
+def parse_position(line, grid_size=GRID_SIZE):
+    """
+    Parse and check one position line.
+
+    Returns:
+    - A TacticalPosition; raises ValueError if the line is malformed or the position or one of
+      its best actions is not legal.
+    """
+    fields = [field.strip() for field in line.split("|")]
+    if len(fields) != 6:
+        raise ValueError(f"expected 6 fields separated by '|', got {len(fields)}")
+    name, to_move, user, bot_side, walls_text, best_text = fields
+    if to_move not in PLAYER_NAMES:
+        raise ValueError(f"player to move must be 'user' or 'bot', not {to_move!r}")
+    player_positions = []
+    walls_remaining = []
+    for text in (user, bot_side):
+        cell, walls_left = text.split()
+        kind, position = parse_action(cell)
+        if kind != "move" or not all(0 <= value < grid_size for value in position):
+            raise ValueError(f"bad cell {cell!r}")
+        player_positions.append(position)
+        walls_remaining.append(int(walls_left))
+    if player_positions[USER] == player_positions[BOT]:
+        raise ValueError("both pawns on the same cell")
+
+    walls = []
+    for text in ([] if walls_text == "-" else walls_text.split()):
+        kind, wall = parse_action(text)
+        if kind != "wall" or not is_valid_wall(wall, walls, grid_size):
+            raise ValueError(f"bad or overlapping wall {text!r}")
+        walls.append(wall)
+    if not is_path_open(player_positions[USER], grid_size - 1, walls, grid_size) or \
+       not is_path_open(player_positions[BOT], 0, walls, grid_size):
+        raise ValueError("the walls close a pawn's path")
+
+    position = TacticalPosition(name, PLAYER_NAMES.index(to_move), player_positions, walls_remaining, walls,
+                                [parse_action(text) for text in best_text.split()])
+    for action in position.best:
+        reason = illegal_reason(player_positions, walls, walls_remaining, position.to_move, action, grid_size,
+                                allow_stay=False)
+        if reason:
+            raise ValueError(f"best action {format_action(action)} is illegal: {reason}")
+    return position
+
+
+def format_position(position):
+    """Write a TacticalPosition as a suite line."""
+    players = [f"{x},{y} {walls_left}" for (x, y), walls_left in zip(position.player_positions,
+                                                                     position.walls_remaining)]
+    walls = " ".join(format_action(("wall", wall)) for wall in position.walls) or "-"
+    best = " ".join(format_action(action) for action in position.best)
+    return f"{position.name} | {PLAYER_NAMES[position.to_move]} | {players[USER]} | {players[BOT]} | {walls} | {best}"
+
+
+def load_suite(path=SUITE_PATH):
+    """Read a suite file, skipping blank lines and # comments."""
+    positions = []
+    with open(path) as file:
+        for number, line in enumerate(file, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                positions.append(parse_position(line))
+            except ValueError as error:
+                raise ValueError(f"{path}:{number}: {error}") from None
+    return positions
+
+
+def solve(position, max_depth):
+    """
+    Search a position at depth 1 to max_depth.
+
+    Returns:
+    - Dict with the action, cumulative nodes and seconds of every depth, and the depth, nodes and
+      seconds to solution (None if not solved by max_depth).
+    """
+    player_positions = position.player_positions
+    user_walls_remaining, bot_walls_remaining = position.walls_remaining
+    table = TranspositionTable(bot.TIMED_TABLE_ENTRIES)
+    iterations = []
+    nodes = bot.search_stats["nodes"]
+    start = time.perf_counter()
+    with bot.quiet():
+        for depth in range(1, max_depth + 1):
+            action, _ = bot.search_best_action(list(player_positions), list(position.walls), depth,
+                                               bot_walls_remaining, user_walls_remaining, player_positions[USER],
+                                               is_bot=position.to_move == BOT, table=table)
+            iterations.append({"depth": depth, "action": action and format_action(action),
+                               "nodes": bot.search_stats["nodes"] - nodes, "seconds": time.perf_counter() - start})
+
+    solved = None
+    for iteration in reversed(iterations):
+        if iteration["action"] not in [format_action(action) for action in position.best]:
+            break
+        solved = iteration
+    return {"name": position.name, "iterations": iterations, "solved_depth": solved and solved["depth"],
+            "nodes": solved and solved["nodes"], "seconds": solved and solved["seconds"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", default=SUITE_PATH)
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--positions", nargs="*", help="names of the positions to run (all by default)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results of an earlier run (--json) to compare with")
+    args = parser.parse_args()
+
+    positions = load_suite(args.suite)
+    if args.positions:
+        positions = [position for position in positions if position.name in args.positions]
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = {result["name"]: result for result in json.load(file)["results"]}
+
+    print(f"{'position':<20} {'depth':>5} {'nodes':>9} {'ms':>9}  actions by depth" +
+          ("  | baseline depth, nodes, ms" if baseline else ""))
+    results = []
+    for position in positions:
+        result = solve(position, args.max_depth)
+        results.append(result)
+        actions = " ".join(iteration["action"] or "-" for iteration in result["iterations"])
+        line = f"{position.name:<20} "
+        if result["solved_depth"] is None:
+            line += f"{'-':>5} {'-':>9} {'-':>9}"
+        else:
+            line += f"{result['solved_depth']:>5} {result['nodes']:>9} {result['seconds'] * 1000:>9.1f}"
+        line += f"  {actions}"
+        old = baseline.get(position.name)
+        if old is not None:
+            line += "  | " + ("unsolved" if old["solved_depth"] is None else
+                              f"{old['solved_depth']}, {old['nodes']}, {old['seconds'] * 1000:.1f}")
+        print(line)
+
+    solved = [result for result in results if result["solved_depth"] is not None]
+    print(f"Solved {len(solved)}/{len(results)} by depth {args.max_depth}: "
+          f"{sum(result['nodes'] for result in solved)} nodes, "
+          f"{sum(result['seconds'] for result in solved) * 1000:.1f} ms to solution")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"suite": os.path.basename(args.suite), "max_depth": args.max_depth,
+                       "fingerprint": bot.evaluation_fingerprint(), "results": results}, file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Simulated-clock harness for the time manager (timecontrol.py).
+
+Plays the bot under a clock (bot.bot_turn with a TimeManager, which plans every bot move and has
+bot.timed_search decide it) against a seeded MCTS user under one or more time controls, written as
+"game seconds+increment". The bot's clock is simulated: it advances by --node-cost seconds per Minimax node searched plus
+--move-overhead seconds per move, so a run gives the same moves and times on any machine (the MCTS
+user thinks for free). For every time control it prints each game's
+result and clock, then the planned and used time and the depth reached per game phase. It exits
+with an error if the bot lost on time or a move overran its hard limit.
+
+Usage: python time_harness.py [--controls 60+0 20+1 5+0.5] [--games 2] [--node-cost 0.0005]
+"""
+import argparse
+import sys
+
+import bot
+from mcts import MCTSBot
+from rules import GRID_SIZE, initial_positions
+from state import USER, BOT
+from timecontrol import TimeManager
+
+
+class SimulatedClock:
+    """
+    Clock driven by the search: `node_cost` seconds per Minimax node counted in bot.search_stats.
+
+    Parameters:
+    - node_cost: Simulated seconds per node.
+    """
+
+    def __init__(self, node_cost):
+        self.node_cost = node_cost
+        self.start_nodes = bot.search_stats["nodes"]
+        self.offset = 0.0
+
+    def __call__(self):
+        return self.offset + (bot.search_stats["nodes"] - self.start_nodes) * self.node_cost
+
+    def advance(self, seconds):
+        """Let time pass outside the search."""
+        self.offset += seconds
+
+
+def parse_control(text):
+    """Turn "300+2" (or "300") into (300.0, 2.0)."""
+    game_time, _, increment = text.partition("+")
+    return float(game_time), float(increment or 0)
+
+
+def play_timed_game(game_time, increment, node_cost, move_overhead, opponent_iterations, seed, max_actions=200):
+    """
+    Play one game of timed searches on a simulated clock against an MCTS user.
+
+    Returns:
+    - (winner, time manager): winner is USER, BOT, or None if the game was still running after max_actions.
+    """
+    clock = SimulatedClock(node_cost)
+    manager = TimeManager(game_time, increment, clock)
+    opponent = MCTSBot(opponent_iterations, time_limit=10.0, seed=seed)
+
+    player_positions = initial_positions(GRID_SIZE)
+    walls = []
+    walls_remaining = [10, 10]
+    user_last_position = player_positions[USER]
+    turn_count = 0
+    with bot.quiet():
+        for _ in range(max_actions // 2):
+            action = opponent.choose_action(player_positions, walls, walls_remaining[BOT], walls_remaining[USER],
+                                            player=USER)
+            if action is not None:
+                if action[0] == "move":
+                    player_positions[USER] = action[1]
+                else:
+                    walls.append(action[1])
+                    walls_remaining[USER] -= 1
+            if player_positions[USER][1] == GRID_SIZE - 1:
+                return USER, manager
+
+            manager.start_move()
+            walls_remaining[BOT] = bot.bot_turn(player_positions, walls, walls_remaining[BOT], walls_remaining[USER],
+                                                user_last_position, turn_count, time_manager=manager)
+            clock.advance(move_overhead)
+            manager.end_move()
+            user_last_position = player_positions[USER]
+            turn_count += 1
+            if player_positions[BOT][1] == 0:
+                return BOT, manager
+    return None, manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--controls", nargs="+", default=["60+0", "20+1", "5+0.5"],
+                        help="time controls as game seconds+increment")
+    parser.add_argument("--games", type=int, default=2, help="games per time control")
+    parser.add_argument("--node-cost", type=float, default=0.0005, help="simulated seconds per Minimax node")
+    parser.add_argument("--move-overhead", type=float, default=0.01, help="simulated seconds per move outside search")
+    parser.add_argument("--opponent-iterations", type=int, default=200, help="MCTS playouts per user move")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = 0
+    # Moves may run past the hard limit by the nodes searched between two clock checks
+    tolerance = args.move_overhead + bot.DEADLINE_CHECK_NODES * args.node_cost
+    for control in args.controls:
+        game_time, increment = parse_control(control)
+        print(f"Time control {control}")
+        phases = {}
+        for game in range(args.games):
+            winner, manager = play_timed_game(game_time, increment, args.node_cost, args.move_overhead,
+                                              args.opponent_iterations, args.seed + game)
+            result = {USER: "user wins", BOT: "bot wins", None: "unfinished"}[winner]
+            longest = max(move["used"] for move in manager.moves)
+            print(f"  game {game + 1}: {result} in {len(manager.moves)} bot moves, clock {manager.remaining:.2f} s, "
+                  f"longest move {longest:.2f} s")
+            for number, move in enumerate(manager.moves, 1):
+                if move["flagged"]:
+                    print(f"    FAIL: lost on time at move {number}")
+                    failures += 1
+                if move["used"] > move["hard_budget"] + tolerance:
+                    print(f"    FAIL: move {number} used {move['used']:.3f} s, hard limit {move['hard_budget']:.3f} s")
+                    failures += 1
+                phases.setdefault(move["phase"], []).append(move)
+        print(f"  {'phase':<11} {'searches':>8} {'planned s':>10} {'used s':>8} {'depth':>6} {'best changes':>13}")
+        for phase, moves in sorted(phases.items()):
+            count = len(moves)
+            print(f"  {phase:<11} {count:>8} {sum(m['budget'] for m in moves) / count:>10.3f} "
+                  f"{sum(m['used'] for m in moves) / count:>8.3f} {sum(m['depth'] for m in moves) / count:>6.1f} "
+                  f"{sum(m['best_changes'] for m in moves) / count:>13.2f}")
+    if failures:
+        sys.exit(f"{failures} time control failures")
+
+
+if __name__ == "__main__":
+    main()
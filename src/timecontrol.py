@@ -0,0 +1,150 @@
+"""
+Time management for games played under a clock: a game time plus an increment per move.
+
+A TimeManager follows the bot's clock across the game. When the bot decides to search, allocate()
+splits what is left on the clock over the moves the game is still expected to last, weighted by the
+game phase, and turns that share into two limits for an iterative-deepening search (bot.timed_search):
+- planned time (budget): no new iteration is started once much of it is used, since the next iteration
+  usually costs more than all earlier ones together. It is extended when the best move changed
+  between iterations, because an unstable choice is worth more time.
+- hard deadline: the search is abandoned (SearchTimeout) and the last completed iteration's move is played.
+
+Every time is read from `clock`, so the same policy runs on time.monotonic in real games and on a
+simulated clock in time_harness.py.
+"""
+import time
+
+OPENING_TURNS = 6  # Turns counted as the opening (bot.DEFAULT_WEIGHTS["early_turns"])
+PHASE_FACTORS = {"opening": 0.5, "middlegame": 1.2, "endgame": 1.0, "race": 0.25}
+ENDGAME_DISTANCE = 3  # A player this close to their goal row makes the position an endgame
+MOVES_LEFT_MARGIN = 4  # Extra moves planned for, since walls make paths longer than they are now
+INCREMENT_SHARE = 0.8  # Share of the increment spent on the move it is added for
+MAX_SHARE = 0.25  # Largest share of the remaining clock one move may use
+HARD_FACTOR = 3.0  # Hard deadline, as a multiple of the move's planned time
+NEXT_ITERATION_SHARE = 0.4  # Start another iteration only before this share of the (extended) plan is used
+INSTABILITY_BONUS = 0.5  # Planned time added per change of the best move, as a share of the plan
+MAX_INSTABILITY = 3  # Changes of the best move counted at most
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the hard deadline has passed."""
+
+
+def game_phase(turn_count, walls_remaining, distances):
+    """
+    Classify a position for time allocation.
+
+    Parameters:
+    - turn_count: Number of turns played.
+    - walls_remaining: Walls left to each player.
+    - distances: Shortest path length of each player to their goal row.
+
+    Returns:
+    - "race" when no walls are left (the pawn race is decided without search), "opening", "endgame"
+      when a player is close to their goal, otherwise "middlegame".
+    """
+    if not any(walls_remaining):
+        return "race"
+    if turn_count < OPENING_TURNS:
+        return "opening"
+    if min(distances) <= ENDGAME_DISTANCE:
+        return "endgame"
+    return "middlegame"
+
+
+def expected_moves_left(walls_remaining, distances):
+    """Own moves the game is expected to last: the shorter path, one turn per wall in hand, plus a margin."""
+    return min(distances) + sum(walls_remaining) + MOVES_LEFT_MARGIN
+
+
+class TimeManager:
+    """
+    Clock and per-move time budgets of one player.
+
+    Parameters:
+    - game_time: Seconds on the clock at the start of the game.
+    - increment: Seconds added to the clock after every move.
+    - clock: Function returning the current time in seconds.
+    - reserve: Seconds kept back from every plan for move overhead outside the search.
+
+    Usage:
+        manager = TimeManager(300, 2)
+        manager.start_move()
+        bot_turn(..., time_manager=manager)  # calls allocate() before searching
+        manager.end_move()
+    """
+
+    def __init__(self, game_time, increment=0.0, clock=time.monotonic, reserve=0.05):
+        self.remaining = game_time
+        self.increment = increment
+        self.clock = clock
+        self.reserve = reserve
+        self.move_start = None
+        self.budget = self.hard_budget = None
+        self.hard_deadline = None
+        self.phase = None
+        self.depth = 0
+        self.best_changes = 0
+        self.best_action = None
+        self.moves = []  # One record per finished move, see end_move()
+
+    def start_move(self):
+        self.move_start = self.clock()
+        self.budget = self.hard_budget = None
+        self.hard_deadline = None
+        self.phase = None
+        self.depth = 0
+        self.best_changes = 0
+        self.best_action = None
+
+    def allocate(self, turn_count, walls_remaining, distances):
+        """
+        Plan the search of the current move.
+
+        Parameters:
+        - turn_count: Number of turns played.
+        - walls_remaining: Walls left to each player.
+        - distances: Shortest path length of each player to their goal row.
+
+        Returns:
+        - The hard deadline, on this manager's clock.
+        """
+        self.phase = game_phase(turn_count, walls_remaining, distances)
+        available = max(0.0, self.remaining - self.reserve)
+        share = available / expected_moves_left(walls_remaining, distances) + self.increment * INCREMENT_SHARE
+        self.budget = min(share * PHASE_FACTORS[self.phase], available * MAX_SHARE)
+        self.hard_budget = min(self.budget * HARD_FACTOR, available * MAX_SHARE)
+        self.hard_deadline = self.move_start + self.hard_budget
+        return self.hard_deadline
+
+    def iteration_done(self, depth, best_action):
+        """Record a completed search iteration and whether it changed the best move."""
+        if self.best_action is not None and best_action != self.best_action:
+            self.best_changes += 1
+        self.depth = depth
+        self.best_action = best_action
+
+    def continue_search(self):
+        """True if another, deeper iteration is likely to finish within the plan."""
+        instability = 1 + INSTABILITY_BONUS * min(self.best_changes, MAX_INSTABILITY)
+        planned = min(self.budget * instability, self.hard_budget)
+        return self.clock() - self.move_start < planned * NEXT_ITERATION_SHARE
+
+    def end_move(self):
+        """
+        Charge the time used since start_move() to the clock and add the increment.
+
+        Returns:
+        - The record of the move: phase, budget, hard budget, seconds used, depth reached, best move
+          changes, whether the clock ran out before the increment ("flagged") and the clock after the move.
+        """
+        used = self.clock() - self.move_start
+        self.remaining -= used
+        flagged = self.remaining < 0
+        self.remaining += self.increment
+        record = {"phase": self.phase, "budget": self.budget, "hard_budget": self.hard_budget, "used": used,
+                  "depth": self.depth, "best_changes": self.best_changes, "flagged": flagged,
+                  "remaining": self.remaining}
+        self.moves.append(record)
+        self.move_start = None
+        return record
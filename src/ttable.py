@@ -0,0 +1,128 @@
+"""
+Transposition tables for the Minimax search.
+
+A table is a fixed-size array of packed 24-byte entries (key, score, best move, depth, bound) indexed
+by the low bits of a position's Zobrist hash (SearchState.search_key). A TranspositionTable lives in
+the memory of one process; a SharedTranspositionTable puts the same array in
+multiprocessing.shared_memory so every worker of a parallel search reads and writes one table.
+Writers and readers of an entry hold one of a fixed set of striped locks, so entries are never torn.
+
+Replacement: an entry is overwritten by a different position, or by the same position searched at
+least as deep. Counters (probes, hits, collisions, stores) are kept per process.
+"""
+import struct
+
+ENTRY = struct.Struct("<QdHbB4x")
+EMPTY, EXACT, LOWER, UPPER = 0, 1, 2, 3
+NO_MOVE = 0xFFFF
+
+
+class TranspositionTable:
+    """
+    Table in a plain buffer.
+
+    Parameters:
+    - entries: Number of entries, rounded up to a power of two.
+    - buffer: Optional writable buffer of entries * ENTRY.size bytes to use instead of a new bytearray.
+    - locks: Optional list of locks; entry i is guarded by locks[i % len(locks)].
+    """
+
+    def __init__(self, entries=1 << 16, buffer=None, locks=None):
+        self.entries = 1 << max(0, entries - 1).bit_length()
+        self.mask = self.entries - 1
+        self.buffer = bytearray(self.entries * ENTRY.size) if buffer is None else buffer
+        self.locks = locks
+        self.probes = self.hits = self.collisions = self.stores = 0
+
+    def probe(self, key):
+        """
+        Look a position up.
+
+        Returns:
+        - (depth, bound, score, best move code or NO_MOVE) if the position is stored, else None.
+        """
+        index = key & self.mask
+        if self.locks is None:
+            stored_key, score, move, depth, bound = ENTRY.unpack_from(self.buffer, index * ENTRY.size)
+        else:
+            with self.locks[index % len(self.locks)]:
+                stored_key, score, move, depth, bound = ENTRY.unpack_from(self.buffer, index * ENTRY.size)
+        self.probes += 1
+        if bound == EMPTY:
+            return None
+        if stored_key != key:
+            self.collisions += 1  # The slot holds another position
+            return None
+        self.hits += 1
+        return depth, bound, score, move
+
+    def store(self, key, depth, bound, score, move=NO_MOVE):
+        """Store a search result; bound is EXACT, LOWER (score >= beta) or UPPER (score <= alpha)."""
+        index = key & self.mask
+        offset = index * ENTRY.size
+        if self.locks is None:
+            self._replace(key, depth, bound, score, move, offset)
+        else:
+            with self.locks[index % len(self.locks)]:
+                self._replace(key, depth, bound, score, move, offset)
+
+    def _replace(self, key, depth, bound, score, move, offset):
+        stored_key, _, _, stored_depth, stored_bound = ENTRY.unpack_from(self.buffer, offset)
+        if stored_bound == EMPTY or stored_key != key or depth >= stored_depth:
+            ENTRY.pack_into(self.buffer, offset, key, score, move, depth, bound)
+            self.stores += 1
+
+    def clear(self):
+        self.buffer[:] = bytes(len(self.buffer))
+
+    def stats(self):
+        """This process's counters, plus the share of probes that found another position in the slot."""
+        return {"probes": self.probes, "hits": self.hits, "collisions": self.collisions, "stores": self.stores,
+                "collision_rate": self.collisions / self.probes if self.probes else 0.0}
+
+    def reset_stats(self):
+        self.probes = self.hits = self.collisions = self.stores = 0
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    Table in a shared memory block, created by the parent process and attached to by the workers.
+
+    Usage:
+        table = SharedTranspositionTable(1 << 18)
+        pool = ProcessPoolExecutor(4, initializer=init_worker, initargs=(table.handle(),))
+        # in init_worker: table = SharedTranspositionTable.attach(*handle)
+        ...
+        table.close(); table.unlink()
+    """
+
+    def __init__(self, entries=1 << 16, stripes=64, name=None, locks=None):
+        from multiprocessing import Lock, shared_memory  # Only parallel searches pay for importing multiprocessing
+
+        entries = 1 << max(0, entries - 1).bit_length()
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=entries * ENTRY.size)
+            self.memory.buf[:] = bytes(entries * ENTRY.size)
+            locks = [Lock() for _ in range(stripes)]
+        else:
+            # Workers started by multiprocessing share their parent's resource tracker, which unlinks
+            # the block if the parent dies without calling unlink()
+            self.memory = shared_memory.SharedMemory(name=name)
+        super().__init__(entries, self.memory.buf, locks)
+
+    def handle(self):
+        """Picklable (name, entries, locks) to pass to worker processes when they start."""
+        return self.memory.name, self.entries, self.locks
+
+    @classmethod
+    def attach(cls, name, entries, locks):
+        """Open a table created by another process from its handle()."""
+        return cls(entries, name=name, locks=locks)
+
+    def close(self):
+        self.buffer = None
+        self.memory.close()
+
+    def unlink(self):
+        """Free the shared memory block (creating process only, after every worker is done)."""
+        self.memory.unlink()
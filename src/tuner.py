@@ -0,0 +1,181 @@
+"""
+Tune the bot's evaluation weights and bot_turn thresholds with SPSA self-play.
+
+Each iteration perturbs every weight at once by +/- its step, plays the same set of games
+(same seeds) with both perturbed weight sets against a fixed MCTS opponent on a process pool,
+and moves the weights in the direction of the better score. Progress is checkpointed after
+every iteration, so a stopped run picks up where it left off; the current weights are written
+to bot.WEIGHTS_PATH, which the bot loads at startup.
+
+Usage: python tuner.py [--iterations 50] [--games 16] [--workers 4] [--opponent-iterations 200]
+                       [--checkpoint tuner_checkpoint.json] [--out weights.json] [--restart]
+"""
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import bot
+from mcts import MCTSBot, USER, BOT
+from rules import GRID_SIZE, initial_positions
+
+# Perturbation size of each weight, and the range it is kept in
+STEPS = {
+    "bot_distance": 2.0,
+    "user_distance": 2.0,
+    "wall_advantage": 1.0,
+    "choke_points": 1.0,
+    "early_turns": 1.0,
+    "block_distance": 1.0,
+}
+BOUNDS = {
+    "bot_distance": (0, 50),
+    "user_distance": (0, 50),
+    "wall_advantage": (0, 20),
+    "choke_points": (0, 20),
+    "early_turns": (0, 20),
+    "block_distance": (0, 8),
+}
+# Compared with integers in bot_turn, so they are rounded before playing
+INTEGER_WEIGHTS = ("early_turns", "block_distance")
+
+# SPSA gain sequences: a_k = LEARNING_RATE / (k + 1 + STABILITY) ** ALPHA, c_k = step / (k + 1) ** GAMMA
+LEARNING_RATE = 1.0
+STABILITY = 5
+ALPHA = 0.602
+GAMMA = 0.101
+
+
+def playable_weights(theta):
+    """Clamp the weights to BOUNDS and round the integer thresholds."""
+    weights = {}
+    for name, value in theta.items():
+        low, high = BOUNDS[name]
+        value = min(high, max(low, value))
+        weights[name] = int(round(value)) if name in INTEGER_WEIGHTS else value
+    return weights
+
+
+def play_tuning_game(task):
+    """
+    Play one game of bot_turn with the given weights (bot side) against an MCTS user (runs in a worker process).
+
+    Parameters:
+    - task: (weights dict, seed, MCTS playouts per move, max_actions).
+
+    Returns:
+    - 1 if the bot won, 0 if it lost, 0.5 if the game was still running after max_actions.
+    """
+    weights, seed, opponent_iterations, max_actions = task
+    bot.set_weights(weights)
+    opponent = MCTSBot(opponent_iterations, time_limit=10.0, seed=seed)
+
+    player_positions = initial_positions(GRID_SIZE)
+    walls = []
+    walls_remaining = [10, 10]
+    user_last_position = player_positions[USER]
+    turn_count = 0
+    with bot.quiet():
+        for _ in range(max_actions // 2):
+            action = opponent.choose_action(player_positions, walls, walls_remaining[BOT], walls_remaining[USER],
+                                            player=USER)
+            if action is not None:
+                if action[0] == "move":
+                    player_positions[USER] = action[1]
+                else:
+                    walls.append(action[1])
+                    walls_remaining[USER] -= 1
+            if player_positions[USER][1] == GRID_SIZE - 1:
+                return 0
+
+            walls_remaining[BOT] = bot.bot_turn(player_positions, walls, walls_remaining[BOT], walls_remaining[USER],
+                                                user_last_position, turn_count)
+            user_last_position = player_positions[USER]
+            turn_count += 1
+            if player_positions[BOT][1] == 0:
+                return 1
+    return 0.5
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as checkpoint_file:
+        return json.load(checkpoint_file)
+
+
+def write_json(path, data):
+    """Write JSON through a temporary file so an interrupted run never leaves a truncated file."""
+    temporary = path + ".tmp"
+    with open(temporary, "w") as output:
+        json.dump(data, output, indent=2)
+    os.replace(temporary, path)
+
+
+def spsa_iteration(pool, theta, k, rng, games, opponent_iterations, max_actions):
+    """
+    Run one SPSA step.
+
+    Returns:
+    - (new theta, score of theta + c_k * delta, score of theta - c_k * delta)
+    """
+    delta = {name: rng.choice((-1, 1)) for name in theta}
+    plus = {name: value + STEPS[name] / (k + 1) ** GAMMA * delta[name] for name, value in theta.items()}
+    minus = {name: value - STEPS[name] / (k + 1) ** GAMMA * delta[name] for name, value in theta.items()}
+
+    # Both sides play the same seeds so the difference comes from the weights, not the opponent's luck
+    seeds = [rng.randrange(2 ** 31) for _ in range(games)]
+    tasks = [(playable_weights(weights), seed, opponent_iterations, max_actions)
+             for weights in (plus, minus) for seed in seeds]
+    results = list(pool.map(play_tuning_game, tasks))
+    score_plus = sum(results[:games]) / games
+    score_minus = sum(results[games:]) / games
+
+    # Gradient estimate (score_plus - score_minus) / (2 c_k delta); steps scale with each weight's range
+    gain = LEARNING_RATE / (k + 1 + STABILITY) ** ALPHA
+    new_theta = {}
+    for name, value in theta.items():
+        low, high = BOUNDS[name]
+        value += gain * STEPS[name] * (score_plus - score_minus) * delta[name] * (k + 1) ** GAMMA
+        new_theta[name] = min(high, max(low, value))
+    return new_theta, score_plus, score_minus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50, help="total SPSA iterations, including resumed ones")
+    parser.add_argument("--games", type=int, default=16, help="games per perturbed weight set per iteration")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--opponent-iterations", type=int, default=200, help="MCTS playouts per opponent move")
+    parser.add_argument("--max-actions", type=int, default=200, help="games longer than this count as draws")
+    parser.add_argument("--checkpoint", default="tuner_checkpoint.json")
+    parser.add_argument("--out", default=bot.WEIGHTS_PATH, help="weights file written after every iteration")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    checkpoint = None if args.restart else load_checkpoint(args.checkpoint)
+    if checkpoint:
+        theta, history = checkpoint["theta"], checkpoint["history"]
+        rng = random.Random()
+        rng.setstate((checkpoint["rng_state"][0], tuple(checkpoint["rng_state"][1]), checkpoint["rng_state"][2]))
+        print(f"Resuming from iteration {len(history)}")
+    else:
+        theta = {name: float(value) for name, value in bot.load_weights(args.out).items()}
+        history = []
+        rng = random.Random(args.seed)
+
+    with ProcessPoolExecutor(args.workers) as pool:
+        for k in range(len(history), args.iterations):
+            theta, score_plus, score_minus = spsa_iteration(pool, theta, k, rng, args.games,
+                                                            args.opponent_iterations, args.max_actions)
+            history.append({"iteration": k, "score_plus": score_plus, "score_minus": score_minus})
+            write_json(args.checkpoint, {"theta": theta, "history": history, "rng_state": rng.getstate()})
+            write_json(args.out, playable_weights(theta))
+            print(f"Iteration {k + 1}: +{score_plus:.2f} / -{score_minus:.2f} -> "
+                  + ", ".join(f"{name}={value:.2f}" for name, value in theta.items()))
+
+
+if __name__ == "__main__":
+    main()
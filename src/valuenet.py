@@ -0,0 +1,352 @@
+"""
+Learned position evaluation: a small NumPy value network, trained offline from recorded games.
+
+A position is encoded as planes over the board, flattened into one input vector:
+- one-hot planes of the user's and the bot's pawn;
+- the horizontal and vertical wall crossings (Board.h_corners / v_corners);
+- each player's distance field to their goal row (steps / cells on the board, 1 where unreachable);
+- the walls each player has left (/ WALL_SCALE) and whether the bot is to move.
+
+The network is a multilayer perceptron (ReLU hidden layers, tanh output) whose output estimates
+the result of the game for the bot: +1 for a win, -1 for a loss. It runs on the CPU with NumPy
+only. Positions are evaluated in batches (see bot.network_scores, which scores all children of a
+depth-1 Minimax node at once): a PositionBatch computes the distance fields of all its positions
+together with distance_fields, and predict() runs the network on all of them in one call.
+
+Training fits the result of every finished game to all of its positions, and to their left-right
+mirror images (state.mirror_code), with Adam on the mean squared error. The weights are saved as an
+.npz file, which the bot loads from bot.VALUE_NET_PATH when bot.EVALUATOR is "network".
+
+Usage: python valuenet.py ../records/selfplay.qrec [--out value_net.npz] [--epochs 30] [--hidden 64 32]
+                          [--grid-size 9]
+"""
+import argparse
+import os
+
+import numpy as np
+
+from board import DIRECTION_BITS
+from records import GameRecordReader, game_actions
+from rules import DIRECTIONS, GRID_SIZE, encode_action, initial_positions
+from state import SearchState, USER, BOT, mirror_code
+
+WALL_SCALE = 10
+DEFAULT_HIDDEN = (64, 32)
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "value_net.npz")
+
+
+def input_size(grid_size=GRID_SIZE):
+    """Length of the encoding of a position on a grid_size board."""
+    return 4 * grid_size * grid_size + 2 * (grid_size - 1) ** 2 + 3
+
+
+def _shifts(grid_size):
+    """
+    For every direction of rules.DIRECTIONS, the (rows, columns) slices of the cells that have a
+    neighbour that way and the slices of those neighbours.
+    """
+    def axis(delta):
+        if delta < 0:
+            return slice(1, grid_size), slice(0, grid_size - 1)
+        if delta > 0:
+            return slice(0, grid_size - 1), slice(1, grid_size)
+        return slice(None), slice(None)
+
+    shifts = []
+    for dx, dy in DIRECTIONS:
+        (rows, neighbour_rows), (columns, neighbour_columns) = axis(dy), axis(dx)
+        shifts.append(((slice(None), rows, columns), (slice(None), neighbour_rows, neighbour_columns)))
+    return shifts
+
+
+def distance_fields(blocked, goal_rows, grid_size=GRID_SIZE):
+    """
+    Board.distance_field of many boards at once, by relaxing every cell from its neighbours until
+    nothing changes (about one round per step of the longest distance).
+
+    Parameters:
+    - blocked: uint8 array (boards, cells) of Board.blocked bytes.
+    - goal_rows: Goal row of each board, as an int array (boards,).
+
+    Returns:
+    - int16 array (boards, cells) of steps to the goal row; cells cut off from it get the number of cells.
+    """
+    cells = grid_size * grid_size
+    blocked = blocked.reshape(-1, grid_size, grid_size)
+    shifts = _shifts(grid_size)
+    # Cost of a step in each direction: 1, or more than any distance through a wall
+    costs = [np.where(blocked[cells_slice] & bit, cells, 1).astype(np.int16)
+             for (cells_slice, _), bit in zip(shifts, DIRECTION_BITS)]
+    rows = np.arange(grid_size)[None, :, None]
+    fields = np.where(rows == np.asarray(goal_rows)[:, None, None], 0, cells).astype(np.int16)
+    fields = np.broadcast_to(fields, blocked.shape).copy()
+    while True:
+        previous = fields.copy()
+        for (cells_slice, neighbours_slice), cost in zip(shifts, costs):
+            np.minimum(fields[cells_slice], fields[neighbours_slice] + cost, out=fields[cells_slice])
+        if np.array_equal(previous, fields):
+            return fields.reshape(-1, cells)
+
+
+class PositionBatch:
+    """
+    Encoded positions for one ValueNet.predict call.
+
+    set() encodes everything but the distance fields; distances() then computes the fields of all
+    positions at once and fills them in.
+
+    Parameters:
+    - count: Number of positions.
+    - grid_size: Board size.
+    """
+
+    def __init__(self, count, grid_size=GRID_SIZE):
+        cells = grid_size * grid_size
+        self.grid_size = grid_size
+        self.inputs = np.zeros((count, input_size(grid_size)), np.float32)
+        self.blocked = np.zeros((count, cells), np.uint8)
+        self.pawns = np.zeros((count, 2), np.intp)
+
+    def set(self, index, state, bot_to_move):
+        """Encode a SearchState as position `index`."""
+        board = state.board
+        cells = state.cell_count
+        corners = (state.size - 1) ** 2
+        row = self.inputs[index]
+        user_cell, bot_cell = self.pawns[index] = state.cells
+        row[user_cell] = 1
+        row[cells + bot_cell] = 1
+        offset = 2 * cells
+        row[offset:offset + corners] = np.frombuffer(board.h_corners, np.uint8)
+        row[offset + corners:offset + 2 * corners] = np.frombuffer(board.v_corners, np.uint8)
+        offset += 2 * corners + 2 * cells  # The distance fields are filled in by distances()
+        row[offset] = state.walls_remaining[USER] / WALL_SCALE
+        row[offset + 1] = state.walls_remaining[BOT] / WALL_SCALE
+        row[offset + 2] = bot_to_move
+        self.blocked[index] = np.frombuffer(board.blocked, np.uint8)
+
+    def distances(self):
+        """
+        Fill in the distance field planes of every position.
+
+        Returns:
+        - (user_distances, bot_distances): int arrays of each position's distances to the goal rows.
+        """
+        size = self.grid_size
+        cells = size * size
+        count = len(self.blocked)
+        # Both players' fields in one call: the user's goal row for the first copy, the bot's for the second
+        fields = distance_fields(np.concatenate([self.blocked, self.blocked]),
+                                 np.repeat([size - 1, 0], count), size)
+        offset = 2 * cells + 2 * (size - 1) ** 2
+        self.inputs[:, offset:offset + cells] = fields[:count] / cells
+        self.inputs[:, offset + cells:offset + 2 * cells] = fields[count:] / cells
+        positions = np.arange(count)
+        return fields[positions, self.pawns[:, USER]], fields[count + positions, self.pawns[:, BOT]]
+
+
+class ValueNet:
+    """
+    Multilayer perceptron from encoded positions to the expected game result for the bot.
+
+    Parameters:
+    - layers: List of (weights, biases) float32 arrays, from the input to the single output.
+    - grid_size: Board size the network was built for.
+    """
+
+    def __init__(self, layers, grid_size=GRID_SIZE):
+        self.layers = layers
+        self.grid_size = grid_size
+
+    @classmethod
+    def random(cls, hidden=DEFAULT_HIDDEN, grid_size=GRID_SIZE, seed=0):
+        """Untrained network with He-initialized hidden layers."""
+        rng = np.random.default_rng(seed)
+        sizes = [input_size(grid_size), *hidden, 1]
+        layers = [((rng.standard_normal((inputs, outputs)) * np.sqrt(2 / inputs)).astype(np.float32),
+                   np.zeros(outputs, np.float32))
+                  for inputs, outputs in zip(sizes, sizes[1:])]
+        return cls(layers, grid_size)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with np.load(path) as data:
+            count = int(data["layer_count"])
+            layers = [(data[f"w{index}"], data[f"b{index}"]) for index in range(count)]
+            return cls(layers, int(data["grid_size"]))
+
+    def save(self, path=DEFAULT_PATH):
+        arrays = {"layer_count": len(self.layers), "grid_size": self.grid_size}
+        for index, (weights, biases) in enumerate(self.layers):
+            arrays[f"w{index}"] = weights
+            arrays[f"b{index}"] = biases
+        # np.savez adds .npz to names without it, so write through a file object
+        with open(path, "wb") as file:
+            np.savez(file, **arrays)
+
+    def batch(self, count):
+        """Empty PositionBatch for `count` positions of this network's board size."""
+        return PositionBatch(count, self.grid_size)
+
+    def predict(self, inputs):
+        """Expected results for the bot, in (-1, 1), of a batch of encoded positions."""
+        activations = inputs
+        for weights, biases in self.layers[:-1]:
+            activations = np.maximum(activations @ weights + biases, 0)
+        weights, biases = self.layers[-1]
+        return np.tanh(activations @ weights + biases)[:, 0]
+
+    def train_batch(self, inputs, targets, optimizer):
+        """One Adam step on the mean squared error of a batch; returns the loss before the step."""
+        activations = [inputs]
+        for weights, biases in self.layers[:-1]:
+            activations.append(np.maximum(activations[-1] @ weights + biases, 0))
+        weights, biases = self.layers[-1]
+        outputs = np.tanh(activations[-1] @ weights + biases)[:, 0]
+        errors = outputs - targets
+
+        # Backpropagate d(loss)/d(pre-activation), starting at the tanh output
+        delta = (2 / len(targets) * errors * (1 - outputs ** 2))[:, None]
+        gradients = []
+        for index in range(len(self.layers) - 1, -1, -1):
+            weights, _ = self.layers[index]
+            gradients.append((activations[index].T @ delta, delta.sum(axis=0)))
+            if index:
+                delta = (delta @ weights.T) * (activations[index] > 0)
+        gradients.reverse()
+        optimizer.step(self.layers, gradients)
+        return float(np.mean(errors ** 2))
+
+
+class Adam:
+    """Adam optimizer state for the layers of a ValueNet."""
+
+    def __init__(self, layers, learning_rate=1e-3, beta1=0.9, beta2=0.999, epsilon=1e-8):
+        self.learning_rate = learning_rate
+        self.beta1, self.beta2, self.epsilon = beta1, beta2, epsilon
+        self.moments = [(np.zeros_like(w), np.zeros_like(b), np.zeros_like(w), np.zeros_like(b)) for w, b in layers]
+        self.steps = 0
+
+    def step(self, layers, gradients):
+        """Update the layer arrays in place."""
+        self.steps += 1
+        correction1 = 1 - self.beta1 ** self.steps
+        correction2 = 1 - self.beta2 ** self.steps
+        for (weights, biases), grads, moments in zip(layers, gradients, self.moments):
+            for parameter, gradient, mean, square in ((weights, grads[0], moments[0], moments[2]),
+                                                      (biases, grads[1], moments[1], moments[3])):
+                mean *= self.beta1
+                mean += (1 - self.beta1) * gradient
+                square *= self.beta2
+                square += (1 - self.beta2) * gradient ** 2
+                parameter -= self.learning_rate * (mean / correction1) / (np.sqrt(square / correction2) + self.epsilon)
+
+
+def game_positions(record, mirrored=False):
+    """
+    Encode every position of a finished game, before each action.
+
+    Parameters:
+    - record: GameRecord with a winner.
+    - mirrored: Replay the left-right mirror image of the game instead.
+
+    Returns:
+    - Float32 array with one encoded position per action.
+    """
+    grid_size = record.grid_size
+    state = SearchState(initial_positions(grid_size), [], record.walls_per_player, record.walls_per_player,
+                        grid_size)
+    batch = PositionBatch(len(record.codes), grid_size)
+    to_move = record.first_player
+    for index, action in enumerate(game_actions(record)):
+        batch.set(index, state, to_move == BOT)
+        code = encode_action(action, grid_size)
+        state.apply(mirror_code(code, grid_size) if mirrored else code, to_move)
+        to_move = 1 - to_move
+    batch.distances()
+    return batch.inputs
+
+
+def training_data(paths, grid_size=GRID_SIZE, mirror=True):
+    """
+    Encoded positions of the finished games in record files, with the result of their game.
+
+    Returns:
+    - (inputs, targets, games): targets are +1 where the bot won and -1 where the user won, and
+      games the index of the game of each position (its mirror image has the same index).
+    """
+    inputs, targets, games = [], [], []
+    game_index = 0
+    for path in paths:
+        with GameRecordReader(path) as reader:
+            for record in reader:
+                if record.winner is None or record.grid_size != grid_size:
+                    continue
+                result = 1.0 if record.winner == BOT else -1.0
+                for mirrored in ((False, True) if mirror else (False,)):
+                    rows = game_positions(record, mirrored)
+                    inputs.append(rows)
+                    targets.append(np.full(len(rows), result, np.float32))
+                    games.append(np.full(len(rows), game_index))
+                game_index += 1
+    if not inputs:
+        raise ValueError(f"no finished {grid_size}x{grid_size} games in the records")
+    return np.concatenate(inputs), np.concatenate(targets), np.concatenate(games)
+
+
+def train(net, inputs, targets, epochs=30, batch_size=256, learning_rate=1e-3, seed=0, validation=None, log=print):
+    """
+    Fit the network to (inputs, targets) with minibatch Adam.
+
+    Parameters:
+    - validation: Optional (inputs, targets) scored after every epoch.
+    - log: Called with a progress line per epoch.
+
+    Returns:
+    - List of (training loss, validation loss or None) per epoch.
+    """
+    rng = np.random.default_rng(seed)
+    optimizer = Adam(net.layers, learning_rate)
+    history = []
+    for epoch in range(1, epochs + 1):
+        order = rng.permutation(len(targets))
+        losses = [net.train_batch(inputs[batch], targets[batch], optimizer)
+                  for batch in np.array_split(order, max(1, len(order) // batch_size))]
+        train_loss = float(np.mean(losses))
+        validation_loss = None
+        if validation is not None:
+            validation_loss = float(np.mean((net.predict(validation[0]) - validation[1]) ** 2))
+        history.append((train_loss, validation_loss))
+        log(f"epoch {epoch}: training loss {train_loss:.4f}"
+            + (f", validation loss {validation_loss:.4f}" if validation_loss is not None else ""))
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("records", nargs="+", help="game record files (e.g. from selfplay.py)")
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    parser.add_argument("--hidden", type=int, nargs="+", default=list(DEFAULT_HIDDEN), help="hidden layer sizes")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--learning-rate", type=float, default=1e-3)
+    parser.add_argument("--validation", type=float, default=0.1, help="share of the games held out")
+    parser.add_argument("--no-mirror", action="store_true", help="do not add the mirror images of the games")
+    parser.add_argument("--grid-size", type=int, default=GRID_SIZE, help="train on the games of this board size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    inputs, targets, games = training_data(args.records, args.grid_size, mirror=not args.no_mirror)
+    # Hold out whole games, so positions of one game are not on both sides
+    held_out = np.random.default_rng(args.seed).random(games.max() + 1) < args.validation
+    validation = held_out[games]
+    print(f"{len(targets)} positions from {games.max() + 1} games, {int(validation.sum())} held out")
+    net = ValueNet.random(args.hidden, args.grid_size, seed=args.seed)
+    train(net, inputs[~validation], targets[~validation], args.epochs, args.batch_size, args.learning_rate,
+          args.seed, (inputs[validation], targets[validation]) if validation.any() else None)
+    net.save(args.out)
+    print(f"Saved the network to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
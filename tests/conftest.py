@@ -0,0 +1,5 @@
+"""The modules live in src/ and import each other by name, as when the scripts are run from there."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,27 @@
+"""Tests of the array-backed Board in board.py."""
+import random
+
+import pytest
+
+from bench_board_size import random_position
+from board import Board
+from mcts import goal_rows
+from rules import is_path_open, is_valid_wall
+
+
+@pytest.mark.parametrize("grid_size", [5, 9, 13])
+def test_legal_walls_match_the_rules(grid_size):
+    # Many walls, so that plenty of candidates close a region or cross a pawn's path
+    rng = random.Random(grid_size)
+    user_goal, bot_goal = goal_rows(grid_size)
+    for _ in range(20):
+        positions, walls = random_position(grid_size, rng, rng.randrange(grid_size * 2))
+        expected = {wall for wall in Board(grid_size).all_wall_slots()
+                    if is_valid_wall(wall, walls, grid_size) and
+                    is_path_open(positions[0], user_goal, walls + [wall], grid_size) and
+                    is_path_open(positions[1], bot_goal, walls + [wall], grid_size)}
+        board = Board(grid_size, walls)
+        pawns = list(zip(positions, (user_goal, bot_goal)))
+        assert set(board.legal_walls(pawns)) == expected
+        assert {wall for wall in board.all_wall_slots()
+                if board.is_valid_wall(wall) and board.wall_keeps_paths_open(wall, pawns)} == expected
@@ -0,0 +1,34 @@
+"""Tests of the opening book in book.py."""
+import bot
+from book import OpeningBook, build_book, open_book
+from rules import encode_action, initial_positions
+from state import SearchState, mirror_code
+
+
+def test_book_answers_for_mirror_images(tmp_path):
+    book, stats = build_book(plies=4, width=3, depth=2)
+    assert stats["searched"] == len(book) > 0 and stats["in_book"] > 0  # Mirror images are searched once
+    path = tmp_path / "book.json"
+    book.save(path, bot.evaluation_fingerprint())
+    loaded = open_book(path, bot.evaluation_fingerprint())
+    assert loaded.entries == book.entries
+    assert open_book(path, bot.evaluation_fingerprint() + 1) is None
+
+    # The user steps left from the start; the bot's answer to the step right is its mirror image
+    user, bot_position = initial_positions()
+    left = SearchState([(user[0] - 1, user[1]), bot_position], [], 10, 10)
+    right = SearchState([(user[0] + 1, user[1]), bot_position], [], 10, 10)
+    assert left.canonical_key(True, user)[0] == right.canonical_key(True, user)[0]
+    code = loaded.lookup(left, user)
+    assert code is not None and loaded.lookup(right, user) == mirror_code(code)
+
+
+def test_book_action_is_played(monkeypatch):
+    user, bot_position = initial_positions()
+    positions = [(user[0], user[1] + 1), bot_position]
+    book = OpeningBook(4)
+    book.add(SearchState(positions, [], 10, 10), user, encode_action(("wall", (3, 1, "H"))))
+    monkeypatch.setattr(bot, "BOOK", book)
+    walls = []
+    assert bot.bot_turn(positions, walls, 10, 10, user, 1) == 9
+    assert walls == [(3, 1, "H")]
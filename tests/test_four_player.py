@@ -0,0 +1,22 @@
+"""Tests of the four-player paranoid search."""
+import random
+
+from four_player import FourPlayerGame, choose_action, paranoid
+
+
+def test_choice_is_among_the_full_window_best():
+    # Later root actions are searched with a bound; one that fails low must never tie with the best
+    for seed in range(2):
+        game, rng = FourPlayerGame(5), random.Random(seed)
+        for _ in range(13):
+            root = game.to_move
+            scores = {}
+            for action in game.legal_actions(root):
+                game.apply(action)
+                scores[action] = paranoid(game, 1, float('-inf'), float('inf'), root, {"nodes": 0})
+                game.undo()
+            action, score, _ = choose_action(game, 2, rng)
+            assert scores[action] == score == max(scores.values())
+            game.apply(action)
+            if game.winner() is not None:
+                break
@@ -0,0 +1,21 @@
+"""Tests of the differential rules oracle."""
+import oracle
+
+
+class LongPathEngine(oracle.AStarEngine):
+    """An A* engine with a bug: paths through the opponent's column are one step too long."""
+
+    def shortest_path_length(self, start, goal_y, opponent_position=None):
+        length = super().shortest_path_length(start, goal_y, opponent_position)
+        return length + 1 if opponent_position is not None and start[0] == opponent_position[0] else length
+
+
+def test_astar_matches_the_reference():
+    cases, divergence = oracle.check_games(("astar", 0, 2, 20, 9))
+    assert cases > 0 and divergence is None
+
+
+def test_astar_bug_is_found():
+    cases, divergence = oracle.check_games(("test_oracle:LongPathEngine", 0, 2, 20, 9))
+    assert divergence is not None and divergence["method"] == "shortest_path_length"
+    assert divergence["actual"] == divergence["expected"] + 1
@@ -0,0 +1,116 @@
+"""Regression tests of the Minimax search in bot.py."""
+import pytest
+
+import bot
+from rules import GRID_SIZE, decode_action, encode_action
+from state import mirror_code
+from timecontrol import TimeManager
+from ttable import TranspositionTable
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_bot_takes_immediate_win(depth):
+    # The settled race through (3, 1) used to outscore the win itself
+    action, score = bot.search_best_action([(4, 3), (4, 1)], [], depth, 0, 0, (4, 3))
+    assert action == ("move", (4, 0))
+    assert score >= bot.RACE_WIN_SCORE
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_user_takes_immediate_win(depth):
+    action, score = bot.search_best_action([(4, 7), (4, 1)], [], depth, 0, 0, (4, 7), is_bot=False)
+    assert action == ("move", (4, 8))
+    assert score <= -bot.RACE_WIN_SCORE
+
+
+def test_sooner_win_scores_higher():
+    assert bot.terminal_score([(4, 3), (4, 0)], 3) > bot.terminal_score([(4, 3), (4, 0)], 1) > bot.RACE_WIN_SCORE
+    assert bot.terminal_score([(4, 8), (4, 3)], 3) < bot.terminal_score([(4, 8), (4, 3)], 1) < -bot.RACE_WIN_SCORE
+
+
+def test_bot_turn_searches_under_the_clock():
+    # In the opening the phase heuristics would place a wall or step without searching
+    manager = TimeManager(60)
+    manager.start_move()
+    positions, walls = [(4, 0), (4, 8)], []
+    with bot.quiet():
+        bot.bot_turn(positions, walls, 10, 10, (4, 0), 0, time_manager=manager)
+    assert manager.phase == "opening" and manager.depth >= 1
+    assert positions[1] != (4, 8) or walls
+
+
+@pytest.mark.parametrize("level", list(bot.DIFFICULTY_LEVELS))
+def test_bot_turn_searches_at_level(level, monkeypatch):
+    calls = []
+    level_search = bot.level_search
+    monkeypatch.setattr(bot, "level_search", lambda *args, **kwargs: calls.append(args) or level_search(*args))
+    positions, walls = [(4, 0), (4, 8)], []
+    with bot.quiet():
+        bot.bot_turn(positions, walls, 10, 10, (4, 0), 0, level=level)
+    assert len(calls) == 1 and calls[0][5] is bot.DIFFICULTY_LEVELS[level]
+    assert positions[1] != (4, 8) or walls
+
+
+def mirror_image(player_positions, walls, user_last_position):
+    """Left-right mirror image of a position (see state.mirror_tables)."""
+    size = GRID_SIZE
+    walls = [decode_action(mirror_code(encode_action(("wall", wall))))[1] for wall in walls]
+    return [(size - 1 - x, y) for x, y in player_positions], walls, (size - 1 - user_last_position[0],
+                                                                     user_last_position[1])
+
+
+def mirror_action(action):
+    return decode_action(mirror_code(encode_action(action)))
+
+
+MIRROR_POSITIONS = [
+    ([(5, 3), (4, 6)], [(0, 8, "H")], (5, 2)),
+    ([(7, 3), (6, 3)], [(1, 6, "H"), (1, 3, "H"), (3, 2, "H")], (7, 2)),
+    ([(2, 3), (5, 5)], [(3, 4, "H"), (1, 2, "V")], (2, 2)),
+    ([(4, 5), (3, 4)], [(4, 6, "H"), (5, 4, "V"), (2, 3, "H")], (4, 4)),
+]
+
+
+@pytest.mark.parametrize("positions, walls, last_position", MIRROR_POSITIONS)
+@pytest.mark.parametrize("is_bot", [True, False])
+def test_mirror_image_searches_alike(positions, walls, last_position, is_bot, depth=3):
+    mirror_positions, mirror_walls, mirror_last = mirror_image(positions, walls, last_position)
+    with bot.quiet():
+        action, score = bot.search_best_action(positions, walls, depth, 5, 4, last_position, is_bot,
+                                               table=TranspositionTable(1 << 14))
+        mirror_result = bot.search_best_action(mirror_positions, mirror_walls, depth, 5, 4, mirror_last, is_bot,
+                                               table=TranspositionTable(1 << 14))
+    assert mirror_result == (mirror_action(action), score)
+
+
+@pytest.mark.parametrize("positions, walls, last_position", MIRROR_POSITIONS)
+def test_mirror_image_shares_table_entries(positions, walls, last_position, depth=3):
+    mirror_positions, mirror_walls, mirror_last = mirror_image(positions, walls, last_position)
+    table = TranspositionTable(1 << 14)
+    with bot.quiet():
+        action, score = bot.search_best_action(positions, walls, depth, 5, 4, last_position, table=table)
+        table.reset_stats()
+        mirror_result = bot.search_best_action(mirror_positions, mirror_walls, depth, 5, 4, mirror_last,
+                                               table=table)
+    assert mirror_result == (mirror_action(action), score)
+    assert table.stats()["hits"] > 0
+
+
+def test_timed_search_plays_first_action_when_capped(monkeypatch):
+    # A bot turn's cap, unlike the clock's deadline, can interrupt the depth 1 iteration
+    monkeypatch.setattr(bot, "DEADLINE_CHECK_NODES", 1)
+    manager = TimeManager(60)
+    manager.start_move()
+    manager.allocate(0, (10, 10), (8, 8))
+    with bot.quiet(), bot.move_deadline(-1):
+        action, score = bot.timed_search([(4, 0), (4, 8)], [], 10, 10, (4, 0), manager)
+    assert score is None
+    assert action == bot.first_action([(4, 0), (4, 8)], [], 10, 10, (4, 0))
+
+
+def test_quiet_keeps_reasoning_out_of_output(capsys):
+    with bot.quiet():
+        bot.bot_turn([(4, 0), (4, 8)], [], 10, 10, (4, 0), 0)
+    assert capsys.readouterr().out == "" and bot.VERBOSE
+    bot.bot_turn([(4, 0), (4, 8)], [], 10, 10, (4, 0), 0)
+    assert capsys.readouterr().out
@@ -0,0 +1,61 @@
+"""Tests of the game server's handling of bad requests and of slow and failing bot searches."""
+import asyncio
+import json
+import os
+import time
+
+import server
+from rules import illegal_reason, is_valid_wall
+
+
+def crash_worker(*args):
+    os._exit(1)
+
+
+def test_bot_action_gives_up_at_time_limit():
+    positions = [(4, 4), (4, 6)]
+    start = time.monotonic()
+    action = server.bot_action(positions, [], 10, 10, (4, 3), 10, "minimax", "expert", time_limit=0.05)
+    assert time.monotonic() - start < 0.5
+    assert not illegal_reason(positions, [], [10, 10], server.BOT, action, allow_stay=False)
+
+
+async def request(reader, writer, **fields):
+    writer.write((json.dumps(fields) + "\n").encode())
+    return json.loads(await reader.readline())
+
+
+def play_requests(path, actions):
+    """Start a server on a Unix socket, play `actions` in a new game; returns the answers and the final state."""
+    async def run():
+        game_server = server.GameServer(workers=1)
+        listener = await asyncio.start_unix_server(game_server.handle_client, path=path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            game = (await request(reader, writer, cmd="new"))["state"]["game"]
+            answers = [await request(reader, writer, cmd="play", game=game, action=action) for action in actions]
+            after = await request(reader, writer, cmd="state", game=game)
+            writer.close()
+            return answers, after
+        finally:
+            listener.close()
+            game_server.shutdown()
+
+    return asyncio.run(run())
+
+
+def test_crashed_worker_answers_with_an_error(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "bot_action", crash_worker)
+    (failed,), after = play_requests(str(tmp_path / "server.sock"), [["move", [4, 1]]])
+    assert not failed["ok"] and "BrokenProcessPool" in failed["error"]
+    assert after["state"]["positions"] == [[4, 0], [4, 8]] and after["state"]["to_move"] == "user"
+
+
+def test_malformed_walls_are_rejected(tmp_path):
+    actions = [["wall", [100, 100, "X"]], ["wall", [1, 2, "X"]], ["wall", [1.5, 2, "H"]], ["wall", ["1", 2, "V"]],
+               ["move", [4.0, 1]]]
+    answers, after = play_requests(str(tmp_path / "server.sock"), actions)
+    assert not any(answer["ok"] for answer in answers)
+    assert after["state"]["walls"] == [] and after["state"]["walls_remaining"] == [10, 10]
+    assert after["state"]["positions"] == [[4, 0], [4, 8]]
+    assert not is_valid_wall((1, 2, "X"), []) and not is_valid_wall((100, 100, "X"), [])
@@ -0,0 +1,12 @@
+"""Checks of the tactical test suite (tactics.txt)."""
+from rules import get_all_possible_moves
+from tactics import load_suite
+
+
+def test_every_position_has_a_wrong_pawn_move():
+    # A position whose best actions include every legal pawn move cannot fail
+    for position in load_suite():
+        player = position.to_move
+        moves = get_all_possible_moves(position.player_positions[player], position.walls,
+                                       position.player_positions[1 - player])
+        assert [move for move in moves if ("move", move) not in position.best], position.name
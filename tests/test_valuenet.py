@@ -0,0 +1,31 @@
+"""Tests of loading and training the value network."""
+import pytest
+
+import bot
+from records import GameRecordWriter
+
+valuenet = pytest.importorskip("valuenet")  # Needs the optional NumPy
+
+
+def test_network_for_another_board_size_is_rejected(tmp_path, monkeypatch):
+    path = str(tmp_path / "net.npz")
+    valuenet.ValueNet.random((4,), grid_size=7).save(path)
+    monkeypatch.setattr(bot, "VALUE_NET_PATH", path)
+    monkeypatch.setattr(bot, "_value_net", None)
+    with pytest.raises(ValueError, match="7x7"):
+        bot.get_value_net()
+
+
+def test_training_on_another_board_size(tmp_path, monkeypatch):
+    records = str(tmp_path / "games.qrec")
+    with GameRecordWriter(records) as writer:
+        writer.begin_game(grid_size=5, walls_per_player=0)
+        for action in [("move", (2, 1)), ("move", (2, 3)), ("move", (2, 2)), ("move", (1, 3)),
+                       ("move", (2, 4))]:
+            writer.record(action)
+        writer.end_game(winner=0)
+    out = str(tmp_path / "net.npz")
+    monkeypatch.setattr("sys.argv", ["valuenet.py", records, "--out", out, "--grid-size", "5", "--epochs", "1",
+                                     "--hidden", "4", "--validation", "0"])
+    valuenet.main()
+    assert valuenet.ValueNet.load(out).grid_size == 5